@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LoginConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.login'
+
+    def ready(self):
+        # Registra las señales que invalidan la identidad guardada en los tokens
+        from . import identidad  # noqa: F401
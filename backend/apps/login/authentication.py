@@ -0,0 +1,83 @@
+import time
+from functools import cached_property
+
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+# Este módulo no importa modelos: DRF lo importa al cargar sus settings,
+# antes de que estén listas las apps
+
+
+def _clave_version(username):
+    return f'identidad:{username}:version'
+
+
+def version_identidad(username):
+    # Igual que version_catalogo: timestamp inicial para no repetir versiones si se vacía la caché
+    version = cache.get(_clave_version(username))
+    if version is None:
+        cache.add(_clave_version(username), time.time_ns(), timeout=None)
+        version = cache.get(_clave_version(username))
+    return version
+
+
+def identidad_revocada(username, identidad_token, version_token):
+    """
+    True si la identidad cambió después de emitir el token. Sin versión
+    guardada (reinicio, desalojo de la caché) no se sabe si hubo cambios:
+    se compara la identidad del token con la de la base (una consulta) y,
+    si coincide y la cuenta sigue activa, se adopta la versión del token.
+    """
+    vigente = cache.get(_clave_version(username))
+    if vigente is not None:
+        return vigente != version_token
+
+    # Import diferido: ver el comentario del principio del módulo
+    from .identidad import identidad_de
+    identidad, activo = identidad_de(username)
+    if not activo or identidad != identidad_token:
+        return True
+    if version_token is not None:
+        cache.add(_clave_version(username), version_token, timeout=None)
+    return False
+
+
+def invalidar_identidad(*usernames):
+    cache.set_many({_clave_version(str(username)): time.time_ns() for username in usernames}, timeout=None)
+
+
+class UsuarioToken(TokenUser):
+    """Usuario armado con los claims del access token, sin consultar auth_user"""
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def identidad(self):
+        return self.token['identidad']
+
+    @cached_property
+    def rol(self):
+        return self.identidad['rol']
+
+
+class JWTIdentidadAuthentication(JWTAuthentication):
+    """
+    Autenticación sin estado: si el token trae el claim 'identidad' el usuario
+    se arma con los claims (sin consultas). Los tokens emitidos antes de
+    incorporar los claims siguen funcionando con la carga normal del User.
+    """
+
+    def get_user(self, validated_token):
+        if 'identidad' not in validated_token:
+            return super().get_user(validated_token)
+
+        usuario = UsuarioToken(validated_token)
+        if identidad_revocada(usuario.username, usuario.identidad, validated_token.get('iv')):
+            # El cliente refresca el token y recibe la identidad actualizada
+            raise AuthenticationFailed('Los datos de la cuenta cambiaron, refrescar el token', code='identidad_obsoleta')
+        return usuario
@@ -0,0 +1,133 @@
+"""
+Identidad del usuario (rol, empleado / tutor, nombre, primer_login) en los claims del JWT.
+
+LoginView y el refresh cargan la identidad desde la base y la guardan en el
+token (claim 'identidad'), junto con la versión de identidad del usuario
+(claim 'iv'). check_auth y los permisos por rol la leen del token sin
+consultar la base.
+
+Cuando cambia un empleado, un tutor o un rol, la versión del usuario se
+renueva en la caché: los tokens con la versión anterior se rechazan con
+401 y el cliente los refresca, lo que vuelve a leer la identidad. Si la
+caché no tiene la versión (reinicio, desalojo) el token se verifica contra
+la base antes de aceptarlo (authentication.identidad_revocada).
+"""
+from django.db import transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.secretarios.models import Tutor
+from .authentication import invalidar_identidad, version_identidad
+from .models import Empleado, Rol
+
+
+CAMPOS_IDENTIDAD = ('tipo', 'id_persona', 'dni', 'nombre', 'apellido', 'primer_login', 'estado', 'rol')
+
+
+def identidad_de(username):
+    """
+    Devuelve (datos de identidad, cuenta activa) o (None, False) si no es empleado ni tutor.
+    Una sola consulta: UNION de empleados (con su rol) y tutores; si el DNI
+    está en las dos tablas gana el empleado, igual que antes.
+    """
+    consulta = Empleado.objects.order_by().filter(dni_empleado=username).annotate(
+        tipo=Value('empleado'),
+        id_persona=F('id_empleado'),
+        dni=F('dni_empleado'),
+        nombre=F('nombre_empleado'),
+        apellido=F('apellido_empleado'),
+        estado=F('estado_empleado'),
+        rol=F('id_rol__nombre_rol'),
+    ).values_list(*CAMPOS_IDENTIDAD)
+
+    try:
+        dni_tutor = int(username)
+    except (TypeError, ValueError):
+        dni_tutor = None
+    if dni_tutor is not None:
+        consulta = consulta.union(Tutor.objects.order_by().filter(dni_tutor=dni_tutor).annotate(
+            tipo=Value('tutor'),
+            id_persona=F('id_tutor'),
+            dni=Cast('dni_tutor', CharField()),
+            nombre=F('nombre_tutor'),
+            apellido=F('apellido_tutor'),
+            estado=F('estado_tutor'),
+            rol=Value('tutor'),
+        ).values_list(*CAMPOS_IDENTIDAD), all=True)
+
+    filas = {fila[0]: fila for fila in consulta}
+    fila = filas.get('empleado') or filas.get('tutor')
+    if fila is None:
+        return None, False
+
+    tipo, id_persona, dni, nombre, apellido, primer_login, estado, rol = fila
+    if tipo == 'empleado':
+        identidad = {
+            'rol': rol,
+            'id_empleado': id_persona,
+            'dni_empleado': dni,
+            'nombre': nombre,
+            'apellido': apellido,
+            'primer_login': primer_login,
+        }
+    else:
+        identidad = {
+            'rol': rol,
+            'id_tutor': id_persona,
+            'dni_tutor': int(dni),
+            'nombre': nombre,
+            'apellido': apellido,
+            'primer_login': primer_login,
+        }
+    return identidad, estado != 'Inactivo'
+
+
+def identidad_de_usuario(user):
+    """Identidad desde los claims si el usuario viene del token; si no, desde la base"""
+    identidad = getattr(user, 'identidad', None)
+    if identidad is None:
+        identidad, _ = identidad_de(user.username)
+    return identidad
+
+
+def invalidar_identidad_al_confirmar(*usernames):
+    transaction.on_commit(lambda: invalidar_identidad(*usernames))
+
+
+def aplicar_claims(token, user, identidad):
+    token['username'] = user.username
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    token['identidad'] = identidad
+    token['iv'] = version_identidad(user.username)
+
+
+def emitir_tokens(user, identidad):
+    """RefreshToken con la identidad en los claims (el access token la hereda)"""
+    refresh = RefreshToken.for_user(user)
+    aplicar_claims(refresh, user, identidad)
+    return refresh
+
+
+@receiver(post_save, sender=Empleado)
+@receiver(post_delete, sender=Empleado)
+def invalidar_identidad_empleado(sender, instance, **kwargs):
+    invalidar_identidad_al_confirmar(instance.dni_empleado)
+
+
+@receiver(post_save, sender=Tutor)
+@receiver(post_delete, sender=Tutor)
+def invalidar_identidad_tutor(sender, instance, **kwargs):
+    invalidar_identidad_al_confirmar(instance.dni_tutor)
+
+
+@receiver(post_save, sender=Rol)
+def invalidar_identidad_rol(sender, instance, created, **kwargs):
+    # Renombrar un rol cambia el claim 'rol' de todos sus empleados
+    if not created:
+        dnis = list(Empleado.objects.filter(id_rol=instance).values_list('dni_empleado', flat=True))
+        if dnis:
+            invalidar_identidad_al_confirmar(*dnis)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.login.mantenimiento import LOTE_DEFAULT, depurar_tokens_vencidos
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra por lotes los refresh tokens vencidos (outstanding y blacklisted). '
+        'Pensado para correr todas las noches, por ejemplo desde cron: '
+        '"30 3 * * * cd /ruta/backend && python manage.py depurar_tokens --pausa 0.05"'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=LOTE_DEFAULT, help='Filas por lote (y por transacción)')
+        parser.add_argument('--pausa', type=float, default=0.0, help='Segundos de pausa entre lotes')
+        parser.add_argument('--max-lotes', type=int, default=None, help='Corta después de N lotes')
+
+    def handle(self, *args, **options):
+        resultado = depurar_tokens_vencidos(
+            lote=options['lote'], pausa=options['pausa'], max_lotes=options['max_lotes']
+        )
+        self.stdout.write(
+            f"Outstanding borrados: {resultado['outstanding']} - blacklisted borrados: {resultado['blacklisted']} "
+            f"- lotes: {resultado['lotes']}"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Duración: {resultado['segundos']:.2f} s - {resultado['filas_por_segundo']} filas/s"
+        ))
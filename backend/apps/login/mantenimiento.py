@@ -0,0 +1,51 @@
+"""
+Depuración de la lista negra de JWT.
+
+Con ROTATE_REFRESH_TOKENS y BLACKLIST_AFTER_ROTATION cada login y cada
+refresh agregan filas a token_blacklist_outstandingtoken (y a
+blacklistedtoken). Un token vencido ya no se puede usar, así que sus filas
+se pueden borrar. Se borra por lotes cortos, cada uno en su propia
+transacción, para no bloquear las tablas que usa el refresh.
+"""
+import time
+
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+LOTE_DEFAULT = 1000
+
+
+def depurar_tokens_vencidos(lote=LOTE_DEFAULT, pausa=0.0, max_lotes=None, ahora=None):
+    """
+    Borra los tokens vencidos de a `lote` filas, con `pausa` segundos entre lotes.
+    Devuelve {'outstanding', 'blacklisted', 'lotes', 'segundos', 'filas_por_segundo'}.
+    """
+    ahora = ahora or aware_utcnow()
+    resultado = {'outstanding': 0, 'blacklisted': 0, 'lotes': 0}
+    inicio = time.perf_counter()
+
+    while max_lotes is None or resultado['lotes'] < max_lotes:
+        # Los tokens se crean en orden de id y todos duran lo mismo: los vencidos
+        # están al principio de la PK y el LIMIT corta el recorrido enseguida
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=ahora)
+            .order_by('id').values_list('id', flat=True)[:lote]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            outstanding, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+        resultado['blacklisted'] += blacklisted
+        resultado['outstanding'] += outstanding
+        resultado['lotes'] += 1
+        if len(ids) < lote:
+            break
+        if pausa:
+            time.sleep(pausa)
+
+    resultado['segundos'] = round(time.perf_counter() - inicio, 3)
+    filas = resultado['outstanding'] + resultado['blacklisted']
+    resultado['filas_por_segundo'] = round(filas / resultado['segundos']) if resultado['segundos'] else filas
+    return resultado
@@ -81,7 +81,7 @@ class Empleado(models.Model):
             user.save()
             self.primer_login = True
             self.save()
-            logger.info(f"Usuario creado para empleado DNI: {self.dni_empleado}")
+            logger.info("Usuario creado para empleado DNI: %s", self.dni_empleado)
         return user
 
 @receiver(post_delete, sender=Empleado)
@@ -90,8 +90,8 @@ def eliminar_usuario_asociado(sender, instance, **kwargs):
     try:
         user = User.objects.get(username=instance.dni_empleado)
         user.delete()
-        logger.info(f"Usuario {user.username} eliminado automáticamente")
+        logger.info("Usuario %s eliminado automáticamente", user.username)
     except User.DoesNotExist:
-        logger.warning(f"No se encontró usuario para empleado {instance.dni_empleado}")
+        logger.warning("No se encontró usuario para empleado %s", instance.dni_empleado)
     except Exception as e:
-        logger.error(f"Error eliminando usuario para empleado {instance.dni_empleado}: {e}")
\ No newline at end of file
+        logger.error("Error eliminando usuario para empleado %s: %s", instance.dni_empleado, e)
\ No newline at end of file
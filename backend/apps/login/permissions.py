@@ -1,12 +1,79 @@
+import threading
+
 from rest_framework.permissions import BasePermission
-from .models import Empleado
+from .authentication import version_identidad
+from .identidad import identidad_de
+
+# Caché de roles por proceso: username -> (versión de identidad, rol).
+# La versión es la misma de los tokens (ver identidad.py): guardar un
+# Empleado o renombrar un Rol la renueva y la entrada queda obsoleta.
+MAX_ROLES_CACHEADOS = 10000
+
+_lock = threading.Lock()
+_roles = {}
+_contadores = {'claims': 0, 'hits': 0, 'misses': 0, 'obsoletos': 0}
+
+
+def _contar(evento):
+    with _lock:
+        _contadores[evento] += 1
+
+
+def resolver_rol(user):
+    """Rol del usuario: de los claims del token, de la caché del proceso o de la base"""
+    identidad = getattr(user, 'identidad', None)
+    if identidad is not None:
+        _contar('claims')
+        return identidad['rol']
+
+    username = user.username
+    version = version_identidad(username)
+    with _lock:
+        entrada = _roles.get(username)
+    if entrada is not None and entrada[0] == version:
+        _contar('hits')
+        return entrada[1]
+
+    _contar('obsoletos' if entrada is not None else 'misses')
+    identidad, _ = identidad_de(username)
+    rol = identidad['rol'].lower() if identidad else None
+    with _lock:
+        if len(_roles) >= MAX_ROLES_CACHEADOS:
+            _roles.clear()
+        _roles[username] = (version, rol)
+    return rol
+
+
+def estadisticas_roles():
+    with _lock:
+        estadisticas = dict(_contadores, cacheados=len(_roles))
+    resueltos = estadisticas['claims'] + estadisticas['hits'] + estadisticas['misses'] + estadisticas['obsoletos']
+    aciertos = estadisticas['claims'] + estadisticas['hits']
+    estadisticas['hit_rate'] = round(aciertos / resueltos, 4) if resueltos else None
+    return estadisticas
+
+
+class HasRole(BasePermission):
+    """
+    Permite el acceso sólo a los roles indicados:
+        permission_classes = [IsAuthenticated, HasRole('director', 'secretario')]
+    """
+    roles = ()
+
+    def __init__(self, *roles):
+        if roles:
+            self.roles = tuple(rol.lower() for rol in roles)
+
+    def __call__(self):
+        # DRF instancia cada elemento de permission_classes
+        return self
 
-class IsDirector(BasePermission):
     def has_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
             return False
-        try:
-            empleado = Empleado.objects.get(dni_empleado=request.user.username)
-            return empleado.id_rol.nombre_rol.lower() == "director"
-        except Empleado.DoesNotExist:
-            return False
\ No newline at end of file
+        rol = resolver_rol(request.user)
+        return rol is not None and rol.lower() in self.roles
+
+
+class IsDirector(HasRole):
+    roles = ('director',)
@@ -1,4 +1,9 @@
+from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .identidad import aplicar_claims, identidad_de
 from .models import Rol, Empleado
 import re
 
@@ -119,4 +124,34 @@ class EmpleadoSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         instance.sync_user()
-        return instance
\ No newline at end of file
+        return instance
+
+
+class IdentidadTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh que vuelve a leer la identidad desde la base y la pone en los claims"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        identidad, activo = identidad_de(user.username)
+        if identidad is None:
+            raise AuthenticationFailed('Usuario no encontrado', 'usuario_no_encontrado')
+        if not activo:
+            raise AuthenticationFailed('Cuenta desactivada', 'cuenta_desactivada')
+        aplicar_claims(refresh, user, identidad)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
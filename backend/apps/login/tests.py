@@ -1,3 +1,182 @@
-from django.test import TestCase
+from datetime import timedelta
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.secretarios.models import Tutor
+
+from .mantenimiento import depurar_tokens_vencidos
+from .models import Empleado, Rol
+from .permissions import HasRole, resolver_rol
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class IdentidadEnTokenTests(TestCase):
+    """La identidad viaja en los claims del JWT: check_auth no consulta la base"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.rol = Rol.objects.create(nombre_rol='director')
+        self.empleado = Empleado.objects.create(
+            dni_empleado='20000000', nombre_empleado='Juan', apellido_empleado='Diaz',
+            genero_empleado='M', id_rol=self.rol, correo_empleado='juan@mail.com'
+        )
+        User.objects.create_user(username='20000000', password='clave')
+
+    def login(self):
+        response = self.client.post('/api/login/login/', {'dni': '20000000', 'password': 'clave'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response.data
+
+    def test_check_auth_sin_consultas(self):
+        self.login()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/login/auth/check/')
+        self.assertEqual(response.data['rol'], 'director')
+        self.assertEqual(response.data['id_empleado'], self.empleado.id_empleado)
+        self.assertEqual(response.data['nombre'], 'Juan')
+        self.assertTrue(response.data['primer_login'])
+
+    def test_modificar_empleado_invalida_el_token(self):
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.empleado.nombre_empleado = 'Juan Carlos'
+            self.empleado.save()
+        self.assertEqual(self.client.get('/api/login/auth/check/').status_code, 401)
+
+        response = self.client.post('/api/login/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get('/api/login/auth/check/').data['nombre'], 'Juan Carlos')
+
+    def test_sin_version_guardada_se_verifica_en_la_base(self):
+        # Reinicio / desalojo de la caché: la versión guardada desaparece
+        self.login()
+        cache.clear()
+        self.assertEqual(self.client.get('/api/login/auth/check/').status_code, 200)
+
+        # Cambios que la caché no registró (otro proceso, caché vaciada) revocan el token igual
+        cache.clear()
+        Empleado.objects.filter(pk=self.empleado.pk).update(id_rol=Rol.objects.create(nombre_rol='secretario'))
+        self.assertEqual(self.client.get('/api/login/auth/check/').status_code, 401)
+
+        self.client.credentials()
+        self.login()
+        cache.clear()
+        Empleado.objects.filter(pk=self.empleado.pk).update(estado_empleado='Inactivo')
+        self.assertEqual(self.client.get('/api/login/auth/check/').status_code, 401)
+
+    def test_refresh_rechaza_cuenta_desactivada(self):
+        tokens = self.login()
+        self.empleado.estado_empleado = 'Inactivo'
+        self.empleado.save()
+        response = self.client.post('/api/login/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_cambiar_password_devuelve_tokens_actualizados(self):
+        self.login()
+        response = self.client.post('/api/login/cambiar-password/', {'nueva': 'nueva-clave'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertFalse(self.client.get('/api/login/auth/check/').data['primer_login'])
+        self.assertTrue(User.objects.get(username='20000000').check_password('nueva-clave'))
+
+
+class HasRoleTests(TestCase):
+    """Resolución de roles con caché por proceso para usuarios sin claims"""
+
+    def setUp(self):
+        cache.clear()
+        self.director = Rol.objects.create(nombre_rol='director')
+        self.empleado = Empleado.objects.create(
+            dni_empleado='20000000', nombre_empleado='Juan', apellido_empleado='Diaz',
+            genero_empleado='M', id_rol=Rol.objects.create(nombre_rol='secretario'), correo_empleado='juan@mail.com'
+        )
+        self.user = User.objects.create_user(username='20000000')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cachea_el_rol_e_invalida_al_guardar_el_empleado(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(resolver_rol(self.user), 'secretario')
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver_rol(self.user), 'secretario')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.empleado.id_rol = self.director
+            self.empleado.save()
+        self.assertEqual(resolver_rol(self.user), 'director')
+
+    def test_has_role_en_vistas(self):
+        self.assertEqual(self.client.get('/api/login/empleados/').status_code, 403)
+        permiso = HasRole('Secretario', 'preceptor')
+        self.assertIs(permiso(), permiso)
+        self.assertTrue(permiso.has_permission(SimpleNamespace(user=self.user), None))
+
+
+class PBKDF2Rapido(PBKDF2PasswordHasher):
+    """PBKDF2 con pocas iteraciones para que los tests no tarden"""
+    iterations = 1000
+
+
+@override_settings(PASSWORD_HASHERS=['apps.login.tests.PBKDF2Rapido'])
+class LoginTests(TestCase):
+    """Login: identidad en una consulta, rehash transparente y Server-Timing"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Tutor.objects.create(
+            dni_tutor=30000000, nombre_tutor='Laura', apellido_tutor='Gomez',
+            telefono_tutor='3510000000', correo_tutor='laura@mail.com', genero_tutor='F'
+        )
+        # Hash viejo con menos iteraciones que las configuradas
+        user = User.objects.get(username='30000000')
+        user.password = PBKDF2Rapido().encode('clave', 'sal', iterations=10)
+        user.save()
+
+    def test_login_tutor(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post('/api/login/login/', {'dni': '30000000', 'password': 'clave'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rol'], 'tutor')
+        # Una sola consulta para empleado + rol + tutor
+        self.assertEqual(len([q for q in consultas if 'empleados' in q['sql'] or 'tutores' in q['sql']]), 1)
+
+        self.assertRegex(response['Server-Timing'], r'^hash;dur=[\d.]+;desc="authenticate", identidad;dur=[\d.]+;desc="empleado / tutor", tokens;dur=[\d.]+;desc="JWT", ')
+        self.assertTrue(User.objects.get(username='30000000').password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_empleado_gana_sobre_tutor_con_el_mismo_dni(self):
+        Empleado.objects.create(
+            dni_empleado='30000000', nombre_empleado='Laura', apellido_empleado='Gomez',
+            genero_empleado='F', id_rol=Rol.objects.create(nombre_rol='preceptor'), correo_empleado='laura@mail.com'
+        )
+        response = self.client.post('/api/login/login/', {'dni': '30000000', 'password': 'clave'}, format='json')
+        self.assertEqual(response.data['rol'], 'preceptor')
+
+
+class DepurarTokensTests(TestCase):
+    """Depuración por lotes de la lista negra de JWT"""
+
+    def test_borra_solo_los_vencidos(self):
+        ahora = timezone.now()
+        for i in range(5):
+            vencido = OutstandingToken.objects.create(jti=f'vencido-{i}', token='x', expires_at=ahora - timedelta(days=1))
+            if i % 2 == 0:
+                BlacklistedToken.objects.create(token=vencido)
+        vigente = OutstandingToken.objects.create(jti='vigente', token='x', expires_at=ahora + timedelta(days=1))
+        BlacklistedToken.objects.create(token=vigente)
+
+        resultado = depurar_tokens_vencidos(lote=2)
+        self.assertEqual((resultado['outstanding'], resultado['blacklisted'], resultado['lotes']), (5, 3, 3))
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['vigente'])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
@@ -15,6 +15,9 @@ urlpatterns = [
     # Refresh de JWT
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
+    # Estadísticas de la caché de roles (antes del router para no chocar con roles/<pk>/)
+    path('permisos/estadisticas/', views.roles_estadisticas, name='roles_estadisticas'),
+
     # CRUD de empleados y roles vía router
     path('', include(router.urls)),
 
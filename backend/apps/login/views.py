@@ -3,13 +3,15 @@ from django.contrib.auth.models import User
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework_simplejwt.tokens import RefreshToken
 from .models import Empleado, Rol
 from apps.secretarios.models import Tutor  # ✅ IMPORTAR TUTOR
 from .serializers import EmpleadoSerializer, RolSerializer
-from .permissions import IsDirector
+from .identidad import emitir_tokens, identidad_de, identidad_de_usuario
+from .permissions import IsDirector, estadisticas_roles
+from core.catalogos import CatalogoCacheMixin, respuesta_catalogo
+from core.server_timing import ServerTiming
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
@@ -21,99 +23,57 @@ class LoginView(APIView):
         if not dni or not password:
             return Response({"error": "DNI y contraseña requeridos"}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = authenticate(username=dni, password=password)
-        if not user:
-            return Response({"error": "Credenciales inválidas"}, status=status.HTTP_401_UNAUTHORIZED)
+        tiempos = ServerTiming()
 
-        # Primero verificar si es un empleado
-        try:
-            empleado = Empleado.objects.get(dni_empleado=dni)
-            if empleado.estado_empleado == 'Inactivo':
-                return Response({"error": "Cuenta desactivada"}, status=status.HTTP_403_FORBIDDEN)
-                
-            rol = empleado.id_rol.nombre_rol
-            nombre = empleado.nombre_empleado
-            apellido = empleado.apellido_empleado
-            primer_login = empleado.primer_login
-            
-        except Empleado.DoesNotExist:
-            # Si no es empleado, verificar si es tutor
-            try:
-                tutor = Tutor.objects.get(dni_tutor=int(dni))  # Convertir a int ya que en Tutor es IntegerField
-                if tutor.estado_tutor == 'Inactivo':
-                    return Response({"error": "Cuenta desactivada"}, status=status.HTTP_403_FORBIDDEN)
-                    
-                rol = 'tutor'
-                nombre = tutor.nombre_tutor
-                apellido = tutor.apellido_tutor
-                primer_login = tutor.primer_login
-                
-            except (Tutor.DoesNotExist, ValueError):
-                return Response({"error": "Usuario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
-
-        refresh = RefreshToken.for_user(user)
+        # authenticate() hashea la contraseña y, si el hasher por defecto o sus
+        # iteraciones cambiaron, la vuelve a guardar con el hash nuevo
+        with tiempos.medir('hash', 'authenticate'):
+            user = authenticate(username=dni, password=password)
+        if not user:
+            return tiempos.aplicar(Response({"error": "Credenciales inválidas"}, status=status.HTTP_401_UNAUTHORIZED))
+
+        # Empleado o tutor (con el rol) en una sola consulta: la identidad queda en los claims del token
+        with tiempos.medir('identidad', 'empleado / tutor'):
+            identidad, activo = identidad_de(user.username)
+        if identidad is None:
+            return tiempos.aplicar(Response({"error": "Usuario no encontrado"}, status=status.HTTP_404_NOT_FOUND))
+        if not activo:
+            return tiempos.aplicar(Response({"error": "Cuenta desactivada"}, status=status.HTTP_403_FORBIDDEN))
+
+        with tiempos.medir('tokens', 'JWT'):
+            refresh = emitir_tokens(user, identidad)
+            tokens = {"refresh": str(refresh), "access": str(refresh.access_token)}
         response_data = {
-            "refresh": str(refresh),
-            "access": str(refresh.access_token),
+            **tokens,
             "username": user.username,
             "dni": dni,
-            "rol": rol,
-            "nombre": nombre,
-            "apellido": apellido,
-            "primer_login": primer_login,
+            "rol": identidad["rol"],
+            "nombre": identidad["nombre"],
+            "apellido": identidad["apellido"],
+            "primer_login": identidad["primer_login"],
         }
 
-        if primer_login:
+        if identidad["primer_login"]:
             response_data["message"] = "Primer login, debe cambiar contraseña"
 
-        return Response(response_data, status=status.HTTP_200_OK)
+        return tiempos.aplicar(Response(response_data, status=status.HTTP_200_OK))
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def check_auth(request):
-    try:
-        empleado = Empleado.objects.get(dni_empleado=request.user.username)
-        rol = empleado.id_rol.nombre_rol
-        # ✅ AGREGAR INFORMACIÓN DEL EMPLEADO
-        return Response({
-            "id": request.user.id,
-            "username": request.user.username,
-            "rol": rol,
-            "id_empleado": empleado.id_empleado,  # ✅ NUEVO
-            "dni_empleado": empleado.dni_empleado,  # ✅ NUEVO
-            "nombre": empleado.nombre_empleado,  # ✅ NUEVO
-            "apellido": empleado.apellido_empleado,  # ✅ NUEVO
-            "primer_login": empleado.primer_login  # ✅ NUEVO
-        })
-    except Empleado.DoesNotExist:
-        try:
-            # Intentar buscar como tutor (convertir username a int)
-            tutor = Tutor.objects.get(dni_tutor=int(request.user.username))
-            rol = 'tutor'
-            # ✅ AGREGAR INFORMACIÓN DEL TUTOR
-            return Response({
-                "id": request.user.id,
-                "username": request.user.username,
-                "rol": rol,
-                "id_tutor": tutor.id_tutor,  # ✅ NUEVO
-                "dni_tutor": tutor.dni_tutor,  # ✅ NUEVO
-                "nombre": tutor.nombre_tutor,  # ✅ NUEVO
-                "apellido": tutor.apellido_tutor,  # ✅ NUEVO
-                "primer_login": tutor.primer_login  # ✅ NUEVO
-            })
-        except (Tutor.DoesNotExist, ValueError):
-            rol = None
-
+    # Con tokens emitidos por LoginView la identidad sale de los claims, sin consultas
+    identidad = identidad_de_usuario(request.user)
     return Response({
         "id": request.user.id,
         "username": request.user.username,
-        "rol": rol
+        **(identidad or {"rol": None}),
     })
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def cambiar_password(request):
-    user = request.user
+    # Con autenticación sin estado request.user no es un User de la base
+    user = User.objects.get(pk=request.user.id)
     nueva = request.data.get("nueva")
     
     if not nueva:
@@ -126,6 +86,7 @@ def cambiar_password(request):
     user.save()
 
     # Actualizar primer_login tanto para empleados como tutores
+    # (la señal post_save invalida los tokens con el primer_login anterior)
     try:
         empleado = Empleado.objects.get(dni_empleado=user.username)
         empleado.primer_login = False
@@ -138,7 +99,14 @@ def cambiar_password(request):
         except (Tutor.DoesNotExist, ValueError):
             pass  # No es ni empleado ni tutor
 
-    return Response({"message": "Contraseña actualizada correctamente"})
+    response_data = {"message": "Contraseña actualizada correctamente"}
+    identidad, _ = identidad_de(user.username)
+    if identidad is not None:
+        # Tokens nuevos con los claims actualizados
+        refresh = emitir_tokens(user, identidad)
+        response_data["refresh"] = str(refresh)
+        response_data["access"] = str(refresh.access_token)
+    return Response(response_data)
 
 class EmpleadoView(viewsets.ModelViewSet):
     queryset = Empleado.objects.all()
@@ -183,16 +151,25 @@ class EmpleadoView(viewsets.ModelViewSet):
             return Response({"error": f"Error al eliminar empleado: {str(e)}"}, 
                           status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class RolView(viewsets.ModelViewSet):
+class RolView(CatalogoCacheMixin, viewsets.ModelViewSet):
     queryset = Rol.objects.all()
     serializer_class = RolSerializer
     permission_classes = [IsAuthenticated]
+    catalogo = 'roles'
 
     def list(self, request, *args, **kwargs):
-        try:
-            roles = self.get_queryset()
-            serializer = self.get_serializer(roles, many=True)
-            return Response(serializer.data)
-        except Exception as e:
-            return Response({"error": f"Error al listar roles: {str(e)}"}, 
-                          status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        def listar():
+            try:
+                roles = self.get_queryset()
+                serializer = self.get_serializer(roles, many=True)
+                return Response(serializer.data)
+            except Exception as e:
+                return Response({"error": f"Error al listar roles: {str(e)}"}, 
+                              status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return respuesta_catalogo(request, self.catalogo, listar)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def roles_estadisticas(request):
+    """Aciertos de la resolución de roles: claims del token, caché del proceso o base"""
+    return Response(estadisticas_roles())
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PreceptoresRectoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.preceptores_rectores'
+
+    def ready(self):
+        # Receptores que mantienen ResumenIncidencias y SuspensionAlumno
+        # e invalidan los resúmenes de asistencia y los paneles de tutores
+        from . import asistencias, estadisticas, panel_tutor, suspensiones  # noqa: F401
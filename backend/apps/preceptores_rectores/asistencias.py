@@ -0,0 +1,242 @@
+"""
+Toma de asistencia en lote para una reunión.
+
+La carga sobre `asistencias` es idempotente: (id_reunion, id_tutor) es
+único, así que las filas se escriben con un upsert (bulk_create con
+update_conflicts: ON DUPLICATE KEY UPDATE en MySQL, ON CONFLICT en SQLite
+/ PostgreSQL) y un reintento sólo vuelve a pisar los mismos valores.
+
+precargar_ausentes() deja en "NO" a todos los tutores de los alumnos
+activos de los grados indicados con un único INSERT ... SELECT, para que
+después sólo haya que marcar a los que llegan.
+
+resumen_reuniones() e historial_tutores() calculan los totales con una
+consulta agrupada cada uno y quedan cacheados por filtro hasta la próxima
+escritura en asistencias / reuniones / tutores / empleados (versión
+'asistencias' de core/catalogos.py).
+"""
+import hashlib
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import CharField, Count, DateTimeField, Exists, F, IntegerField, Max, OuterRef, Q, Value
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.exceptions import ValidationError
+
+from apps.login.models import Empleado
+from apps.secretarios.models import AlumnoXGrado, AlumnoXTutor, Tutor
+from core.catalogos import invalidar_catalogo_al_confirmar, version_catalogo
+
+from .consultas import entero_param, fecha_param
+from .models import Asistencia, Reunion
+from .panel_tutor import invalidar_paneles_al_confirmar
+
+LOTE_ASISTENCIAS = 500
+PRESENTE = ('SÍ', 'SE RETIRÓ')
+# Llegadas de los presentes respecto de fecha_hora_reunion: (clave, minutos de demora máxima)
+DEMORAS = [('puntuales', 0), ('hasta_15_min', 15), ('hasta_30_min', 30)]
+DEMORA_MAYOR = 'mas_30_min'
+LLEGADAS = [clave for clave, _ in DEMORAS] + [DEMORA_MAYOR]
+# Clave del conteo en la respuesta -> estado_asistencia
+ESTADOS = {'si': 'SÍ', 'no': 'NO', 'se_retiro': 'SE RETIRÓ'}
+
+
+def registrar_asistencias(reunion, asistencias):
+    """
+    Upsert de [{id_tutor, estado_asistencia, fecha_llegada_asistencia}]
+    para la reunión. Si un tutor se repite gana la última entrada; sin
+    fecha de llegada se usa la de la reunión. Devuelve la cantidad de filas.
+    """
+    por_tutor = {asistencia['id_tutor']: asistencia for asistencia in asistencias}
+    filas = [
+        Asistencia(
+            id_reunion=reunion,
+            id_tutor_id=id_tutor,
+            estado_asistencia=asistencia['estado_asistencia'],
+            fecha_llegada_asistencia=asistencia.get('fecha_llegada_asistencia') or reunion.fecha_hora_reunion,
+        )
+        for id_tutor, asistencia in por_tutor.items()
+    ]
+    invalidar_catalogo_al_confirmar('asistencias')
+    invalidar_paneles_al_confirmar(por_tutor)
+    # MySQL no acepta la clave del conflicto: ON DUPLICATE KEY usa la única que hay
+    unique_fields = ['id_reunion', 'id_tutor'] if connection.features.supports_update_conflicts_with_target else None
+    Asistencia.objects.bulk_create(
+        filas,
+        batch_size=LOTE_ASISTENCIAS,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=['estado_asistencia', 'fecha_llegada_asistencia'],
+    )
+    return len(filas)
+
+
+def precargar_ausentes(reunion, id_grados):
+    """
+    Inserta "NO" para cada tutor de los alumnos activos de `id_grados` que
+    todavía no tenga asistencia en la reunión. Devuelve las filas insertadas.
+    """
+    tutores = (
+        AlumnoXTutor.objects.order_by()
+        .filter(
+            Exists(AlumnoXGrado.objects.filter(id_alumno=OuterRef('id_alumno'), id_grado__in=id_grados, activo=True)),
+            ~Exists(Asistencia.objects.filter(id_reunion=reunion, id_tutor=OuterRef('id_tutor'))),
+        )
+        .annotate(
+            reunion=Value(reunion.pk, output_field=IntegerField()),
+            tutor=F('id_tutor'),
+            llegada=Value(reunion.fecha_hora_reunion, output_field=DateTimeField()),
+            estado=Value('NO', output_field=CharField()),
+        )
+        .values('reunion', 'tutor', 'llegada', 'estado')
+        .distinct()
+    )
+    select, params = tutores.query.sql_with_params()
+    tabla = connection.ops.quote_name(Asistencia._meta.db_table)
+    columnas = ', '.join(connection.ops.quote_name(c) for c in [
+        'id_reunion', 'id_tutor', 'fecha_llegada_asistencia', 'estado_asistencia'
+    ])
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {tabla} ({columnas}) {select}', params)
+        insertadas = cursor.rowcount
+        if insertadas:
+            # No se sabe qué tutores entraron: se invalidan todos los paneles
+            invalidar_catalogo_al_confirmar('asistencias', 'panel_tutores')
+    return insertadas
+
+
+@receiver([post_save, post_delete], sender=Asistencia)
+@receiver([post_save, post_delete], sender=Reunion)
+@receiver([post_save, post_delete], sender=Tutor)
+@receiver([post_save, post_delete], sender=Empleado)
+def invalidar_resumenes(sender, raw=False, **kwargs):
+    if not raw:
+        invalidar_catalogo_al_confirmar('asistencias')
+
+
+def _filtros_reunion(params, prefijo=''):
+    """tipo_reunion, id_empleado y desde / hasta (fecha de la reunión, inclusive)"""
+    filtros = {}
+    tipo = params.get('tipo_reunion', '').strip()
+    if tipo:
+        if tipo not in dict(Reunion.TIPO_REUNION_OPCIONES):
+            raise ValidationError(f"tipo_reunion admite {', '.join(dict(Reunion.TIPO_REUNION_OPCIONES))}")
+        filtros[f'{prefijo}tipo_reunion'] = tipo
+    id_empleado = entero_param(params, 'id_empleado')
+    if id_empleado is not None:
+        filtros[f'{prefijo}id_empleado'] = id_empleado
+    desde, hasta = fecha_param(params, 'desde'), fecha_param(params, 'hasta')
+    if desde and hasta and desde > hasta:
+        raise ValidationError('desde no puede ser posterior a hasta')
+    if desde:
+        filtros[f'{prefijo}fecha_hora_reunion__date__gte'] = desde
+    if hasta:
+        filtros[f'{prefijo}fecha_hora_reunion__date__lte'] = hasta
+    return filtros
+
+
+def _cacheado(nombre, params, calcular):
+    """Resultado de calcular() por combinación de parámetros, con la versión 'asistencias'"""
+    consulta = '&'.join(f'{clave}={",".join(valores)}' for clave, valores in sorted(params.lists()))
+    clave = 'asistencias:{}:{}:{}'.format(
+        nombre, version_catalogo('asistencias'), hashlib.sha1(consulta.encode()).hexdigest()
+    )
+    datos = cache.get(clave)
+    if datos is None:
+        datos = calcular()
+        cache.set(clave, datos, timeout=None)
+    return datos
+
+
+def _conteos(prefijo, inicio):
+    """
+    Conteos por estado y por demora de llegada de los presentes. `prefijo`
+    lleva de la tabla agrupada a asistencias; `inicio`, a fecha_hora_reunion.
+    """
+    def condicion(**kwargs):
+        return Q(**{f'{prefijo}{campo}': valor for campo, valor in kwargs.items()})
+
+    presente = condicion(estado_asistencia__in=PRESENTE)
+    conteos = {'total': Count(f'{prefijo}pk')}
+    for clave, estado in ESTADOS.items():
+        conteos[clave] = Count(f'{prefijo}pk', filter=condicion(estado_asistencia=estado))
+    anterior = None
+    for clave, minutos in DEMORAS:
+        filtro = presente & condicion(fecha_llegada_asistencia__lte=inicio + timedelta(minutes=minutos))
+        if anterior is not None:
+            filtro &= condicion(fecha_llegada_asistencia__gt=inicio + timedelta(minutes=anterior))
+        conteos[clave] = Count(f'{prefijo}pk', filter=filtro)
+        anterior = minutos
+    conteos[DEMORA_MAYOR] = Count(f'{prefijo}pk', filter=presente & condicion(
+        fecha_llegada_asistencia__gt=inicio + timedelta(minutes=anterior)
+    ))
+    return conteos
+
+
+def _agrupar(fila):
+    """Pasa los conteos planos de la fila a {asistencias, tasa_asistencia, llegadas}"""
+    total = fila.pop('total')
+    fila['asistencias'] = {clave: fila.pop(clave) for clave in ESTADOS}
+    fila['asistencias']['total'] = total
+    presentes = fila['asistencias']['si'] + fila['asistencias']['se_retiro']
+    fila['tasa_asistencia'] = round(presentes / total, 4) if total else None
+    fila['llegadas'] = {clave: fila.pop(clave) for clave in LLEGADAS}
+    return fila
+
+
+def resumen_reuniones(params):
+    """
+    Por reunión (filtrada por tipo_reunion, id_empleado, desde, hasta):
+    asistencias por estado, tasa de asistencia (SÍ + SE RETIRÓ sobre el
+    total) y distribución de las llegadas de los presentes. Una consulta.
+    """
+    filtros = _filtros_reunion(params)
+
+    def calcular():
+        conteos = _conteos('asistencia__', F('fecha_hora_reunion'))
+        filas = list(
+            Reunion.objects.filter(**filtros)
+            .values(
+                'id_reunion', 'fecha_hora_reunion', 'tipo_reunion', 'descripcion_reunion',
+                'id_empleado', 'id_empleado__nombre_empleado', 'id_empleado__apellido_empleado',
+            )
+            .annotate(**conteos)
+            .order_by('-fecha_hora_reunion', '-id_reunion')
+        )
+        totales = {clave: sum(fila[clave] for fila in filas) for clave in conteos}
+        return {
+            'count': len(filas),
+            'totales': _agrupar(totales),
+            'reuniones': [_agrupar(fila) for fila in filas],
+        }
+
+    return _cacheado('reuniones', params, calcular)
+
+
+def historial_tutores(params):
+    """
+    Por tutor (opcionalmente ?id_tutor=): reuniones convocadas, asistencias
+    por estado, tasa y fecha de la última reunión a la que asistió, sobre
+    las reuniones que pasan los mismos filtros que resumen_reuniones. Una consulta.
+    """
+    filtros = _filtros_reunion(params, prefijo='id_reunion__')
+    id_tutor = entero_param(params, 'id_tutor')
+    if id_tutor is not None:
+        filtros['id_tutor'] = id_tutor
+
+    def calcular():
+        conteos = _conteos('', F('id_reunion__fecha_hora_reunion'))
+        filas = list(
+            Asistencia.objects.filter(**filtros)
+            .values('id_tutor', 'id_tutor__dni_tutor', 'id_tutor__nombre_tutor', 'id_tutor__apellido_tutor')
+            .annotate(
+                **conteos,
+                ultima_asistencia=Max('id_reunion__fecha_hora_reunion', filter=Q(estado_asistencia__in=PRESENTE)),
+            )
+            .order_by('id_tutor__apellido_tutor', 'id_tutor__nombre_tutor', 'id_tutor')
+        )
+        return {'count': len(filas), 'tutores': [_agrupar(fila) for fila in filas]}
+
+    return _cacheado('tutores', params, calcular)
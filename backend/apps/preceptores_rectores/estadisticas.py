@@ -0,0 +1,191 @@
+"""
+Estadísticas de incidencias para dirección: medidas, suspensiones y días
+de suspensión por grado, tipo de incidencia, lugar y mes.
+
+Se leen de ResumenIncidencias, que se mantiene de forma incremental en la
+misma transacción que cada alta, modificación o baja de MedidaXAlumno
+(MedidaXAlumno.save es atómico y las bajas corren dentro de la transacción
+del Collector). Las operaciones masivas que no pasan por save() / delete()
+(bulk_create, QuerySet.update) tienen que llamar a registrar_medidas.
+
+El grado es el grado activo del alumno al momento de registrar la medida y
+queda guardado en la medida (MedidaXAlumno.id_grado): las modificaciones y
+bajas restan de la misma clave bajo la que se sumó, aunque el alumno haya
+cambiado de grado (pase de año) o se haya dado de baja. reconstruir() agrupa
+por esa misma columna.
+"""
+from collections import defaultdict
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.signals import pre_delete, pre_save, post_save
+from django.dispatch import receiver
+from rest_framework.exceptions import ValidationError
+
+from apps.secretarios.models import AlumnoXGrado
+
+from .consultas import entero_param
+from .models import Incidencia, MedidaXAlumno, ResumenIncidencias
+
+AGRUPACIONES = {
+    'grado': ('id_grado', 'id_grado__nombre_grado'),
+    'tipo': ('id_tipo_incidencia', 'id_tipo_incidencia__tipo_incidencia_nombre'),
+    'lugar': ('id_lugar', 'id_lugar__nombre_lugar'),
+    'mes': ('mes',),
+}
+
+
+def asignar_grados(medidas):
+    """
+    Guarda en cada medida el grado activo de su alumno (una consulta). Las
+    altas masivas (bulk_create) la llaman antes de insertar; save() lo hace
+    en recordar_medida_anterior.
+    """
+    medidas = list(medidas)
+    if not medidas:
+        return
+    # Con más de una inscripción activa gana la más vieja, igual que la migración 0005
+    grados = dict(
+        AlumnoXGrado.objects.filter(id_alumno__in={m.id_alumno_id for m in medidas}, activo=True)
+        .order_by('-id_alumno_x_grado').values_list('id_alumno_id', 'id_grado_id')
+    )
+    for medida in medidas:
+        medida.id_grado_id = grados.get(medida.id_alumno_id)
+
+
+def registrar_medidas(medidas, signo=1):
+    """
+    Suma (signo=1) o resta (signo=-1) las medidas al resumen, en el grado
+    guardado en cada medida. Resuelve los tipos con una consulta.
+    """
+    medidas = list(medidas)
+    if not medidas:
+        return
+    tipos = dict(Incidencia.objects.filter(
+        pk__in={m.incidencia_id for m in medidas}
+    ).values_list('id_incidencia', 'tipo_incidencia_id'))
+
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for medida in medidas:
+        clave = (medida.id_grado_id, tipos[medida.incidencia_id], medida.id_lugar_id,
+                 medida.fecha_medida.replace(day=1))
+        dias = max(medida.cantidad_dias or 0, 0)
+        delta = deltas[clave]
+        delta[0] += signo
+        delta[1] += signo if dias > 0 else 0
+        delta[2] += signo * dias
+    ResumenIncidencias.objects.aplicar(deltas)
+
+
+@receiver(pre_save, sender=MedidaXAlumno)
+def recordar_medida_anterior(sender, instance, raw=False, **kwargs):
+    """
+    Antes de un UPDATE guarda la fila vieja para restarla del resumen. La
+    medida conserva el grado con el que se registró; sólo se resuelve de
+    nuevo en el alta o si cambia el alumno.
+    """
+    instance._medida_anterior = None
+    if raw:
+        return
+    anterior = None
+    if instance.pk is not None and not instance._state.adding:
+        anterior = MedidaXAlumno.objects.select_for_update().filter(pk=instance.pk).first()
+    instance._medida_anterior = anterior
+    if anterior is not None and anterior.id_alumno_id == instance.id_alumno_id:
+        instance.id_grado_id = anterior.id_grado_id
+    elif anterior is not None or instance.id_grado_id is None:
+        asignar_grados([instance])
+
+
+@receiver(post_save, sender=MedidaXAlumno)
+def actualizar_resumen_al_guardar(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_medida_anterior', None)
+    if anterior is not None:
+        registrar_medidas([anterior], signo=-1)
+    registrar_medidas([instance])
+
+
+@receiver(pre_delete, sender=MedidaXAlumno)
+def actualizar_resumen_al_borrar(sender, instance, **kwargs):
+    registrar_medidas([instance], signo=-1)
+
+
+def reconstruir():
+    """
+    Regenera ResumenIncidencias desde medidas_x_alumnos con un único
+    INSERT ... SELECT ... GROUP BY. Devuelve la cantidad de filas del resumen.
+    """
+    agrupado = (
+        MedidaXAlumno.objects.order_by()
+        .annotate(
+            grado=F('id_grado'),
+            tipo=Subquery(Incidencia.objects.filter(pk=OuterRef('incidencia')).values('tipo_incidencia')[:1]),
+            lugar=F('id_lugar'),
+            mes_medida=TruncMonth('fecha_medida'),
+        )
+        .values('grado', 'tipo', 'lugar', 'mes_medida')
+        .annotate(
+            medidas=Count('pk'),
+            suspensiones=Count('pk', filter=Q(cantidad_dias__gt=0)),
+            dias=Coalesce(Sum('cantidad_dias', filter=Q(cantidad_dias__gt=0)), Value(0)),
+        )
+    )
+    select, params = agrupado.query.sql_with_params()
+    tabla = connection.ops.quote_name(ResumenIncidencias._meta.db_table)
+    columnas = ', '.join(connection.ops.quote_name(c) for c in [
+        'id_grado', 'id_tipo_incidencia', 'id_lugar', 'mes', 'cantidad_medidas', 'cantidad_suspensiones', 'dias_suspension'
+    ])
+    with transaction.atomic(), connection.cursor() as cursor:
+        ResumenIncidencias.objects.all().delete()
+        cursor.execute(f'INSERT INTO {tabla} ({columnas}) {select}', params)
+    return ResumenIncidencias.objects.count()
+
+
+def _mes(params, nombre):
+    valor = params.get(nombre, '').strip()
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(f'{valor}-01')
+    except ValueError:
+        raise ValidationError(f'{nombre} debe tener el formato AAAA-MM')
+
+
+def consultar(params):
+    """
+    Totales del resumen filtrados por id_grado / id_tipo_incidencia / id_lugar
+    / desde / hasta (AAAA-MM, inclusive) y agrupados por ?agrupar=
+    (grado, tipo, lugar y/o mes separados por coma; por defecto tipo).
+    """
+    filtros = {}
+    for parametro in ('id_grado', 'id_tipo_incidencia', 'id_lugar'):
+        valor = entero_param(params, parametro)
+        if valor is not None:
+            filtros[parametro] = valor
+    desde, hasta = _mes(params, 'desde'), _mes(params, 'hasta')
+    if desde:
+        filtros['mes__gte'] = desde
+    if hasta:
+        filtros['mes__lte'] = hasta
+
+    agrupar = [clave.strip() for clave in params.get('agrupar', 'tipo').split(',') if clave.strip()]
+    invalidas = [clave for clave in agrupar if clave not in AGRUPACIONES]
+    if invalidas:
+        raise ValidationError(f"agrupar admite {', '.join(AGRUPACIONES)}; no {', '.join(invalidas)}")
+
+    resumen = ResumenIncidencias.objects.filter(**filtros)
+    totales = dict(
+        cantidad_medidas=Coalesce(Sum('cantidad_medidas'), 0),
+        cantidad_suspensiones=Coalesce(Sum('cantidad_suspensiones'), 0),
+        dias_suspension=Coalesce(Sum('dias_suspension'), 0),
+    )
+    campos = [campo for clave in agrupar for campo in AGRUPACIONES[clave]]
+    if not campos:
+        return {'totales': resumen.aggregate(**totales), 'filas': []}
+    # Los totales salen de las mismas filas agrupadas: una sola consulta
+    filas = list(resumen.values(*campos).annotate(**totales).order_by(*campos))
+    return {'totales': {campo: sum(fila[campo] for fila in filas) for campo in totales}, 'filas': filas}
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.preceptores_rectores import estadisticas, suspensiones
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenera resumen_incidencias (un único INSERT ... SELECT) y suspensiones_alumnos '
+        'desde medidas_x_alumnos. '
+        'Correrlo después de cargas masivas que no actualizaron el resumen.'
+    )
+
+    def handle(self, *args, **options):
+        for nombre, reconstruir in [('Resumen', estadisticas.reconstruir), ('Suspensiones', suspensiones.reconstruir)]:
+            inicio = time.perf_counter()
+            filas = reconstruir()
+            self.stdout.write(self.style.SUCCESS(
+                f'{nombre} regenerado: {filas} filas en {time.perf_counter() - inicio:.2f} s'
+            ))
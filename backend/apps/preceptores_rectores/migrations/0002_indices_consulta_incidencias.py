@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# medidas_x_alumnos y alumnos_x_grados no son managed: migrate no crea los
+# índices declarados en Meta.indexes, así que se crean acá. Van escritos en
+# la migración (tabla, nombre, columnas) porque el estado histórico de estos
+# modelos no tiene sus FK.
+INDICES = [
+    ('medidas_x_alumnos', 'medida_fecha_idx', ['fecha_medida', 'medida_alumno', 'cantidad_dias']),
+    ('medidas_x_alumnos', 'medida_alumno_fecha_idx', ['id_alumno', 'fecha_medida', 'medida_alumno', 'cantidad_dias']),
+    ('medidas_x_alumnos', 'medida_incid_fecha_idx', ['id_incidencia', 'fecha_medida', 'medida_alumno', 'cantidad_dias']),
+    ('medidas_x_alumnos', 'medida_lugar_fecha_idx', ['id_lugar', 'fecha_medida', 'medida_alumno', 'cantidad_dias']),
+    ('medidas_x_alumnos', 'medida_empleado_fecha_idx', ['id_empleado', 'fecha_medida', 'medida_alumno', 'cantidad_dias']),
+    ('alumnos_x_grados', 'alumno_grado_activo_idx', ['id_grado', 'activo', 'id_alumno']),
+]
+
+
+def crear_indices(apps, schema_editor):
+    nombre_sql = schema_editor.quote_name
+    for tabla, nombre, columnas in INDICES:
+        schema_editor.execute('CREATE INDEX %s ON %s (%s)' % (
+            nombre_sql(nombre), nombre_sql(tabla), ', '.join(map(nombre_sql, columnas))
+        ))
+
+
+def borrar_indices(apps, schema_editor):
+    for tabla, nombre, _ in INDICES:
+        schema_editor.execute(schema_editor.sql_delete_index % {
+            'name': schema_editor.quote_name(nombre), 'table': schema_editor.quote_name(tabla),
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preceptores_rectores', '0001_initial'),
+        ('secretarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
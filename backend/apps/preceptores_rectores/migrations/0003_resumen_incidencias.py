@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preceptores_rectores', '0002_indices_consulta_incidencias'),
+        ('secretarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenIncidencias',
+            fields=[
+                ('id_resumen', models.AutoField(primary_key=True, serialize=False)),
+                ('mes', models.DateField()),
+                ('cantidad_medidas', models.IntegerField(default=0)),
+                ('cantidad_suspensiones', models.IntegerField(default=0)),
+                ('dias_suspension', models.IntegerField(default=0)),
+                ('id_grado', models.ForeignKey(db_column='id_grado', null=True, on_delete=django.db.models.deletion.CASCADE, to='secretarios.grado')),
+                ('id_lugar', models.ForeignKey(db_column='id_lugar', on_delete=django.db.models.deletion.CASCADE, to='preceptores_rectores.lugar')),
+                ('id_tipo_incidencia', models.ForeignKey(db_column='id_tipo_incidencia', on_delete=django.db.models.deletion.CASCADE, to='preceptores_rectores.tipoincidencia')),
+            ],
+            options={
+                'db_table': 'resumen_incidencias',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('id_grado', 'id_tipo_incidencia', 'id_lugar', 'mes'), name='resumen_incidencias_clave')],
+            },
+        ),
+    ]
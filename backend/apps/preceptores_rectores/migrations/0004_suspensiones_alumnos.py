@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# hasta = fecha_medida + cantidad_dias, como suspensiones.intervalo()
+FIN_SUSPENSION = {
+    'mysql': 'DATE_ADD(fecha_medida, INTERVAL cantidad_dias DAY)',
+    'sqlite': "date(fecha_medida, '+' || cantidad_dias || ' days')",
+}
+
+
+def poblar_suspensiones(apps, schema_editor):
+    # SQL escrito en la migración: el estado histórico de medidas_x_alumnos
+    # (no managed) no tiene sus FK y el código de suspensiones.py puede cambiar
+    hasta = FIN_SUSPENSION.get(schema_editor.connection.vendor, 'fecha_medida + cantidad_dias')
+    schema_editor.execute(
+        'INSERT INTO suspensiones_alumnos (medida_alumno, id_alumno, desde, hasta)'
+        f' SELECT medida_alumno, id_alumno, fecha_medida, {hasta}'
+        ' FROM medidas_x_alumnos WHERE cantidad_dias > 0'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preceptores_rectores', '0003_resumen_incidencias'),
+        ('secretarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuspensionAlumno',
+            fields=[
+                ('id_medida_x_alumno', models.OneToOneField(db_column='medida_alumno', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='suspension', serialize=False, to='preceptores_rectores.medidaxalumno')),
+                ('desde', models.DateField()),
+                ('hasta', models.DateField()),
+                ('id_alumno', models.ForeignKey(db_column='id_alumno', on_delete=django.db.models.deletion.CASCADE, to='secretarios.alumno')),
+            ],
+            options={
+                'db_table': 'suspensiones_alumnos',
+                'managed': True,
+                'indexes': [models.Index(fields=['hasta', 'desde', 'id_alumno'], name='suspension_vigencia_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_suspensiones, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def agregar_columna(apps, schema_editor):
+    # medidas_x_alumnos no es managed: AddField sólo cambia el estado y la
+    # columna se agrega acá con el modelo histórico
+    MedidaXAlumno = apps.get_model('preceptores_rectores', 'MedidaXAlumno')
+    with schema_editor.connection.cursor() as cursor:
+        columnas = {
+            c.name for c in schema_editor.connection.introspection.get_table_description(cursor, 'medidas_x_alumnos')
+        }
+    if 'id_grado' not in columnas:
+        schema_editor.add_field(MedidaXAlumno, MedidaXAlumno._meta.get_field('id_grado'))
+    # Las medidas existentes quedan en el grado activo de hoy, igual que las
+    # contaba el resumen hasta ahora (con más de una inscripción activa, la más vieja)
+    schema_editor.execute(
+        'UPDATE medidas_x_alumnos SET id_grado = ('
+        ' SELECT axg.id_grado FROM alumnos_x_grados axg'
+        ' WHERE axg.id_alumno = medidas_x_alumnos.id_alumno AND axg.activo = %s'
+        ' ORDER BY axg.id_alumno_x_grado LIMIT 1'
+        ')',
+        [True],
+    )
+
+
+def quitar_columna(apps, schema_editor):
+    # SQLite no borra una columna con FK sin rehacer la tabla, y el estado
+    # histórico no tiene las demás FK: la rehecha las perdería. La columna
+    # (nullable) queda y agregar_columna la reutiliza.
+    if schema_editor.connection.vendor == 'sqlite':
+        return
+    MedidaXAlumno = apps.get_model('preceptores_rectores', 'MedidaXAlumno')
+    schema_editor.remove_field(MedidaXAlumno, MedidaXAlumno._meta.get_field('id_grado'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preceptores_rectores', '0004_suspensiones_alumnos'),
+        ('secretarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medidaxalumno',
+            name='id_grado',
+            field=models.ForeignKey(blank=True, db_column='id_grado', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='medidas', to='secretarios.grado'),
+        ),
+        migrations.RunPython(agregar_columna, quitar_columna),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Primer día del mes de la medida, como TruncMonth en estadisticas.reconstruir()
+INICIO_MES = {
+    'mysql': 'DATE_SUB(m.fecha_medida, INTERVAL DAYOFMONTH(m.fecha_medida) - 1 DAY)',
+    'sqlite': "date(m.fecha_medida, 'start of month')",
+}
+
+
+def poblar_resumen(apps, schema_editor):
+    # 0003 crea resumen_incidencias vacía y las señales sólo aplican deltas:
+    # se carga con el mismo INSERT ... SELECT ... GROUP BY que
+    # estadisticas.reconstruir(), escrito acá para no depender del código
+    # actual. Va después de 0005 porque agrupa por medidas_x_alumnos.id_grado.
+    mes = INICIO_MES.get(schema_editor.connection.vendor, "CAST(date_trunc('month', m.fecha_medida) AS date)")
+    schema_editor.execute('DELETE FROM resumen_incidencias')
+    schema_editor.execute(
+        'INSERT INTO resumen_incidencias'
+        ' (id_grado, id_tipo_incidencia, id_lugar, mes, cantidad_medidas, cantidad_suspensiones, dias_suspension)'
+        f' SELECT m.id_grado, i.id_tipo_incidencia, m.id_lugar, {mes}, COUNT(*),'
+        ' SUM(CASE WHEN m.cantidad_dias > 0 THEN 1 ELSE 0 END),'
+        ' SUM(CASE WHEN m.cantidad_dias > 0 THEN m.cantidad_dias ELSE 0 END)'
+        ' FROM medidas_x_alumnos m INNER JOIN incidencias i ON i.id_incidencia = m.id_incidencia'
+        f' GROUP BY m.id_grado, i.id_tipo_incidencia, m.id_lugar, {mes}'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('preceptores_rectores', '0005_grado_medida'),
+    ]
+
+    operations = [
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from datetime import date
 from apps.login.models import Empleado
 from rest_framework import viewsets, filters
@@ -50,14 +50,36 @@ class MedidaXAlumno(models.Model):
     fecha_medida = models.DateField(auto_now_add=True)
     cantidad_dias = models.IntegerField(default=0)
     descripcion_caso = models.CharField(max_length=255, blank=True, null=True)
+    # Grado activo del alumno al registrar la medida: la clave de ResumenIncidencias
+    # bajo la que se contó (estadisticas.py). La columna la agrega la migración 0005.
+    id_grado = models.ForeignKey(
+        Grado, on_delete=models.SET_NULL, db_column='id_grado', null=True, blank=True, related_name='medidas'
+    )
 
     class Meta:
         db_table = 'medidas_x_alumnos'
         ordering = ['-fecha_medida']
         managed = False
+        # Columna filtrada + el orden de la consulta de incidencias
+        # (-fecha_medida, -PK): filtro y paginación se resuelven en el índice.
+        # cantidad_dias al final lo vuelve cubriente para los conteos.
+        # Como la tabla no es managed, los crea la migración 0002.
+        indexes = [
+            models.Index(fields=['fecha_medida', 'id_medida_x_alumno', 'cantidad_dias'], name='medida_fecha_idx'),
+            models.Index(fields=['id_alumno', 'fecha_medida', 'id_medida_x_alumno', 'cantidad_dias'], name='medida_alumno_fecha_idx'),
+            models.Index(fields=['incidencia', 'fecha_medida', 'id_medida_x_alumno', 'cantidad_dias'], name='medida_incid_fecha_idx'),
+            models.Index(fields=['id_lugar', 'fecha_medida', 'id_medida_x_alumno', 'cantidad_dias'], name='medida_lugar_fecha_idx'),
+            models.Index(fields=['id_empleado', 'fecha_medida', 'id_medida_x_alumno', 'cantidad_dias'], name='medida_empleado_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"Medida #{self.id_medida_x_alumno} - {self.id_alumno} - {self.incidencia}"
+
+    def save(self, *args, **kwargs):
+        # Las señales de estadisticas.py actualizan ResumenIncidencias:
+        # en la misma transacción que el INSERT / UPDATE de la medida
+        with transaction.atomic():
+            super().save(*args, **kwargs)
     
     @property
     def es_suspension(self):
@@ -77,6 +99,96 @@ class MedidaXAlumno(models.Model):
         }
     
 
+class SuspensionAlumno(models.Model):
+    """
+    Intervalo de suspensión de cada medida con cantidad_dias > 0:
+    [desde, hasta) con desde = fecha_medida y hasta = desde + cantidad_dias.
+    La mantiene suspensiones.py; medidas_x_alumnos no tiene la fecha de fin
+    y no se puede indexar sobre una propiedad de Python.
+    """
+    id_medida_x_alumno = models.OneToOneField(
+        MedidaXAlumno, on_delete=models.CASCADE, primary_key=True, db_column='medida_alumno', related_name='suspension'
+    )
+    id_alumno = models.ForeignKey(Alumno, on_delete=models.CASCADE, db_column='id_alumno')
+    desde = models.DateField()
+    hasta = models.DateField()  # exclusivo: el alumno vuelve ese día
+
+    class Meta:
+        db_table = 'suspensiones_alumnos'
+        managed = True
+        # "Suspendidos el día D": hasta > D AND desde <= D. Las suspensiones
+        # son cortas, así que el rango hasta > D deja pocas filas
+        indexes = [
+            models.Index(fields=['hasta', 'desde', 'id_alumno'], name='suspension_vigencia_idx'),
+        ]
+
+    def __str__(self):
+        return f"Suspensión medida #{self.id_medida_x_alumno_id} - alumno {self.id_alumno_id} - {self.desde} a {self.hasta}"
+
+
+class ResumenIncidenciasQuerySet(models.QuerySet):
+    def aplicar(self, deltas):
+        """
+        Suma los deltas {(id_grado, id_tipo, id_lugar, mes): [medidas, suspensiones, dias]}
+        con UPDATE ... SET x = x + d; si la fila no existe todavía, la crea.
+        Una resta sin fila no crea nada: no hay medidas que descontar (el
+        resumen estaba vacío o desactualizado; lo corrige reconstruir()).
+        """
+        for (id_grado, id_tipo, id_lugar, mes), (medidas, suspensiones, dias) in deltas.items():
+            if not (medidas or suspensiones or dias):
+                continue
+            clave = dict(id_grado_id=id_grado, id_tipo_incidencia_id=id_tipo, id_lugar_id=id_lugar, mes=mes)
+            incrementos = dict(
+                cantidad_medidas=models.F('cantidad_medidas') + medidas,
+                cantidad_suspensiones=models.F('cantidad_suspensiones') + suspensiones,
+                dias_suspension=models.F('dias_suspension') + dias,
+            )
+            if self.filter(**clave).update(**incrementos):
+                if medidas < 0:
+                    # Sin medidas la fila no aporta nada: se borra como si nunca hubiera existido
+                    self.filter(**clave, cantidad_medidas__lte=0).delete()
+                continue
+            if medidas <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(**clave, cantidad_medidas=medidas, cantidad_suspensiones=suspensiones, dias_suspension=dias)
+            except IntegrityError:
+                # Otra transacción creó la fila entre el UPDATE y el INSERT
+                self.filter(**clave).update(**incrementos)
+
+
+class ResumenIncidencias(models.Model):
+    """
+    Medidas por (grado, tipo de incidencia, lugar, mes) para las estadísticas
+    de dirección. La mantienen las señales de estadisticas.py y se regenera
+    con el comando reconstruir_estadisticas_incidencias. id_grado es el grado
+    activo del alumno al registrar la medida (MedidaXAlumno.id_grado); nulo
+    si no tenía. Las lecturas siempre suman (SUM)
+    porque con id_grado nulo la restricción única no impide filas repetidas.
+    """
+    id_resumen = models.AutoField(primary_key=True)
+    id_grado = models.ForeignKey(Grado, on_delete=models.CASCADE, db_column='id_grado', null=True)
+    id_tipo_incidencia = models.ForeignKey(TipoIncidencia, on_delete=models.CASCADE, db_column='id_tipo_incidencia')
+    id_lugar = models.ForeignKey(Lugar, on_delete=models.CASCADE, db_column='id_lugar')
+    mes = models.DateField()  # primer día del mes
+    cantidad_medidas = models.IntegerField(default=0)
+    cantidad_suspensiones = models.IntegerField(default=0)
+    dias_suspension = models.IntegerField(default=0)
+
+    objects = ResumenIncidenciasQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'resumen_incidencias'
+        managed = True
+        constraints = [
+            models.UniqueConstraint(fields=['id_grado', 'id_tipo_incidencia', 'id_lugar', 'mes'], name='resumen_incidencias_clave'),
+        ]
+
+    def __str__(self):
+        return f"Resumen {self.mes:%Y-%m} - grado {self.id_grado_id} - tipo {self.id_tipo_incidencia_id} - lugar {self.id_lugar_id}"
+
+
 class Reunion(models.Model):
     TIPO_REUNION_OPCIONES = [
         ('REUNIÓN INDIVIDUAL', 'Reunion Individual'),
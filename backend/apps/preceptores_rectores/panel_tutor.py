@@ -0,0 +1,204 @@
+"""
+Panel del tutor: sus hijos (AlumnoXTutor) con el grado activo, las medidas
+recientes y las actividades extracurriculares del grado, más las reuniones
+próximas a las que está convocado.
+
+El payload se arma con un número fijo de consultas y se cachea por tutor.
+La clave lleva dos versiones:
+  - la del tutor, que se renueva cuando cambia algo de su familia
+    (medidas, inscripciones y datos de sus hijos, sus asistencias);
+  - la del catálogo 'panel_tutores' (core/catalogos.py), que se renueva
+    cuando cambian reuniones, actividades o los catálogos que se muestran
+    (grados, incidencias, lugares, parentescos) y afecta a todos los paneles.
+Las escrituras masivas que no disparan señales invalidan a mano.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.secretarios.models import Alumno, AlumnoXGrado, AlumnoXTutor, Grado, Parentesco, Tutor
+from core.catalogos import invalidar_catalogo_al_confirmar, version_catalogo
+
+from .models import (
+    ActExtracurricular, ActExtracurricularXGrado, Asistencia, Incidencia, Lugar, MedidaXAlumno, Reunion
+)
+
+MEDIDAS_RECIENTES = 5
+# Más que suficiente para la próxima reunión / actividad: las pasadas se descartan al servir
+TTL_PANEL = 60 * 60 * 6
+
+
+def _clave_version(id_tutor):
+    return f'panel_tutor:{id_tutor}:version'
+
+
+def version_panel(id_tutor):
+    # Igual que version_identidad: timestamp inicial para no repetir versiones si se vacía la caché
+    version = cache.get(_clave_version(id_tutor))
+    if version is None:
+        cache.add(_clave_version(id_tutor), time.time_ns(), timeout=None)
+        version = cache.get(_clave_version(id_tutor))
+    return version
+
+
+def invalidar_paneles(ids_tutores):
+    cache.set_many({_clave_version(id_tutor): time.time_ns() for id_tutor in ids_tutores}, timeout=None)
+
+
+def invalidar_paneles_al_confirmar(ids_tutores):
+    ids_tutores = set(ids_tutores)
+    if ids_tutores:
+        transaction.on_commit(lambda: invalidar_paneles(ids_tutores))
+
+
+def invalidar_paneles_de_alumnos(ids_alumnos):
+    """Invalida los paneles de los tutores de esos alumnos (una consulta)"""
+    invalidar_paneles_al_confirmar(
+        AlumnoXTutor.objects.filter(id_alumno__in=ids_alumnos).values_list('id_tutor', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=MedidaXAlumno)
+@receiver([post_save, post_delete], sender=AlumnoXGrado)
+def invalidar_por_alumno(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_paneles_de_alumnos([instance.id_alumno_id])
+
+
+@receiver(post_save, sender=Alumno)
+def invalidar_por_datos_del_alumno(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_paneles_de_alumnos([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=AlumnoXTutor)
+@receiver([post_save, post_delete], sender=Asistencia)
+def invalidar_por_tutor(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_paneles_al_confirmar([instance.id_tutor_id])
+
+
+@receiver(post_save, sender=Tutor)
+def invalidar_por_datos_del_tutor(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_paneles_al_confirmar([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Reunion)
+@receiver([post_save, post_delete], sender=ActExtracurricular)
+@receiver([post_save, post_delete], sender=ActExtracurricularXGrado)
+@receiver([post_save, post_delete], sender=Grado)
+@receiver([post_save, post_delete], sender=Incidencia)
+@receiver([post_save, post_delete], sender=Lugar)
+@receiver([post_save, post_delete], sender=Parentesco)
+def invalidar_todos_los_paneles(sender, raw=False, **kwargs):
+    if not raw:
+        invalidar_catalogo_al_confirmar('panel_tutores')
+
+
+def construir_panel(id_tutor):
+    """Payload del panel con cinco consultas (una si el tutor no tiene hijos)"""
+    relaciones = list(
+        AlumnoXTutor.objects.filter(id_tutor=id_tutor)
+        .select_related('id_alumno', 'id_parentesco')
+        .order_by('id_alumno__apellido_alumno', 'id_alumno__nombre_alumno', 'id_alumno')
+    )
+    if not relaciones:
+        return {'hijos': [], 'reuniones': []}
+    ids_alumnos = [relacion.id_alumno_id for relacion in relaciones]
+
+    # Con más de una inscripción activa gana la más vieja, igual que en estadisticas.py
+    grados = {}
+    for inscripcion in (
+        AlumnoXGrado.objects.filter(id_alumno__in=ids_alumnos, activo=True)
+        .select_related('id_grado').order_by('-id_alumno_x_grado')
+    ):
+        grados[inscripcion.id_alumno_id] = inscripcion.id_grado
+
+    medidas = {id_alumno: [] for id_alumno in ids_alumnos}
+    for medida in (
+        MedidaXAlumno.objects.filter(id_alumno__in=ids_alumnos)
+        .annotate(orden=Window(RowNumber(), partition_by=F('id_alumno'), order_by=[F('fecha_medida').desc(), F('pk').desc()]))
+        .filter(orden__lte=MEDIDAS_RECIENTES)
+        .select_related('incidencia', 'id_lugar')
+        .order_by('id_alumno', 'orden')
+    ):
+        medidas[medida.id_alumno_id].append({
+            'id_medida_x_alumno': medida.pk,
+            'fecha_medida': medida.fecha_medida,
+            'incidencia': medida.incidencia.nombre_incidencia,
+            'lugar': medida.id_lugar.nombre_lugar,
+            'cantidad_dias': medida.cantidad_dias,
+            'descripcion_caso': medida.descripcion_caso,
+        })
+
+    ahora = timezone.now()
+    actividades = {}
+    for actividad in (
+        ActExtracurricularXGrado.objects.filter(
+            id_grado__in={grado.pk for grado in grados.values()}, fecha_hora_actividad__gte=ahora
+        )
+        .select_related('id_act_extracurricular')
+        .order_by('fecha_hora_actividad', 'pk')
+    ):
+        actividades.setdefault(actividad.id_grado_id, []).append({
+            'id_act_extracurricular_x_grado': actividad.pk,
+            'nombre': actividad.id_act_extracurricular.nombre_act_extracurricular,
+            'destino': actividad.id_act_extracurricular.destino_act_extracurricular,
+            'fecha_hora_actividad': actividad.fecha_hora_actividad,
+            'fecha_hora_salida': actividad.fecha_hora_salida,
+        })
+
+    # Convocado: tiene asistencia cargada (o precargada) o es una reunión general de padres
+    reuniones = [
+        {
+            'id_reunion': reunion.pk,
+            'fecha_hora_reunion': reunion.fecha_hora_reunion,
+            'tipo_reunion': reunion.tipo_reunion,
+            'descripcion_reunion': reunion.descripcion_reunion,
+        }
+        for reunion in Reunion.objects.filter(
+            Q(asistencia__id_tutor=id_tutor) | Q(tipo_reunion='REUNIÓN GENERAL PADRES'),
+            fecha_hora_reunion__gte=ahora,
+        ).distinct().order_by('fecha_hora_reunion', 'pk')
+    ]
+
+    hijos = []
+    for relacion in relaciones:
+        alumno = relacion.id_alumno
+        grado = grados.get(alumno.pk)
+        hijos.append({
+            'id_alumno': alumno.pk,
+            'dni_alumno': alumno.dni_alumno,
+            'nombre_alumno': alumno.nombre_alumno,
+            'apellido_alumno': alumno.apellido_alumno,
+            'parentesco': relacion.id_parentesco.parentesco_nombre,
+            'grado': {'id_grado': grado.pk, 'nombre_grado': grado.nombre_grado} if grado else None,
+            'medidas_recientes': medidas[alumno.pk],
+            'actividades': actividades.get(grado.pk, []) if grado else [],
+        })
+    return {'hijos': hijos, 'reuniones': reuniones}
+
+
+def panel_tutor(id_tutor):
+    """Panel desde la caché (sin consultas) o recién construido; sin reuniones ni actividades pasadas"""
+    clave = f'panel_tutor:{id_tutor}:{version_catalogo("panel_tutores")}:{version_panel(id_tutor)}'
+    panel = cache.get(clave)
+    if panel is None:
+        panel = construir_panel(id_tutor)
+        cache.set(clave, panel, TTL_PANEL)
+
+    ahora = timezone.now()
+    return {
+        'hijos': [
+            {**hijo, 'actividades': [a for a in hijo['actividades'] if a['fecha_hora_actividad'] >= ahora]}
+            for hijo in panel['hijos']
+        ],
+        'reuniones': [r for r in panel['reuniones'] if r['fecha_hora_reunion'] >= ahora],
+    }
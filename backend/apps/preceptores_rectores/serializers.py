@@ -1,5 +1,10 @@
+import logging
+
 from rest_framework import serializers
-from .models import Lugar, TipoIncidencia, Incidencia, MedidaXAlumno, Reunion, Asistencia, ActExtracurricular, ActExtracurricularXGrado
+from apps.login.models import Empleado
+from .models import Lugar, TipoIncidencia, Incidencia, MedidaXAlumno, Reunion, Asistencia, ActExtracurricular, ActExtracurricularXGrado, SuspensionAlumno
+
+logger = logging.getLogger(__name__)
 
 class LugarSerializer(serializers.ModelSerializer):
     class Meta:
@@ -73,10 +78,42 @@ class MedidaXAlumnoSerializer(serializers.ModelSerializer):
         validated_data.pop('tipo_medida_display', None)
         validated_data.pop('es_suspension', None)
         
-        print("Creando medida con datos:", validated_data)
+        logger.debug('Creando medida con datos: %s', validated_data)
         return super().create(validated_data)
 
 
+class SuspensionAlumnoSerializer(serializers.ModelSerializer):
+    id_medida = serializers.IntegerField(source='id_medida_x_alumno_id', read_only=True)
+    dni_alumno = serializers.IntegerField(source='id_alumno.dni_alumno', read_only=True)
+    nombre_alumno = serializers.CharField(source='id_alumno.nombre_alumno', read_only=True)
+    apellido_alumno = serializers.CharField(source='id_alumno.apellido_alumno', read_only=True)
+
+    class Meta:
+        model = SuspensionAlumno
+        fields = ['id_medida', 'id_alumno', 'dni_alumno', 'nombre_alumno', 'apellido_alumno', 'desde', 'hasta']
+
+
+# FLUJO: una incidencia para varios alumnos (toda una división)
+class MedidaLoteSerializer(serializers.Serializer):
+    MAX_ALUMNOS = 200
+
+    # Cada FK se valida una sola vez para todo el lote
+    incidencia = serializers.PrimaryKeyRelatedField(queryset=Incidencia.objects.all())
+    id_lugar = serializers.PrimaryKeyRelatedField(queryset=Lugar.objects.all())
+    id_empleado = serializers.PrimaryKeyRelatedField(queryset=Empleado.objects.all())
+    cantidad_dias = serializers.IntegerField(min_value=0, default=0)
+    descripcion_caso = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    alumnos = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_ALUMNOS
+    )
+    id_grado = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if ('alumnos' in data) == ('id_grado' in data):
+            raise serializers.ValidationError('Se requiere alumnos (lista de ids) o id_grado, no ambos')
+        return data
+
+
 class ReunionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reunion
@@ -89,6 +126,26 @@ class AsistenciaSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+# FLUJO: toma de asistencia en lote para una reunión
+class AsistenciaLoteItemSerializer(serializers.Serializer):
+    id_tutor = serializers.IntegerField()
+    estado_asistencia = serializers.ChoiceField(choices=Asistencia.ESTADO_ASISTENCIA_OPCIONES)
+    fecha_llegada_asistencia = serializers.DateTimeField(required=False, allow_null=True)
+
+
+class AsistenciaLoteSerializer(serializers.Serializer):
+    MAX_ITEMS = 1000
+
+    asistencias = AsistenciaLoteItemSerializer(many=True, required=False, default=list, max_length=MAX_ITEMS)
+    # Precarga "NO" para los tutores de los alumnos activos de estos grados
+    id_grados = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, max_length=MAX_ITEMS)
+
+    def validate(self, data):
+        if not data['asistencias'] and not data['id_grados']:
+            raise serializers.ValidationError('Se requiere asistencias y/o id_grados')
+        return data
+
+
 class ActExtracurricularSerializer(serializers.ModelSerializer):
     class Meta:
         model = ActExtracurricular
@@ -0,0 +1,81 @@
+"""
+Suspensiones vigentes: quién está suspendido un día dado.
+
+SuspensionAlumno materializa el intervalo [fecha_medida, fecha_medida +
+cantidad_dias) de cada medida con días de suspensión. Se actualiza en la
+misma transacción que la medida (MedidaXAlumno.save es atómico) y se borra
+en cascada con ella. Las cargas masivas que no pasan por save() llaman a
+registrar_suspensiones; reconstruir() la regenera completa.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.secretarios.models import AlumnoXGrado
+
+from .models import MedidaXAlumno, SuspensionAlumno
+
+LOTE_RECONSTRUCCION = 2000
+
+
+def intervalo(medida):
+    """SuspensionAlumno de la medida, o None si no es una suspensión"""
+    if not medida.cantidad_dias or medida.cantidad_dias <= 0:
+        return None
+    return SuspensionAlumno(
+        id_medida_x_alumno_id=medida.pk,
+        id_alumno_id=medida.id_alumno_id,
+        desde=medida.fecha_medida,
+        hasta=medida.fecha_medida + timedelta(days=medida.cantidad_dias),
+    )
+
+
+def registrar_suspensiones(medidas):
+    """Alta masiva de los intervalos de medidas recién creadas con bulk_create"""
+    SuspensionAlumno.objects.bulk_create(
+        [suspension for suspension in map(intervalo, medidas) if suspension is not None],
+        batch_size=LOTE_RECONSTRUCCION,
+    )
+
+
+@receiver(post_save, sender=MedidaXAlumno)
+def actualizar_suspension(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    suspension = intervalo(instance)
+    if suspension is None:
+        SuspensionAlumno.objects.filter(pk=instance.pk).delete()
+        return
+    campos = {'id_alumno_id': suspension.id_alumno_id, 'desde': suspension.desde, 'hasta': suspension.hasta}
+    if not SuspensionAlumno.objects.filter(pk=instance.pk).update(**campos):
+        SuspensionAlumno.objects.create(id_medida_x_alumno_id=instance.pk, **campos)
+
+
+def reconstruir():
+    """Regenera suspensiones_alumnos desde medidas_x_alumnos; devuelve la cantidad de filas"""
+    medidas = MedidaXAlumno.objects.filter(cantidad_dias__gt=0).order_by().only(
+        'id_medida_x_alumno', 'id_alumno', 'fecha_medida', 'cantidad_dias'
+    )
+    with transaction.atomic():
+        SuspensionAlumno.objects.all().delete()
+        registrar_suspensiones(medidas.iterator(chunk_size=LOTE_RECONSTRUCCION))
+    return SuspensionAlumno.objects.count()
+
+
+def suspendidos(fecha, id_grado=None):
+    """
+    Suspensiones vigentes el día `fecha` (desde <= fecha < hasta), con el
+    alumno, opcionalmente sólo de los alumnos activos de un grado. Una
+    consulta sobre suspension_vigencia_idx.
+    """
+    vigentes = SuspensionAlumno.objects.filter(hasta__gt=fecha, desde__lte=fecha)
+    if id_grado is not None:
+        vigentes = vigentes.filter(Exists(AlumnoXGrado.objects.filter(
+            id_grado=id_grado, activo=True, id_alumno=OuterRef('id_alumno')
+        )))
+    return vigentes.select_related('id_alumno').order_by(
+        'id_alumno__apellido_alumno', 'id_alumno__nombre_alumno', 'id_alumno', 'desde'
+    )
@@ -1,3 +1,512 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.login.models import Empleado, Rol
+from apps.secretarios.models import AlumnoXGrado, AlumnoXTutor, Colegios_procedencia, Grado, Parentesco, Tutor
+from apps.secretarios.tests import crear_alumnos
+
+from . import estadisticas, suspensiones
+from .models import ActExtracurricular, ActExtracurricularXGrado, Asistencia, Incidencia, Lugar, MedidaXAlumno, ResumenIncidencias, Reunion, SuspensionAlumno, TipoIncidencia
+
+
+class MedidasTestCase(TestCase):
+    """Tres alumnos en dos grados y cinco medidas entre marzo y junio de 2025"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        colegio = Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+        self.grado_a = Grado.objects.create(nombre_grado='1A', asientos_disponibles=30)
+        self.grado_b = Grado.objects.create(nombre_grado='1B', asientos_disponibles=30)
+        crear_alumnos(self.grado_a, colegio, 2)
+        crear_alumnos(self.grado_b, colegio, 1, dni_inicial=41000000)
+        self.alumnos = [x.id_alumno for x in AlumnoXGrado.objects.select_related('id_alumno').order_by('pk')]
+
+        self.leve = TipoIncidencia.objects.create(tipo_incidencia_nombre='Leve')
+        grave = TipoIncidencia.objects.create(tipo_incidencia_nombre='Grave')
+        self.llegada_tarde = Incidencia.objects.create(nombre_incidencia='Llegada tarde', tipo_incidencia=self.leve)
+        pelea = Incidencia.objects.create(nombre_incidencia='Pelea', tipo_incidencia=grave)
+        self.pelea = pelea
+        self.lugar = lugar = Lugar.objects.create(nombre_lugar='Patio')
+        self.empleado = empleado = Empleado.objects.create(
+            dni_empleado='20000000', nombre_empleado='Juan', apellido_empleado='Diaz',
+            genero_empleado='M', id_rol=Rol.objects.create(nombre_rol='preceptor'), correo_empleado='juan@mail.com'
+        )
+        # (alumno, incidencia, días de suspensión, fecha)
+        for alumno, incidencia, dias, fecha in [
+            (0, self.llegada_tarde, 0, date(2025, 3, 10)),
+            (0, pelea, 3, date(2025, 4, 2)),
+            (1, self.llegada_tarde, 0, date(2025, 4, 5)),
+            (2, pelea, 2, date(2025, 5, 20)),
+            (2, self.llegada_tarde, 0, date(2025, 6, 1)),
+        ]:
+            medida = MedidaXAlumno.objects.create(
+                incidencia=incidencia, id_alumno=self.alumnos[alumno], id_empleado=empleado,
+                id_lugar=lugar, cantidad_dias=dias
+            )
+            MedidaXAlumno.objects.filter(pk=medida.pk).update(fecha_medida=fecha)
+
+    def assertResumenConsistente(self):
+        # El resumen incremental es igual al que da reconstruir() desde cero
+        todo = {'agrupar': 'grado,tipo,lugar,mes'}
+        incremental = estadisticas.consultar(todo)
+        estadisticas.reconstruir()
+        self.assertEqual(incremental, estadisticas.consultar(todo))
+
+
+class ConsultaIncidenciasTests(MedidasTestCase):
+    """listar_incidencias: filtros sobre columnas indexadas, cursor y conteos en una consulta"""
+
+    URL = '/api/preceptores_rectores/incidencias/listar/'
+
+    def test_filtros(self):
+        casos = {
+            f'id_grado={self.grado_a.id_grado}': 3,
+            f'id_tipo_incidencia={self.leve.id_tipo_incidencia}': 3,
+            f'id_incidencia={self.llegada_tarde.id_incidencia}&id_grado={self.grado_b.id_grado}': 1,
+            'suspension=true': 2,
+            'suspension=false&desde=2025-04-01&hasta=2025-05-31': 1,
+        }
+        for filtro, esperados in casos.items():
+            response = self.client.get(f'{self.URL}?{filtro}')
+            self.assertEqual(response.status_code, 200, filtro)
+            self.assertEqual(response.data['count'], esperados, filtro)
+            self.assertEqual(len(response.data['results']), esperados, filtro)
+
+    def test_primera_pagina_trae_conteos(self):
+        # Página + un único conteo
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{self.URL}?page_size=2')
+        self.assertEqual((response.data['count'], response.data['suspensiones']), (5, 2))
+        self.assertEqual([m['fecha_medida'] for m in response.data['results']], ['2025-06-01', '2025-05-20'])
+
+        fechas = []
+        siguiente = response.data['next']
+        while siguiente:
+            response = self.client.get(siguiente)
+            self.assertNotIn('count', response.data)
+            fechas += [m['fecha_medida'] for m in response.data['results']]
+            siguiente = response.data['next']
+        self.assertEqual(fechas, ['2025-04-05', '2025-04-02', '2025-03-10'])
+
+    def test_parametros_invalidos(self):
+        for filtro in ['id_grado=abc', 'desde=10/03/2025', 'desde=2025-05-01&hasta=2025-04-01', 'suspension=quizas']:
+            self.assertEqual(self.client.get(f'{self.URL}?{filtro}').status_code, 400, filtro)
+
+
+class MedidaXAlumnoViewTests(MedidasTestCase):
+    """El listado de medidas trae alumno, incidencia, lugar y empleado en la misma consulta"""
+
+    URL = '/api/preceptores_rectores/medidas/'
+
+    def test_consultas_constantes(self):
+        for url in [self.URL, f'{self.URL}?page_size=2']:
+            with self.subTest(url=url), self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.client.get(self.URL).data), 5)
+        self.assertEqual(response.data['results'][0]['empleado_nombre'], 'Juan')
+
+
+class EstadisticasIncidenciasTests(MedidasTestCase):
+    """ResumenIncidencias se mantiene igual a lo que da reconstruir() desde cero"""
+
+    URL = '/api/preceptores_rectores/incidencias/estadisticas/'
+
+    def setUp(self):
+        super().setUp()
+        # El setUp cambia las fechas con QuerySet.update, que no pasa por las señales
+        estadisticas.reconstruir()
+
+    def test_alta_modificacion_y_baja(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            medida = MedidaXAlumno.objects.create(
+                incidencia=self.pelea, id_alumno=self.alumnos[1], id_empleado=self.empleado,
+                id_lugar=self.lugar, cantidad_dias=5
+            )
+        self.assertEqual(estadisticas.consultar({})['totales'], {
+            'cantidad_medidas': 6, 'cantidad_suspensiones': 3, 'dias_suspension': 10,
+        })
+        self.assertResumenConsistente()
+
+        medida.incidencia = self.llegada_tarde
+        medida.cantidad_dias = 0
+        medida.save()
+        self.assertResumenConsistente()
+
+        MedidaXAlumno.objects.filter(pk__in=[medida.pk, MedidaXAlumno.objects.order_by('pk').first().pk]).delete()
+        self.assertResumenConsistente()
+
+    def test_reconstruir(self):
+        ResumenIncidencias.objects.all().delete()
+        self.assertEqual(estadisticas.reconstruir(), 5)
+        filas = estadisticas.consultar({'agrupar': 'grado'})['filas']
+        self.assertEqual(
+            [(f['id_grado'], f['cantidad_medidas'], f['cantidad_suspensiones'], f['dias_suspension']) for f in filas],
+            [(self.grado_a.id_grado, 3, 1, 3), (self.grado_b.id_grado, 2, 1, 2)],
+        )
+
+    def test_baja_con_resumen_vacio_no_crea_filas_negativas(self):
+        # Como queda la tabla recién creada por la migración 0003
+        ResumenIncidencias.objects.all().delete()
+        MedidaXAlumno.objects.order_by('pk').first().delete()
+        self.assertFalse(ResumenIncidencias.objects.exists())
+
+    def test_modificacion_y_baja_despues_del_cambio_de_grado(self):
+        # Las medidas siguen contadas en el grado en que se registraron
+        alumno = self.alumnos[0]
+        inscripcion = AlumnoXGrado.objects.get(id_alumno=alumno)
+        inscripcion.activo = False
+        inscripcion.save()
+        AlumnoXGrado.objects.create(
+            id_alumno=alumno, id_grado=self.grado_b, id_colegio_procedencia=inscripcion.id_colegio_procedencia
+        )
+
+        primera, segunda = MedidaXAlumno.objects.filter(id_alumno=alumno).order_by('pk')
+        primera.cantidad_dias = 4
+        primera.save()
+        segunda.delete()
+        self.assertResumenConsistente()
+        self.assertFalse(ResumenIncidencias.objects.filter(cantidad_medidas__lt=0).exists())
+        totales = {
+            grado.id_grado: estadisticas.consultar({'id_grado': str(grado.id_grado)})['totales']
+            for grado in (self.grado_a, self.grado_b)
+        }
+        self.assertEqual(totales[self.grado_a.id_grado], {
+            'cantidad_medidas': 2, 'cantidad_suspensiones': 1, 'dias_suspension': 4,
+        })
+        self.assertEqual(totales[self.grado_b.id_grado]['cantidad_medidas'], 2)
+
+        # Las nuevas van al grado actual
+        MedidaXAlumno.objects.create(
+            incidencia=self.pelea, id_alumno=alumno, id_empleado=self.empleado, id_lugar=self.lugar
+        )
+        self.assertEqual(estadisticas.consultar({'id_grado': str(self.grado_b.id_grado)})['totales']['cantidad_medidas'], 3)
+        self.assertResumenConsistente()
+
+    def test_borrado_del_alumno_en_cascada(self):
+        self.alumnos[2].delete()
+        self.assertEqual(estadisticas.consultar({'id_grado': str(self.grado_b.id_grado)})['totales']['cantidad_medidas'], 0)
+        self.assertResumenConsistente()
+
+    def test_endpoint_agrupado_y_solo_para_direccion(self):
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+        director = Empleado.objects.create(
+            dni_empleado='20000001', nombre_empleado='Ana', apellido_empleado='Paz',
+            genero_empleado='F', id_rol=Rol.objects.create(nombre_rol='director'), correo_empleado='ana@mail.com'
+        )
+        self.client.force_authenticate(User.objects.create_user(username=director.dni_empleado))
+        # Rol del usuario (sin claims) + una consulta al resumen
+        with self.assertNumQueries(2):
+            response = self.client.get(f'{self.URL}?agrupar=grado&desde=2025-04&hasta=2025-05')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totales']['cantidad_medidas'], 3)
+        self.assertEqual(
+            [(fila['id_grado__nombre_grado'], fila['cantidad_medidas'], fila['dias_suspension']) for fila in response.data['filas']],
+            [('1A', 2, 3), ('1B', 1, 2)]
+        )
+        self.assertEqual(self.client.get(f'{self.URL}?agrupar=alumno').status_code, 400)
+
+
+class AlumnosSuspendidosTests(MedidasTestCase):
+    """Suspendidos el día D: intervalos [fecha_medida, fecha_medida + cantidad_dias) materializados"""
+
+    URL = '/api/preceptores_rectores/alumnos/suspendidos/'
+
+    def setUp(self):
+        super().setUp()
+        # El setUp cambia las fechas con QuerySet.update, que no pasa por las señales
+        suspensiones.reconstruir()
+
+    def dnis(self, consulta):
+        response = self.client.get(f'{self.URL}?{consulta}')
+        self.assertEqual(response.status_code, 200)
+        return [s['dni_alumno'] for s in response.data['suspendidos']]
+
+    def test_suspendidos_por_fecha_y_grado(self):
+        # Alumno 0: 3 días desde 2025-04-02; alumno 2 (grado B): 2 días desde 2025-05-20
+        self.assertEqual(self.dnis('fecha=2025-04-04'), [40000000])
+        self.assertEqual(self.dnis('fecha=2025-04-05'), [])
+        self.assertEqual(self.dnis('fecha=2025-05-21'), [41000000])
+        self.assertEqual(self.dnis(f'fecha=2025-05-21&id_grado={self.grado_a.id_grado}'), [])
+        with self.assertNumQueries(1):
+            self.client.get(f'{self.URL}?fecha=2025-05-21&id_grado={self.grado_b.id_grado}')
+        self.assertEqual(self.client.get(f'{self.URL}?fecha=21/05/2025').status_code, 400)
+
+    def test_intervalo_sigue_a_la_medida(self):
+        medida = MedidaXAlumno.objects.get(cantidad_dias=3)
+        medida.cantidad_dias = 10
+        medida.save()
+        self.assertEqual(self.dnis('fecha=2025-04-11'), [40000000])
+
+        medida.cantidad_dias = 0
+        medida.save()
+        self.assertFalse(SuspensionAlumno.objects.filter(pk=medida.pk).exists())
+
+        MedidaXAlumno.objects.filter(cantidad_dias__gt=0).delete()
+        self.assertEqual(SuspensionAlumno.objects.count(), 0)
+
+
+class CatalogoTiposIncidenciaTests(MedidasTestCase):
+    """tipos-incidencias-completo: un JOIN en el miss, cero consultas con la caché caliente"""
+
+    URL = '/api/preceptores_rectores/tipos-incidencias-completo/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_arbol_cacheado_e_invalidado(self):
+        TipoIncidencia.objects.create(tipo_incidencia_nombre='Sin incidencias')
+        with self.assertNumQueries(1):
+            primera = self.client.get(self.URL).json()
+        self.assertEqual(
+            [(t['tipo_incidencia_nombre'], [i['nombre_incidencia'] for i in t['incidencias']]) for t in primera],
+            [('Leve', ['Llegada tarde']), ('Grave', ['Pelea']), ('Sin incidencias', [])]
+        )
+        self.assertEqual(primera[0]['incidencias'][0]['tipo_incidencia_nombre'], 'Leve')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL).json(), primera)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/preceptores_rectores/incidencias/', {
+                'nombre_incidencia': 'Celular', 'tipo_incidencia': self.leve.id_tipo_incidencia,
+            }, format='json')
+        self.assertEqual(len(self.client.get(self.URL).json()[0]['incidencias']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/preceptores_rectores/tipos-incidencias/{self.leve.id_tipo_incidencia}/', {
+                'tipo_incidencia_nombre': 'Menor',
+            }, format='json')
+        self.assertEqual(self.client.get(self.URL).json()[0]['incidencias'][1]['tipo_incidencia_nombre'], 'Menor')
+
+
+class MedidasLoteTests(MedidasTestCase):
+    """medidas/lote/: una incidencia para toda una división con un único INSERT"""
+
+    URL = '/api/preceptores_rectores/medidas/lote/'
+
+    def setUp(self):
+        super().setUp()
+        estadisticas.reconstruir()
+        suspensiones.reconstruir()
+        self.datos = {
+            'incidencia': self.pelea.id_incidencia, 'id_lugar': self.lugar.id_lugar,
+            'id_empleado': self.empleado.id_empleado, 'cantidad_dias': 2, 'descripcion_caso': 'Pelea en el patio',
+        }
+
+    def test_por_grado_y_por_lista(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.URL, {**self.datos, 'id_grado': self.grado_a.id_grado}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['count'], 2)
+        ids = [m['id_medida_x_alumno'] for m in response.data['medidas']]
+        self.assertEqual(MedidaXAlumno.objects.filter(pk__in=ids, descripcion_caso='Pelea en el patio').count(), 2)
+        self.assertEqual(SuspensionAlumno.objects.filter(pk__in=ids).count(), 2)
+        self.assertResumenConsistente()
+
+        # Las consultas no dependen de la cantidad de alumnos: 3 FK, alumnos,
+        # INSERT, resumen (tipo + grados + UPDATE/INSERT por grado), suspensiones,
+        # tutores de los paneles a invalidar y savepoints
+        alumnos = [a.id_alumno for a in self.alumnos]
+        with self.assertNumQueries(16):
+            response = self.client.post(self.URL, {**self.datos, 'alumnos': alumnos + alumnos[:1]}, format='json')
+        self.assertEqual(response.data['count'], 3)
+        self.assertResumenConsistente()
+
+    def test_datos_invalidos(self):
+        for datos in [
+            self.datos,
+            {**self.datos, 'alumnos': [self.alumnos[0].id_alumno], 'id_grado': self.grado_a.id_grado},
+            {**self.datos, 'alumnos': [self.alumnos[0].id_alumno, 999]},
+            {**self.datos, 'id_lugar': 999, 'alumnos': [self.alumnos[0].id_alumno]},
+        ]:
+            self.assertEqual(self.client.post(self.URL, datos, format='json').status_code, 400, datos)
+        self.assertEqual(MedidaXAlumno.objects.count(), 5)
+
+
+class ReunionTestCase(MedidasTestCase):
+    """Una reunión general y tres tutores: dos con hijos en los grados, uno sin alumnos"""
+
+    def setUp(self):
+        super().setUp()
+        self.reunion = Reunion.objects.create(
+            fecha_hora_reunion=datetime(2025, 6, 10, 18, tzinfo=timezone.utc),
+            tipo_reunion='REUNIÓN GENERAL PADRES', id_empleado=self.empleado
+        )
+        self.url = f'/api/preceptores_rectores/reuniones/{self.reunion.id_reunion}/asistencias/lote/'
+        madre = Parentesco.objects.create(parentesco_nombre='Madre')
+        self.tutores = [
+            Tutor.objects.create(
+                dni_tutor=30000000 + i, nombre_tutor=f'Tutor{i}', apellido_tutor='Gomez',
+                telefono_tutor=f'351000000{i}', correo_tutor=f'tutor{i}@mail.com', genero_tutor='F'
+            )
+            for i in range(3)
+        ]
+        # Tutor 0: hermanos del grado A; tutor 1: alumno del grado B; tutor 2: sin alumnos
+        for tutor, alumno in [(0, 0), (0, 1), (1, 2)]:
+            AlumnoXTutor.objects.create(id_tutor=self.tutores[tutor], id_alumno=self.alumnos[alumno], id_parentesco=madre)
+
+
+class AsistenciasLoteTests(ReunionTestCase):
+    """reuniones/<id>/asistencias/lote/: precarga de ausentes y upsert reintentable"""
+
+    def estados(self):
+        return dict(Asistencia.objects.filter(id_reunion=self.reunion).values_list('id_tutor__dni_tutor', 'estado_asistencia'))
+
+    def test_precarga_y_upsert(self):
+        response = self.client.post(self.url, {'id_grados': [self.grado_a.id_grado, self.grado_b.id_grado]}, format='json')
+        self.assertEqual(response.data, {'precargados': 2, 'registrados': 0})
+        self.assertEqual(self.estados(), {30000000: 'NO', 30000001: 'NO'})
+
+        llegada = {'id_tutor': self.tutores[0].id_tutor, 'estado_asistencia': 'SÍ',
+                   'fecha_llegada_asistencia': '2025-06-10T18:05:00Z'}
+        otro = {'id_tutor': self.tutores[2].id_tutor, 'estado_asistencia': 'SÍ'}
+        for _ in range(2):
+            # Reintentar no falla por (id_reunion, id_tutor) ni duplica filas
+            response = self.client.post(self.url, {'asistencias': [llegada, otro], 'id_grados': [self.grado_a.id_grado]}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['registrados'], 2)
+        self.assertEqual(response.data['precargados'], 0)
+        self.assertEqual(self.estados(), {30000000: 'SÍ', 30000001: 'NO', 30000002: 'SÍ'})
+        self.assertEqual(
+            Asistencia.objects.get(id_tutor=self.tutores[2]).fecha_llegada_asistencia, self.reunion.fecha_hora_reunion
+        )
+
+    def test_datos_invalidos(self):
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {
+            'asistencias': [{'id_tutor': 999, 'estado_asistencia': 'SÍ'}]
+        }, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {
+            'asistencias': [{'id_tutor': self.tutores[0].id_tutor, 'estado_asistencia': 'TAL VEZ'}]
+        }, format='json').status_code, 400)
+        self.assertEqual(self.client.post(
+            '/api/preceptores_rectores/reuniones/999/asistencias/lote/', {'id_grados': [1]}, format='json'
+        ).status_code, 404)
+
+
+class ResumenAsistenciasTests(ReunionTestCase):
+    """Resumen por reunión y por tutor: una consulta agrupada, cacheada hasta la próxima escritura"""
+
+    URL = '/api/preceptores_rectores/reuniones/resumen-asistencias/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.individual = Reunion.objects.create(
+            fecha_hora_reunion=datetime(2025, 7, 1, 9, tzinfo=timezone.utc),
+            tipo_reunion='REUNIÓN INDIVIDUAL', id_empleado=self.empleado
+        )
+        for reunion, tutor, estado, llegada in [
+            (self.reunion, 0, 'SÍ', datetime(2025, 6, 10, 17, 55, tzinfo=timezone.utc)),
+            (self.reunion, 1, 'SÍ', datetime(2025, 6, 10, 18, 20, tzinfo=timezone.utc)),
+            (self.reunion, 2, 'NO', datetime(2025, 6, 10, 18, tzinfo=timezone.utc)),
+            (self.individual, 0, 'SE RETIRÓ', datetime(2025, 7, 1, 9, 40, tzinfo=timezone.utc)),
+        ]:
+            Asistencia.objects.create(
+                id_reunion=reunion, id_tutor=self.tutores[tutor], estado_asistencia=estado, fecha_llegada_asistencia=llegada
+            )
+
+    def test_resumen_por_reunion(self):
+        with self.assertNumQueries(1):
+            datos = self.client.get(f'{self.URL}?tipo_reunion=REUNIÓN GENERAL PADRES').json()
+        self.assertEqual(datos['count'], 1)
+        general = datos['reuniones'][0]
+        self.assertEqual(general['asistencias'], {'si': 2, 'no': 1, 'se_retiro': 0, 'total': 3})
+        self.assertEqual(general['tasa_asistencia'], 0.6667)
+        self.assertEqual(general['llegadas'], {'puntuales': 1, 'hasta_15_min': 0, 'hasta_30_min': 1, 'mas_30_min': 0})
+
+        datos = self.client.get(f'{self.URL}?desde=2025-06-01').json()
+        self.assertEqual([r['id_reunion'] for r in datos['reuniones']], [self.individual.pk, self.reunion.pk])
+        self.assertEqual(datos['totales']['asistencias']['total'], 4)
+        self.assertEqual(datos['totales']['llegadas']['mas_30_min'], 1)
+        self.assertEqual(self.client.get(f'{self.URL}?tipo_reunion=OTRA').status_code, 400)
+
+    def test_cacheado_hasta_que_cambian_las_asistencias(self):
+        primera = self.client.get(self.URL).json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL).json(), primera)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Asistencia.objects.filter(estado_asistencia='NO').get().delete()
+        self.assertEqual(self.client.get(self.URL).json()['totales']['asistencias']['total'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f'/api/preceptores_rectores/reuniones/{self.reunion.id_reunion}/asistencias/lote/',
+                {'asistencias': [{'id_tutor': self.tutores[2].id_tutor, 'estado_asistencia': 'SÍ'}]}, format='json'
+            )
+        self.assertEqual(self.client.get(self.URL).json()['totales']['asistencias']['si'], 3)
+
+    def test_historial_por_tutor(self):
+        with self.assertNumQueries(1):
+            datos = self.client.get(f'{self.URL}tutores/').json()
+        self.assertEqual(datos['count'], 3)
+        tutor = next(t for t in datos['tutores'] if t['id_tutor'] == self.tutores[0].id_tutor)
+        self.assertEqual(tutor['asistencias'], {'si': 1, 'no': 0, 'se_retiro': 1, 'total': 2})
+        self.assertEqual(tutor['tasa_asistencia'], 1.0)
+        self.assertEqual(tutor['ultima_asistencia'][:10], '2025-07-01')
+
+        datos = self.client.get(f'{self.URL}tutores/?id_tutor={self.tutores[2].id_tutor}').json()
+        self.assertEqual(datos['tutores'][0]['tasa_asistencia'], 0.0)
+
+
+class PanelTutorTests(ReunionTestCase):
+    """tutores/panel/: hijos, medidas, reuniones y actividades en consultas fijas, cacheado por tutor"""
+
+    URL = '/api/preceptores_rectores/tutores/panel/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        futuro = datetime.now(timezone.utc) + timedelta(days=7)
+        self.proxima = Reunion.objects.create(
+            fecha_hora_reunion=futuro, tipo_reunion='REUNIÓN INDIVIDUAL', id_empleado=self.empleado
+        )
+        Asistencia.objects.create(
+            id_reunion=self.proxima, id_tutor=self.tutores[0], estado_asistencia='NO', fecha_llegada_asistencia=futuro
+        )
+        museo = ActExtracurricular.objects.create(nombre_act_extracurricular='Museo', destino_act_extracurricular='Centro')
+        ActExtracurricularXGrado.objects.create(
+            id_act_extracurricular=museo, id_grado=self.grado_a,
+            fecha_hora_actividad=futuro, fecha_hora_salida=futuro + timedelta(hours=3)
+        )
+        # Tutor.save crea el usuario con el DNI
+        self.client.force_authenticate(User.objects.get(username=str(self.tutores[0].dni_tutor)))
+
+    def test_panel_de_la_familia(self):
+        datos = self.client.get(self.URL).json()
+        self.assertEqual(datos['tutor']['id_tutor'], self.tutores[0].id_tutor)
+        self.assertEqual([h['dni_alumno'] for h in datos['hijos']], [40000000, 40000001])
+        hijo = datos['hijos'][0]
+        self.assertEqual(hijo['grado']['nombre_grado'], '1A')
+        self.assertEqual([m['fecha_medida'] for m in hijo['medidas_recientes']], ['2025-04-02', '2025-03-10'])
+        self.assertEqual([a['nombre'] for a in hijo['actividades']], ['Museo'])
+        # La reunión general del setUp ya pasó
+        self.assertEqual([r['id_reunion'] for r in datos['reuniones']], [self.proxima.pk])
+
+        self.client.force_authenticate(User.objects.create_user(username=self.empleado.dni_empleado))
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+
+    def test_cacheado_e_invalidado_por_senales(self):
+        self.client.get(self.URL)
+        # Sólo la identidad del usuario (sin claims en el token); con JWT, ninguna
+        with self.assertNumQueries(1):
+            self.client.get(self.URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MedidaXAlumno.objects.create(
+                incidencia=self.llegada_tarde, id_alumno=self.alumnos[1], id_empleado=self.empleado, id_lugar=self.lugar
+            )
+        self.assertEqual(len(self.client.get(self.URL).json()['hijos'][1]['medidas_recientes']), 2)
 
-# Create your tests here.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.proxima.descripcion_reunion = 'Cambio de horario'
+            self.proxima.save()
+        self.assertEqual(self.client.get(self.URL).json()['reuniones'][0]['descripcion_reunion'], 'Cambio de horario')
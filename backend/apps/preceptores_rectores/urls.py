@@ -13,11 +13,20 @@ router.register(r'act-extracurriculares', views.ActExtracurricularView, basename
 router.register(r'actividades-grados', views.ActExtracurricularXGradoView, basename='actgrados')
 
 urlpatterns = [
+    # Antes del router: si no, incidencias/<pk>/ del router la tapa
+    path('incidencias/listar/', views.listar_incidencias, name='listar_incidencias'),
+    path('incidencias/estadisticas/', views.estadisticas_incidencias, name='estadisticas_incidencias'),
+    path('reuniones/resumen-asistencias/', views.resumen_asistencias, name='resumen-asistencias'),
+    path('reuniones/resumen-asistencias/tutores/', views.historial_asistencias_tutores, name='historial-asistencias-tutores'),
+    path('medidas/lote/', views.registrar_medidas_lote, name='registrar-medidas-lote'),
+
     path('', include(router.urls)),
     
     # ✅ URLs EXISTENTES
     path('alumnos/buscar/', views.buscar_alumno_por_dni, name='buscar_alumno_por_dni'),
-    path('incidencias/listar/', views.listar_incidencias, name='listar_incidencias'),
+    path('tutores/panel/', views.panel_del_tutor, name='panel-del-tutor'),
+    path('alumnos/suspendidos/', views.alumnos_suspendidos, name='alumnos-suspendidos'),
+    path('reuniones/<int:id_reunion>/asistencias/lote/', views.registrar_asistencias_lote, name='registrar-asistencias-lote'),
     path('incidencias/<int:id_medida>/', views.detalle_incidencia, name='detalle_incidencia'),
     path('tipos-incidencias-completo/', views.tipos_incidencias_con_incidencias, name='tipos_incidencias_completo'),
     path('incidencias-por-tipo/<int:id_tipo_incidencia>/', views.incidencias_por_tipo, name='incidencias_por_tipo'),
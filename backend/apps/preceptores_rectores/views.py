@@ -1,70 +1,93 @@
-from rest_framework.decorators import api_view
+import logging
+
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import viewsets, permissions, status
-from django.db.models import Q
-from apps.secretarios.models import Alumno
-from apps.secretarios.serializers import AlumnoSerializer
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from django.db import connection, transaction
+from django.db.models import Max, Q, prefetch_related_objects
+from django.utils import timezone
+from core.pagination import KeysetPagination, AlumnoPagination, MedidaXAlumnoPagination, ReunionPagination, ConsultaIncidenciasPagination
+from core.streaming import formato_exportacion, exportar_queryset
+from core.catalogos import CatalogoCacheMixin, catalogo_cacheado
+from apps.login.identidad import identidad_de_usuario
+from apps.login.permissions import HasRole
+from apps.secretarios.models import Alumno, AlumnoXGrado, Tutor
+from apps.secretarios.serializers import AlumnoSerializer, prefetch_grado_activo
+from . import estadisticas
+from .asistencias import historial_tutores, precargar_ausentes, registrar_asistencias, resumen_reuniones
+from .consultas import entero_param, fecha_param, filtrar_medidas, totales_medidas
+from .panel_tutor import invalidar_paneles_de_alumnos, panel_tutor
+from .suspensiones import registrar_suspensiones, suspendidos
 from .models import Lugar, TipoIncidencia, MedidaXAlumno, Incidencia, Reunion, Asistencia, ActExtracurricular, ActExtracurricularXGrado
 from .serializers import (
     LugarSerializer,
     TipoIncidenciaSerializer,
     IncidenciaSerializer, 
     MedidaXAlumnoSerializer, 
+    MedidaLoteSerializer,
     ReunionSerializer, 
     AsistenciaSerializer, 
+    AsistenciaLoteSerializer,
     ActExtracurricularSerializer, 
-    ActExtracurricularXGradoSerializer
+    ActExtracurricularXGradoSerializer,
+    SuspensionAlumnoSerializer
 )
 
-class LugarView(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+class LugarView(CatalogoCacheMixin, viewsets.ModelViewSet):
     serializer_class = LugarSerializer
     queryset = Lugar.objects.all()
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    catalogo = 'lugares'
 
-class TipoIncidenciaView(viewsets.ModelViewSet):
+class TipoIncidenciaView(CatalogoCacheMixin, viewsets.ModelViewSet):
     queryset = TipoIncidencia.objects.all()
     serializer_class = TipoIncidenciaSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    catalogo = 'tipos_incidencia'
+    # IncidenciaSerializer y el catálogo anidado exponen tipo_incidencia_nombre
+    catalogos_invalidados = ('tipos_incidencia', 'incidencias', 'tipos_incidencias_completo')
 
-class IncidenciaView(viewsets.ModelViewSet):
+class IncidenciaView(CatalogoCacheMixin, viewsets.ModelViewSet):
     serializer_class = IncidenciaSerializer
-    queryset = Incidencia.objects.all()
+    queryset = Incidencia.objects.select_related('tipo_incidencia')
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    catalogo = 'incidencias'
+    catalogos_invalidados = ('incidencias', 'tipos_incidencias_completo')
 
 # En views.py - MODIFICAR MedidaXAlumnoView
 class MedidaXAlumnoView(viewsets.ModelViewSet):
     serializer_class = MedidaXAlumnoSerializer
-    queryset = MedidaXAlumno.objects.all()
+    # Alumno, incidencia, lugar y empleado que muestra el serializer, en la misma consulta
+    queryset = MedidaXAlumno.objects.select_related('id_alumno', 'incidencia', 'id_lugar', 'id_empleado')
     permission_classes = [permissions.AllowAny]
+    pagination_class = MedidaXAlumnoPagination
 
     def create(self, request, *args, **kwargs):
-        print("=== DEBUG CREATE MEDIDA ===")
-        print("📥 Datos recibidos:", request.data)
-        print("👤 Usuario autenticado:", request.user)
-        
+        logger.debug('Datos recibidos para medida: %s', request.data)
         try:
-            # Validar serializer
             serializer = self.get_serializer(data=request.data)
-            print("🔍 Serializer válido?", serializer.is_valid())
-            
             if not serializer.is_valid():
-                print("❌ Errores de serializer:", serializer.errors)
+                logger.info('Medida rechazada', extra={'errores': serializer.errors})
                 return Response(serializer.errors, status=400)
-            
-            # Intentar guardar
-            print("💾 Intentando guardar...")
+
             instance = serializer.save()
-            print("✅ Medida guardada con ID:", instance.pk)
-            
+            logger.info('Medida creada', extra={
+                'id_medida': instance.pk,
+                'id_alumno': instance.id_alumno_id,
+                'id_incidencia': instance.incidencia_id,
+                'id_empleado': instance.id_empleado_id,
+            })
             return Response(serializer.data, status=201)
-            
+
         except Exception as e:
-            print("🚨 ERROR en create:", str(e))
-            print("🚨 Tipo de error:", type(e))
-            import traceback
-            print("🚨 Traceback completo:")
-            traceback.print_exc()
-            
+            logger.exception('Error creando medida')
             return Response(
                 {"error": f"Error interno del servidor: {str(e)}"}, 
                 status=500
@@ -74,21 +97,25 @@ class ReunionView(viewsets.ModelViewSet):
     serializer_class = ReunionSerializer
     queryset = Reunion.objects.all()
     permission_classes = [permissions.AllowAny]
+    pagination_class = ReunionPagination
 
 class AsistenciaView(viewsets.ModelViewSet):
     serializer_class = AsistenciaSerializer
     queryset = Asistencia.objects.all()
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
 
 class ActExtracurricularView(viewsets.ModelViewSet):
     serializer_class = ActExtracurricularSerializer
     queryset = ActExtracurricular.objects.all()
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
 
 class ActExtracurricularXGradoView(viewsets.ModelViewSet):
     serializer_class = ActExtracurricularXGradoSerializer
     queryset = ActExtracurricularXGrado.objects.all()
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
 
 @api_view(['GET'])
 def buscar_alumno_por_dni(request):
@@ -105,45 +132,246 @@ def buscar_alumno_por_dni(request):
     serializer = AlumnoSerializer(alumno)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
-# En views.py - VERIFICAR que existe esta vista
 @api_view(['GET'])
 def listar_incidencias(request):
     """
-    Lista todas las incidencias con filtros opcionales
+    Consulta de incidencias (medidas por alumno), de la más reciente a la más vieja.
+
+    Filtros: id_grado, id_alumno, dni_alumno, id_tipo_incidencia, id_incidencia,
+    id_lugar, id_empleado, desde / hasta (AAAA-MM-DD) y suspension=true|false.
+    Paginado por cursor (?page_size=, ?cursor=). La primera página trae
+    count y suspensiones (una sola consulta de conteo); las siguientes sólo
+    next y results.
+    Con ?formato=json o ?formato=ndjson se exporta en streaming por lotes.
     """
     try:
-        # Obtener parámetros de filtro
-        dni_alumno = request.GET.get('dni_alumno', '').strip()
-        id_grado = request.GET.get('id_grado', '').strip()
-        
-        # Query base
-        medidas = MedidaXAlumno.objects.all().select_related(
+        medidas = filtrar_medidas(request.query_params).select_related(
             'id_alumno',
-            'incidencia', 
+            'incidencia',
             'id_lugar',
             'id_empleado'
-        ).order_by('-fecha_medida')
-        
-        # Aplicar filtros
-        if dni_alumno:
-            medidas = medidas.filter(id_alumno__dni_alumno=dni_alumno)
-        
-        if id_grado:
-            medidas = medidas.filter(id_alumno__alumnos_grados__id_grado=id_grado)
-        
-        serializer = MedidaXAlumnoSerializer(medidas, many=True)
-        
-        return Response({
-            'count': medidas.count(),
-            'results': serializer.data
-        })
-        
+        )
+
+        formato = formato_exportacion(request)
+        if formato:
+            return exportar_queryset(
+                medidas.order_by(*ConsultaIncidenciasPagination.ordering),
+                MedidaXAlumnoSerializer, formato, 'incidencias'
+            )
+
+        paginator = ConsultaIncidenciasPagination()
+        pagina = paginator.paginate_queryset(medidas, request)
+        response = paginator.get_paginated_response(MedidaXAlumnoSerializer(pagina, many=True).data)
+        if not request.query_params.get('cursor'):
+            response.data = {**totales_medidas(request.query_params), **response.data}
+        return response
+
+    except ValidationError as e:
+        return Response({'error': e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+    except APIException:
+        # Cursor inválido (404): lo responde DRF
+        raise
     except Exception as e:
         return Response(
             {'error': f'Error al listar incidencias: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, HasRole('director', 'preceptor_rector')])
+def estadisticas_incidencias(request):
+    """
+    Medidas, suspensiones y días de suspensión por grado / tipo / lugar / mes.
+    Lee sólo ResumenIncidencias (ver estadisticas.py), nunca medidas_x_alumnos.
+    """
+    try:
+        return Response(estadisticas.consultar(request.query_params))
+    except ValidationError as e:
+        return Response({'error': e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def resumen_asistencias(request):
+    """
+    Asistencia por reunión (?tipo_reunion=, ?id_empleado=, ?desde= / ?hasta=
+    AAAA-MM-DD): conteos por estado, tasa de asistencia y demora de las
+    llegadas. Una consulta agrupada, cacheada hasta que cambien las asistencias.
+    """
+    try:
+        return Response(resumen_reuniones(request.query_params))
+    except ValidationError as e:
+        return Response({'error': e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def historial_asistencias_tutores(request):
+    """
+    Historial de asistencia por tutor (?id_tutor=) sobre las reuniones que
+    pasan los mismos filtros que resumen_asistencias.
+    """
+    try:
+        return Response(historial_tutores(request.query_params))
+    except ValidationError as e:
+        return Response({'error': e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, HasRole('tutor')])
+def panel_del_tutor(request):
+    """
+    Panel del tutor logueado: hijos con grado activo, medidas recientes y
+    próximas actividades del grado, y las reuniones a las que está
+    convocado. Con la caché caliente no consulta la base (ver panel_tutor.py).
+    """
+    try:
+        identidad = identidad_de_usuario(request.user)
+        return Response({
+            'tutor': {
+                'id_tutor': identidad['id_tutor'],
+                'nombre': identidad['nombre'],
+                'apellido': identidad['apellido'],
+            },
+            **panel_tutor(identidad['id_tutor']),
+        })
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def alumnos_suspendidos(request):
+    """
+    Alumnos suspendidos el día ?fecha=AAAA-MM-DD (por defecto hoy),
+    opcionalmente sólo los de ?id_grado=. Una consulta indexada sobre
+    suspensiones_alumnos, para tomar asistencia contra ella.
+    """
+    try:
+        fecha = fecha_param(request.query_params, 'fecha') or timezone.localdate()
+        id_grado = entero_param(request.query_params, 'id_grado')
+        serializer = SuspensionAlumnoSerializer(suspendidos(fecha, id_grado), many=True)
+        return Response({
+            'fecha': fecha,
+            'count': len(serializer.data),
+            'suspendidos': serializer.data,
+        })
+    except ValidationError as e:
+        return Response({'error': e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+def registrar_medidas_lote(request):
+    """
+    Registra la misma incidencia (incidencia, id_lugar, id_empleado,
+    cantidad_dias, descripcion_caso) para varios alumnos: la lista de ids
+    en `alumnos` o todos los alumnos activos de `id_grado`.
+    Valida las FK una vez, inserta con un único bulk_create y devuelve los
+    ids de las medidas creadas.
+    """
+    serializer = MedidaLoteSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    datos = serializer.validated_data
+
+    try:
+        if 'id_grado' in datos:
+            ids_alumnos = list(
+                AlumnoXGrado.objects.filter(id_grado=datos['id_grado'], activo=True)
+                .order_by('id_alumno').values_list('id_alumno', flat=True).distinct()
+            )
+            if not ids_alumnos:
+                return Response({'error': 'El grado no tiene alumnos activos'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            ids_alumnos = list(dict.fromkeys(datos['alumnos']))
+            existentes = set(Alumno.objects.filter(id_alumno__in=ids_alumnos).order_by().values_list('id_alumno', flat=True))
+            faltantes = [id_alumno for id_alumno in ids_alumnos if id_alumno not in existentes]
+            if faltantes:
+                return Response({'error': 'Alumnos no encontrados', 'alumnos': faltantes}, status=status.HTTP_400_BAD_REQUEST)
+
+        comunes = {
+            'incidencia': datos['incidencia'],
+            'id_lugar': datos['id_lugar'],
+            'id_empleado': datos['id_empleado'],
+            'cantidad_dias': datos['cantidad_dias'],
+            'descripcion_caso': datos.get('descripcion_caso'),
+        }
+        with transaction.atomic():
+            recuperar_pk = not connection.features.can_return_rows_from_bulk_insert
+            if recuperar_pk:
+                ultimo_pk = MedidaXAlumno.objects.aggregate(ultimo=Max('pk'))['ultimo'] or 0
+            medidas = [MedidaXAlumno(id_alumno_id=id_alumno, **comunes) for id_alumno in ids_alumnos]
+            # bulk_create no pasa por recordar_medida_anterior: el grado de cada medida se resuelve acá
+            estadisticas.asignar_grados(medidas)
+            medidas = MedidaXAlumno.objects.bulk_create(medidas)
+            if recuperar_pk:
+                # MySQL no devuelve las PK de bulk_create: se recuperan por alumno entre las filas nuevas
+                pks = dict(MedidaXAlumno.objects.filter(
+                    pk__gt=ultimo_pk, id_alumno__in=ids_alumnos,
+                    incidencia=comunes['incidencia'], id_empleado=comunes['id_empleado'],
+                ).values_list('id_alumno', 'pk'))
+                for medida in medidas:
+                    medida.pk = pks[medida.id_alumno_id]
+
+            # bulk_create no dispara las señales de estadisticas.py / suspensiones.py / panel_tutor.py
+            estadisticas.registrar_medidas(medidas)
+            registrar_suspensiones(medidas)
+            invalidar_paneles_de_alumnos(ids_alumnos)
+
+        logger.info('Medidas creadas en lote', extra={
+            'id_incidencia': comunes['incidencia'].pk,
+            'id_empleado': comunes['id_empleado'].pk,
+            'cantidad': len(medidas),
+        })
+        return Response({
+            'count': len(medidas),
+            'medidas': [
+                {'id_medida_x_alumno': medida.pk, 'id_alumno': medida.id_alumno_id}
+                for medida in medidas
+            ],
+        }, status=status.HTTP_201_CREATED)
+    except Exception as e:
+        logger.exception('Error creando medidas en lote')
+        return Response({'error': f'Error interno del servidor: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+def registrar_asistencias_lote(request, id_reunion):
+    """
+    Toma de asistencia en lote para una reunión. Recibe
+    {asistencias: [{id_tutor, estado_asistencia, fecha_llegada_asistencia}],
+    id_grados: [...]}: primero precarga "NO" para los tutores de los
+    alumnos activos de id_grados (un INSERT ... SELECT) y después hace un
+    upsert de las asistencias, así que se puede reintentar sin errores.
+    """
+    serializer = AsistenciaLoteSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    datos = serializer.validated_data
+
+    try:
+        reunion = Reunion.objects.get(id_reunion=id_reunion)
+    except Reunion.DoesNotExist:
+        return Response({'error': 'Reunión no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        ids_tutores = {asistencia['id_tutor'] for asistencia in datos['asistencias']}
+        existentes = set(Tutor.objects.filter(id_tutor__in=ids_tutores).values_list('id_tutor', flat=True))
+        faltantes = sorted(ids_tutores - existentes)
+        if faltantes:
+            return Response({'error': 'Tutores no encontrados', 'tutores': faltantes}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            precargados = precargar_ausentes(reunion, datos['id_grados']) if datos['id_grados'] else 0
+            registrados = registrar_asistencias(reunion, datos['asistencias']) if datos['asistencias'] else 0
+
+        logger.info('Asistencias registradas en lote', extra={
+            'id_reunion': reunion.pk, 'precargados': precargados, 'registrados': registrados,
+        })
+        return Response({'precargados': precargados, 'registrados': registrados})
+    except Exception as e:
+        logger.exception('Error registrando asistencias en lote')
+        return Response({'error': f'Error interno del servidor: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['GET'])
 def detalle_incidencia(request, id_medida):
     """
@@ -185,22 +413,31 @@ def incidencias_por_tipo(request, id_tipo_incidencia):
         return Response({'error': str(e)}, status=500)
 
 @api_view(['GET'])
+@catalogo_cacheado('tipos_incidencias_completo')
 def tipos_incidencias_con_incidencias(request):
     """
-    Obtiene todos los tipos de incidencias con sus incidencias relacionadas
+    Obtiene todos los tipos de incidencias con sus incidencias relacionadas.
+    El árbol se arma con un único LEFT JOIN y queda cacheado hasta la próxima
+    escritura en TipoIncidenciaView / IncidenciaView.
     """
     try:
-        tipos = TipoIncidencia.objects.prefetch_related('incidencia_set').all()
-        
+        filas = TipoIncidencia.objects.order_by('id_tipo_incidencia', 'incidencia__id_incidencia').values_list(
+            'id_tipo_incidencia', 'tipo_incidencia_nombre', 'incidencia__id_incidencia', 'incidencia__nombre_incidencia'
+        )
+
         data = []
-        for tipo in tipos:
-            tipo_data = {
-                'id_tipo_incidencia': tipo.id_tipo_incidencia,
-                'tipo_incidencia_nombre': tipo.tipo_incidencia_nombre,
-                'incidencias': IncidenciaSerializer(tipo.incidencia_set.all(), many=True).data
-            }
-            data.append(tipo_data)
-        
+        for id_tipo, nombre_tipo, id_incidencia, nombre_incidencia in filas:
+            if not data or data[-1]['id_tipo_incidencia'] != id_tipo:
+                data.append({'id_tipo_incidencia': id_tipo, 'tipo_incidencia_nombre': nombre_tipo, 'incidencias': []})
+            if id_incidencia is not None:
+                # Mismos campos que IncidenciaSerializer
+                data[-1]['incidencias'].append({
+                    'id_incidencia': id_incidencia,
+                    'nombre_incidencia': nombre_incidencia,
+                    'tipo_incidencia': id_tipo,
+                    'tipo_incidencia_nombre': nombre_tipo,
+                })
+
         return Response(data)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
@@ -208,7 +445,12 @@ def tipos_incidencias_con_incidencias(request):
 def todos_los_alumnos(request):
     """Obtener todos los alumnos - SOLO PARA PRECEPTORES"""
     try:
-        alumnos = Alumno.objects.all()
+        alumnos = Alumno.objects.all().prefetch_related(prefetch_grado_activo())
+        paginator = AlumnoPagination()
+        pagina = paginator.paginate_queryset(alumnos, request)
+        if pagina is not None:
+            serializer = AlumnoSerializer(pagina, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = AlumnoSerializer(alumnos, many=True)
         
         return Response({
@@ -216,6 +458,9 @@ def todos_los_alumnos(request):
             'alumnos': serializer.data
         })
         
+    except APIException:
+        # Cursor inválido (404): lo responde DRF
+        raise
     except Exception as e:
         return Response(
             {'error': f'Error al obtener alumnos: {str(e)}'},
@@ -237,6 +482,7 @@ def alumnos_por_grado(request, id_grado):
         
         # Extraer los alumnos de las relaciones
         alumnos = [relacion.id_alumno for relacion in alumnos_grado]
+        prefetch_related_objects(alumnos, prefetch_grado_activo())
         
         serializer = AlumnoSerializer(alumnos, many=True)
         
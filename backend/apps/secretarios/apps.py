@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SecretarioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.secretarios'
+
+    def ready(self):
+        # Registra las señales que mantienen al día el índice de búsqueda de personas
+        from . import busqueda  # noqa: F401
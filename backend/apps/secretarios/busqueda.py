@@ -0,0 +1,333 @@
+import heapq
+import threading
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.login.models import Empleado
+from core.busqueda import IndiceNgramas, IndicePrefijos, normalizar
+from core.catalogos import invalidar_catalogo, version_catalogo
+from .models import Alumno, Colegios_procedencia, Tutor
+
+LIMITE_DEFAULT = 10
+LIMITE_MAXIMO = 50
+
+
+class IndiceColegios:
+    """
+    Índice en memoria de colegios de procedencia para el buscador (typeahead).
+
+    Se reconstruye cuando cambia la versión del catálogo 'colegios' (ver
+    core/catalogos.py), así todos los workers ven las altas; el worker que
+    atiende crear_colegio agrega la fila sin reconstruir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._colegios = {}
+        self._normalizados = {}  # id -> nombre normalizado (orden alfabético)
+        self._nombres = []   # (nombre normalizado, id) ordenado
+        self._nros = []      # (nro como texto, id) ordenado
+        self._tokens = IndicePrefijos()
+
+    @staticmethod
+    def _fila(colegio):
+        return {
+            'id': colegio.id,
+            'nro_colegio_procedencia': colegio.nro_colegio_procedencia,
+            'nombre_colegio_procedencia': colegio.nombre_colegio_procedencia,
+        }
+
+    def reconstruir(self, colegios=None, version=None):
+        if colegios is None:
+            colegios = Colegios_procedencia.objects.only('id', 'nro_colegio_procedencia', 'nombre_colegio_procedencia')
+        filas = {colegio.id: self._fila(colegio) for colegio in colegios}
+        normalizados = {id_colegio: normalizar(fila['nombre_colegio_procedencia']) for id_colegio, fila in filas.items()}
+        tokens = IndicePrefijos()
+        tokens.construir((id_colegio, nombre.split()) for id_colegio, nombre in normalizados.items())
+        nombres = sorted((nombre, id_colegio) for id_colegio, nombre in normalizados.items())
+        nros = sorted(
+            (str(fila['nro_colegio_procedencia']), id_colegio)
+            for id_colegio, fila in filas.items() if fila['nro_colegio_procedencia'] is not None
+        )
+        with self._lock:
+            self._colegios, self._normalizados, self._tokens = filas, normalizados, tokens
+            self._nombres, self._nros = nombres, nros
+            self.version = version
+
+    def _asegurar_vigente(self):
+        version = version_catalogo('colegios')
+        if version != self.version:
+            self.reconstruir(version=version)
+
+    def agregar(self, colegio):
+        fila = self._fila(colegio)
+        nombre = normalizar(fila['nombre_colegio_procedencia'])
+        self._colegios[colegio.id] = fila
+        self._normalizados[colegio.id] = nombre
+        self._tokens.agregar(colegio.id, nombre.split())
+        self._nombres.insert(bisect_left(self._nombres, (nombre, colegio.id)), (nombre, colegio.id))
+        if fila['nro_colegio_procedencia'] is not None:
+            entrada = (str(fila['nro_colegio_procedencia']), colegio.id)
+            self._nros.insert(bisect_left(self._nros, entrada), entrada)
+
+    def colegio_creado(self, colegio):
+        """Invalida el catálogo y, si nadie más lo modificó, agrega la fila sin reconstruir"""
+        nueva_version = invalidar_catalogo('colegios')['colegios']
+        with self._lock:
+            if self.version is not None and nueva_version == self.version + 1:
+                self.agregar(colegio)
+                self.version = nueva_version
+
+    @staticmethod
+    def _prefijo(entradas, prefijo):
+        i = bisect_left(entradas, (prefijo,))
+        while i < len(entradas) and entradas[i][0].startswith(prefijo):
+            yield entradas[i]
+            i += 1
+
+    def buscar(self, texto, limite=LIMITE_DEFAULT):
+        """
+        Busca por número de colegio, prefijo del nombre completo y prefijo de
+        cada palabra, sin distinguir acentos ni mayúsculas.
+        Orden: número exacto, número por prefijo, nombre que empieza con el texto,
+        resto de coincidencias por palabra; a igualdad, alfabético.
+        """
+        consulta = normalizar(texto)
+        if not consulta:
+            return []
+        self._asegurar_vigente()
+
+        with self._lock:
+            rango = {}
+            if consulta.isdigit():
+                for nro, id_colegio in self._prefijo(self._nros, consulta):
+                    rango[id_colegio] = 0 if nro == consulta else 1
+            for _, id_colegio in self._prefijo(self._nombres, consulta):
+                rango.setdefault(id_colegio, 2)
+            for id_colegio in self._tokens.buscar_tokens(consulta.split()):
+                rango.setdefault(id_colegio, 3)
+
+            mejores = heapq.nsmallest(
+                limite,
+                rango.items(),
+                key=lambda item: (item[1], self._normalizados[item[0]], item[0])
+            )
+            return [self._colegios[id_colegio] for id_colegio, _ in mejores]
+
+
+indice_colegios = IndiceColegios()
+
+
+# BÚSQUEDA UNIFICADA DE PERSONAS (alumnos, tutores y empleados)
+TIPOS_PERSONA = {
+    # tipo: (modelo, id, dni, nombre, apellido, estado)
+    'alumno': (Alumno, 'id_alumno', 'dni_alumno', 'nombre_alumno', 'apellido_alumno', 'estado_alumno'),
+    'tutor': (Tutor, 'id_tutor', 'dni_tutor', 'nombre_tutor', 'apellido_tutor', 'estado_tutor'),
+    'empleado': (Empleado, 'id_empleado', 'dni_empleado', 'nombre_empleado', 'apellido_empleado', 'estado_empleado'),
+}
+CODIGO_TIPO = {'alumno': 0, 'tutor': 1, 'empleado': 2}
+MAX_CAMBIOS_INCREMENTALES = 500
+TTL_CAMBIOS = 60 * 60 * 24
+
+
+def _clave(tipo, id_persona):
+    # Claves enteras: los conjuntos del índice ocupan bastante menos que con tuplas
+    return id_persona * 3 + CODIGO_TIPO[tipo]
+
+
+def _clave_cambios(version):
+    return f'personas:cambios:{version}'
+
+
+class IndicePersonas:
+    """
+    Índice en memoria de alumnos, tutores y empleados por nombre, apellido y DNI.
+
+    Prefijos con IndicePrefijos, coincidencias parciales con trigramas y DNI
+    parcial con un recorrido de los DNIs. Las altas / bajas / modificaciones
+    llegan por post_save / post_delete: cada cambio incrementa la versión del
+    catálogo 'personas' y deja en la caché la lista de (tipo, id) modificados,
+    así los demás workers sólo recargan esas filas en lugar de todo el índice.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = None
+        self._vaciar()
+
+    def _vaciar(self):
+        self._personas = {}   # clave -> datos públicos
+        self._tokens = {}     # clave -> tokens normalizados (nombre, apellido y DNI)
+        self._orden = {}      # clave -> (apellido normalizado, nombre normalizado, clave)
+        self._dnis = {}       # clave -> dni como texto
+        self._prefijos = IndicePrefijos()
+        self._ngramas = IndiceNgramas()
+
+    @staticmethod
+    def _filas(tipo, ids=None):
+        modelo, *campos = TIPOS_PERSONA[tipo]
+        queryset = modelo.objects.order_by()
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        for fila in queryset.values_list(*campos):
+            yield (tipo, *fila)
+
+    def _registrar(self, tipo, id_persona, dni, nombre, apellido, estado):
+        """Guarda los datos de la persona y devuelve (clave, tokens, texto para trigramas)"""
+        clave = _clave(tipo, id_persona)
+        nombre_normalizado, apellido_normalizado = normalizar(nombre), normalizar(apellido)
+        tokens = set(f'{nombre_normalizado} {apellido_normalizado}'.split())
+        tokens.add(str(dni))
+        self._personas[clave] = {
+            'tipo': tipo,
+            'id': id_persona,
+            'dni': dni,
+            'nombre': nombre,
+            'apellido': apellido,
+            'estado': estado,
+        }
+        self._tokens[clave] = tokens
+        self._orden[clave] = (apellido_normalizado, nombre_normalizado, clave)
+        self._dnis[clave] = str(dni)
+        return clave, tokens, f'{nombre_normalizado} {apellido_normalizado}'
+
+    def _indexar(self, *fila):
+        clave, tokens, texto = self._registrar(*fila)
+        self._prefijos.agregar(clave, tokens)
+        self._ngramas.agregar(clave, texto)
+
+    def _quitar(self, clave):
+        self._personas.pop(clave, None)
+        self._tokens.pop(clave, None)
+        self._orden.pop(clave, None)
+        self._dnis.pop(clave, None)
+        self._prefijos.quitar(clave)
+        self._ngramas.quitar(clave)
+
+    def reconstruir(self, filas=None, version=None):
+        """filas: iterable de (tipo, id, dni, nombre, apellido, estado); por defecto, toda la base"""
+        if filas is None:
+            filas = [fila for tipo in TIPOS_PERSONA for fila in self._filas(tipo)]
+        with self._lock:
+            self._vaciar()
+            registros = [self._registrar(*fila) for fila in filas]
+            # Construcción en bloque: ordenar una vez es mucho más barato que insertar de a uno
+            self._prefijos.construir((clave, tokens) for clave, tokens, _ in registros)
+            self._ngramas.construir((clave, texto) for clave, _, texto in registros)
+            self.version = version
+
+    def _aplicar(self, cambios):
+        """Recarga desde la base las personas modificadas (una consulta por tipo)"""
+        ids_por_tipo = {}
+        for tipo, id_persona in cambios:
+            ids_por_tipo.setdefault(tipo, set()).add(id_persona)
+        for tipo, ids in ids_por_tipo.items():
+            for id_persona in ids:
+                self._quitar(_clave(tipo, id_persona))
+            for fila in self._filas(tipo, ids):
+                self._indexar(*fila)
+
+    def sincronizar(self):
+        actual = version_catalogo('personas')
+        with self._lock:
+            if actual == self.version:
+                return
+            pendientes = actual - self.version if self.version is not None else 0
+            if not 0 < pendientes <= MAX_CAMBIOS_INCREMENTALES:
+                self.reconstruir(version=actual)
+                return
+            cambios = []
+            for version in range(self.version + 1, actual + 1):
+                cambio = cache.get(_clave_cambios(version))
+                if cambio is None:
+                    self.reconstruir(version=actual)
+                    return
+                cambios.extend(cambio)
+            self._aplicar(cambios)
+            self.version = actual
+
+    def publicar_cambios(self, cambios):
+        """cambios: lista de (tipo, id) creados, modificados o eliminados"""
+        if not cambios:
+            return
+        version = invalidar_catalogo('personas')['personas']
+        cache.set(_clave_cambios(version), list(cambios), TTL_CAMBIOS)
+        with self._lock:
+            if self.version is not None and version == self.version + 1:
+                self._aplicar(cambios)
+                self.version = version
+
+    def personas_modificadas(self, tipo, ids):
+        """Para bulk_create / update(), que no disparan señales"""
+        transaction.on_commit(lambda: self.publicar_cambios([(tipo, id_persona) for id_persona in ids]))
+
+    def buscar(self, texto, tipos=None, estado=None, limite=20):
+        """
+        Todas las palabras buscadas tienen que coincidir (palabra exacta,
+        prefijo o parte) con el nombre, el apellido o el DNI.
+        Ranking: exacta (3) > prefijo (2) > parcial (1) por palabra, +1 si el
+        apellido empieza con la primera palabra; a igualdad, por apellido y nombre.
+        """
+        tokens = normalizar(texto).split()
+        if not tokens:
+            return []
+        self.sincronizar()
+
+        with self._lock:
+            por_prefijo = {}
+            candidatos = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                por_prefijo[token] = claves = self._prefijos.buscar_prefijo(token)
+                if token.isdigit():
+                    claves = claves | {clave for clave, dni in self._dnis.items() if token in dni}
+                elif len(token) >= self._ngramas.n:
+                    claves = claves | self._ngramas.buscar_subcadena(token)
+                candidatos = claves if candidatos is None else candidatos & claves
+                if not candidatos:
+                    return []
+
+            # Puntaje entero por candidato y agrupado: sólo se ordenan los grupos necesarios
+            grupos = {}
+            for clave in candidatos:
+                persona = self._personas[clave]
+                if (tipos and persona['tipo'] not in tipos) or (estado and persona['estado'] != estado):
+                    continue
+                tokens_persona = self._tokens[clave]
+                total = 1 if self._orden[clave][0].startswith(tokens[0]) else 0
+                for token in tokens:
+                    total += 3 if token in tokens_persona else 2 if clave in por_prefijo[token] else 1
+                grupos.setdefault(total, []).append(clave)
+
+            mejores = []
+            for total in sorted(grupos, reverse=True):
+                faltan = limite - len(mejores)
+                if faltan <= 0:
+                    break
+                mejores.extend(heapq.nsmallest(faltan, grupos[total], key=self._orden.__getitem__))
+            return [self._personas[clave] for clave in mejores]
+
+
+indice_personas = IndicePersonas()
+
+
+def _tipo_de(sender):
+    for tipo, (modelo, *_) in TIPOS_PERSONA.items():
+        if modelo is sender:
+            return tipo
+    return None
+
+
+@receiver(post_save, sender=Alumno)
+@receiver(post_save, sender=Tutor)
+@receiver(post_save, sender=Empleado)
+@receiver(post_delete, sender=Alumno)
+@receiver(post_delete, sender=Tutor)
+@receiver(post_delete, sender=Empleado)
+def actualizar_indice_personas(sender, instance, **kwargs):
+    """Mantiene al día el índice de personas en cada alta, modificación o baja"""
+    indice_personas.personas_modificadas(_tipo_de(sender), [instance.pk])
@@ -0,0 +1,124 @@
+"""
+Importación masiva de tutores.
+
+Crear tutores de a uno dispara la señal crear_usuario_para_tutor por fila:
+get_or_create del User, set_password (PBKDF2, cientos de ms de CPU) y un
+segundo Tutor.save(). Acá los tutores se insertan con bulk_create (que no
+dispara señales), los hashes de las contraseñas temporales se calculan en
+un pool de procesos y los User se crean también con bulk_create.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .busqueda import indice_personas
+from .models import Tutor
+from .serializers import TutorLoteSerializer
+
+MAX_TUTORES_LOTE = 5000
+# Por debajo de esto levantar el pool cuesta más que hashear en el mismo proceso
+MIN_CONTRASENAS_POOL = 16
+
+
+def _inicializar_proceso():
+    # Con spawn / forkserver el proceso hijo arranca sin Django configurado
+    django.setup()
+
+
+def hashear_contrasenas(contrasenas, procesos=None):
+    """Devuelve make_password() de cada contraseña, en paralelo con un proceso por núcleo"""
+    contrasenas = list(contrasenas)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(contrasenas) < MIN_CONTRASENAS_POOL:
+        return [make_password(contrasena) for contrasena in contrasenas]
+    chunksize = max(1, len(contrasenas) // (procesos * 4))
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso) as pool:
+        return list(pool.map(make_password, contrasenas, chunksize=chunksize))
+
+
+def importar_tutores(registros, procesos=None):
+    """
+    Valida e inserta en lote los tutores de `registros` (lista de dicts con los
+    campos de Tutor) y crea sus usuarios (usuario y contraseña temporal = DNI).
+
+    Devuelve (creados, errores): las filas inválidas se informan por índice
+    sin abortar las válidas.
+    """
+    errores = {}
+    validos = {}
+
+    # 1. VALIDACIÓN DE CAMPOS (sin consultas)
+    for fila, registro in enumerate(registros):
+        serializer = TutorLoteSerializer(data=registro)
+        if serializer.is_valid():
+            validos[fila] = serializer.validated_data
+        else:
+            errores[fila] = {'error': 'Datos inválidos', 'detalles': serializer.errors}
+
+    # 2. VALIDACIÓN CONTRA LA BASE - una consulta por campo único para todo el lote
+    dnis_existentes = set(Tutor.objects.filter(
+        dni_tutor__in=[datos['dni_tutor'] for datos in validos.values()]
+    ).values_list('dni_tutor', flat=True))
+    correos_existentes = set(Tutor.objects.filter(
+        correo_tutor__in=[datos['correo_tutor'] for datos in validos.values()]
+    ).values_list('correo_tutor', flat=True))
+
+    dnis_vistos = set()
+    correos_vistos = set()
+    for fila, datos in list(validos.items()):
+        dni, correo = datos['dni_tutor'], datos['correo_tutor']
+        error = None
+        if dni in dnis_existentes:
+            error = f'DNI {dni} ya está registrado'
+        elif dni in dnis_vistos:
+            error = f'DNI {dni} repetido en el lote'
+        elif correo in correos_existentes:
+            error = f'El email {correo} ya está registrado'
+        elif correo in correos_vistos:
+            error = f'El email {correo} repetido en el lote'
+
+        if error:
+            errores[fila] = {'error': error}
+            del validos[fila]
+        else:
+            dnis_vistos.add(dni)
+            correos_vistos.add(correo)
+
+    if not validos:
+        return [], errores
+
+    # 3. HASHES FUERA DE LA TRANSACCIÓN - sólo para los usuarios que no existen
+    # (igual que sync_user: si el User ya existe se deja como está)
+    usuarios_existentes = set(User.objects.filter(
+        username__in=[str(dni) for dni in dnis_vistos]
+    ).values_list('username', flat=True))
+    usuarios_nuevos = [str(dni) for dni in dnis_vistos if str(dni) not in usuarios_existentes]
+    hashes = hashear_contrasenas(usuarios_nuevos, procesos=procesos)
+
+    # 4. INSERTAR TUTORES Y USUARIOS CON bulk_create
+    with transaction.atomic():
+        Tutor.objects.bulk_create(
+            [Tutor(**datos, primer_login=True) for datos in validos.values()],
+            batch_size=500
+        )
+        User.objects.bulk_create(
+            [User(username=username, password=password) for username, password in zip(usuarios_nuevos, hashes)],
+            batch_size=500
+        )
+        # MySQL no devuelve las PK de bulk_create: se recuperan por DNI (único)
+        ids_por_dni = dict(Tutor.objects.filter(dni_tutor__in=dnis_vistos).values_list('dni_tutor', 'id_tutor'))
+        indice_personas.personas_modificadas('tutor', ids_por_dni.values())
+
+    creados = [
+        {
+            'fila': fila,
+            'tutor_id': ids_por_dni[datos['dni_tutor']],
+            'tutor_dni': datos['dni_tutor'],
+        }
+        for fila, datos in validos.items()
+    ]
+    return creados, errores
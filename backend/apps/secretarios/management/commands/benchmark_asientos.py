@@ -0,0 +1,87 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.secretarios.models import Grado
+
+
+class Command(BaseCommand):
+    help = (
+        'Stress test de reserva de asientos: N hilos inscriben en el mismo grado a la vez. '
+        'Verifica que no haya sobreventa y mide el throughput. '
+        'Sólo corre con el perfil de benchmark (core.settings_benchmark).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=50, help='Inscripciones concurrentes')
+        parser.add_argument('--asientos', type=int, default=30, help='Asientos iniciales del grado de prueba')
+        parser.add_argument(
+            '--legacy', action='store_true',
+            help='Usa el método anterior (leer, restar en Python y save()) para comparar'
+        )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK', False):
+            raise CommandError('Sólo corre con el perfil de benchmark: DJANGO_SETTINGS_MODULE=core.settings_benchmark')
+
+        hilos = options['hilos']
+        asientos = options['asientos']
+        grado = Grado.objects.create(nombre_grado='__benchmark_asientos__', asientos_disponibles=asientos)
+        reservas = []
+        errores = []
+        barrera = threading.Barrier(hilos)
+
+        def reservar_legacy():
+            g = Grado.objects.get(id_grado=grado.id_grado)
+            if g.asientos_disponibles > 0:
+                g.asientos_disponibles -= 1
+                g.save()
+                return True
+            return False
+
+        def inscribir():
+            try:
+                barrera.wait()
+                with transaction.atomic():
+                    if options['legacy']:
+                        ok = reservar_legacy()
+                    else:
+                        ok = Grado.objects.reservar_asiento(grado.id_grado)
+                reservas.append(ok)
+            except Exception as e:
+                errores.append(str(e))
+            finally:
+                connection.close()
+
+        try:
+            threads = [threading.Thread(target=inscribir) for _ in range(hilos)]
+            inicio = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            duracion = time.perf_counter() - inicio
+
+            grado.refresh_from_db()
+            exitosas = sum(reservas)
+            rechazadas = len(reservas) - exitosas
+            esperado = max(asientos - exitosas, 0)
+            sobreventa = exitosas > asientos or grado.asientos_disponibles != esperado
+
+            self.stdout.write(f"Método: {'legacy (leer + save)' if options['legacy'] else 'UPDATE condicional'}")
+            self.stdout.write(f'Inscripciones concurrentes: {hilos} - asientos iniciales: {asientos}')
+            self.stdout.write(f'Reservas exitosas: {exitosas} - rechazadas: {rechazadas} - errores: {len(errores)}')
+            self.stdout.write(f'Asientos finales: {grado.asientos_disponibles} (esperado {esperado})')
+            self.stdout.write(f'Duración: {duracion * 1000:.1f} ms - throughput: {hilos / duracion:.0f} inscripciones/s')
+            for error in errores[:5]:
+                self.stderr.write(f'  error: {error}')
+
+            if sobreventa:
+                self.stdout.write(self.style.ERROR('SOBREVENTA / ACTUALIZACIONES PERDIDAS detectadas'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Sin sobreventa'))
+        finally:
+            grado.delete()
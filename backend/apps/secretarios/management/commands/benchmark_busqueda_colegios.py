@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from apps.secretarios.busqueda import IndiceColegios
+from apps.secretarios.models import Colegios_procedencia
+from apps.secretarios.serializers import ColegioSerializer
+from core.catalogos import version_catalogo
+
+PALABRAS = [
+    'Escuela', 'Colegio', 'Instituto', 'Normal', 'Técnica', 'Nº', 'San', 'José', 'María', 'Belgrano',
+    'Sarmiento', 'Güemes', 'Río', 'Cuarto', 'Córdoba', 'Provincial', 'Municipal', 'Nuestra', 'Señora',
+    'del', 'Carmen', 'Alberdi', 'Mitre', 'Rivadavia', 'Almafuerte', 'Piaget', 'Santa', 'Rosa', 'Lucía',
+]
+
+
+def colegios_sinteticos(cantidad):
+    rnd = random.Random(42)
+    return [
+        Colegios_procedencia(
+            id=i,
+            nro_colegio_procedencia=1000 + i,
+            nombre_colegio_procedencia=' '.join(rnd.choice(PALABRAS) for _ in range(rnd.randint(2, 5))),
+        )
+        for i in range(1, cantidad + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compara el buscador de colegios (índice en memoria) contra descargar la lista completa y filtrar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sinteticos', type=int, default=0,
+                            help='Usa N colegios generados en memoria en lugar de la base')
+        parser.add_argument('--repeticiones', type=int, default=200)
+        parser.add_argument('--consultas', nargs='+', default=['esc', 'san jo', 'cordoba', 'nor tec', '1042', 'senora del'])
+
+    def medir(self, funcion, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        tiempos.sort()
+        return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1]
+
+    def handle(self, *args, **options):
+        repeticiones = options['repeticiones']
+        if options['sinteticos']:
+            colegios = colegios_sinteticos(options['sinteticos'])
+            origen = f"{len(colegios)} colegios sintéticos"
+            obtener_todos = lambda: colegios
+        else:
+            origen = f"{Colegios_procedencia.objects.count()} colegios de la base"
+            obtener_todos = lambda: list(Colegios_procedencia.objects.all())
+
+        indice = IndiceColegios()
+        inicio = time.perf_counter()
+        indice.reconstruir(obtener_todos(), version=version_catalogo('colegios'))
+        construccion = (time.perf_counter() - inicio) * 1000
+        self.stdout.write(f'{origen} - construcción del índice: {construccion:.1f} ms')
+
+        def lista_completa(consulta):
+            # Lo que hace hoy cada apertura del formulario: serializar todo y filtrar en el cliente
+            cuerpo = JSONRenderer().render(ColegioSerializer(obtener_todos(), many=True).data)
+            consulta = consulta.lower()
+            return cuerpo, [c for c in obtener_todos() if consulta in c.nombre_colegio_procedencia.lower()][:10]
+
+        self.stdout.write(f"{'consulta':<14}{'lista p50':>12}{'lista p95':>12}{'índice p50':>13}{'índice p95':>13}{'resultados':>12}")
+        for consulta in options['consultas']:
+            lista_p50, lista_p95 = self.medir(lambda: lista_completa(consulta), max(repeticiones // 10, 5))
+            indice_p50, indice_p95 = self.medir(lambda: indice.buscar(consulta), repeticiones)
+            self.stdout.write(
+                f'{consulta:<14}{lista_p50:>10.2f}ms{lista_p95:>10.2f}ms{indice_p50:>11.3f}ms{indice_p95:>11.3f}ms'
+                f'{len(indice.buscar(consulta)):>12}'
+            )
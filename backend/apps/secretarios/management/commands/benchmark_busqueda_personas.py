@@ -0,0 +1,60 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.secretarios.busqueda import IndicePersonas, TIPOS_PERSONA
+from core.catalogos import version_catalogo
+
+NOMBRES = [
+    'María', 'José', 'Juan', 'Ana', 'Lucía', 'Martín', 'Sofía', 'Mateo', 'Valentina', 'Joaquín',
+    'Camila', 'Tomás', 'Agustina', 'Benjamín', 'Florencia', 'Nicolás', 'Julieta', 'Santiago', 'Milagros', 'Ramón',
+]
+APELLIDOS = [
+    'González', 'Rodríguez', 'Gómez', 'Fernández', 'López', 'Díaz', 'Martínez', 'Pérez', 'García', 'Sánchez',
+    'Romero', 'Sosa', 'Álvarez', 'Torres', 'Ruiz', 'Ramírez', 'Flores', 'Acosta', 'Benítez', 'Medina',
+    'Herrera', 'Suárez', 'Aguirre', 'Giménez', 'Gutiérrez', 'Pereyra', 'Rojas', 'Molina', 'Castro', 'Ortiz',
+]
+
+
+def personas_sinteticas(cantidad):
+    rnd = random.Random(42)
+    tipos = list(TIPOS_PERSONA)
+    for i in range(1, cantidad + 1):
+        nombre = ' '.join(rnd.sample(NOMBRES, rnd.choice([1, 1, 2])))
+        apellido = ' '.join(rnd.sample(APELLIDOS, rnd.choice([1, 1, 2])))
+        yield (tipos[i % 3], i, 20000000 + rnd.randrange(30000000), nombre, apellido,
+               'Activo' if rnd.random() < 0.9 else 'Inactivo')
+
+
+class Command(BaseCommand):
+    help = 'Mide la búsqueda unificada de personas (índice en memoria)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sinteticos', type=int, default=0,
+                            help='Usa N personas generadas en memoria en lugar de la base')
+        parser.add_argument('--repeticiones', type=int, default=100)
+        parser.add_argument('--consultas', nargs='+',
+                            default=['gonz', 'maria gomez', 'rez', 'jose per', 'sofia', '3012', 'a', 'alvarez ruiz'])
+
+    def handle(self, *args, **options):
+        indice = IndicePersonas()
+        filas = list(personas_sinteticas(options['sinteticos'])) if options['sinteticos'] else None
+        inicio = time.perf_counter()
+        indice.reconstruir(filas, version=version_catalogo('personas'))
+        self.stdout.write(f'{len(indice._personas)} personas - construcción del índice: '
+                          f'{(time.perf_counter() - inicio) * 1000:.0f} ms')
+
+        self.stdout.write(f"{'consulta':<16}{'p50':>10}{'p95':>10}{'máx':>10}{'resultados':>12}")
+        for consulta in options['consultas']:
+            tiempos = []
+            for _ in range(options['repeticiones']):
+                inicio = time.perf_counter()
+                resultados = indice.buscar(consulta, estado='Activo')
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            tiempos.sort()
+            self.stdout.write(
+                f'{consulta:<16}{statistics.median(tiempos):>8.2f}ms'
+                f'{tiempos[int(len(tiempos) * 0.95) - 1]:>8.2f}ms{tiempos[-1]:>8.2f}ms{len(resultados):>12}'
+            )
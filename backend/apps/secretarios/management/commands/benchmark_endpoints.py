@@ -0,0 +1,293 @@
+import json
+import re
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+
+from apps.login.identidad import emitir_tokens, identidad_de
+from apps.login.models import Empleado
+from apps.preceptores_rectores.models import Asistencia, MedidaXAlumno, Reunion, TipoIncidencia
+from apps.secretarios.models import Alumno, AlumnoXGrado, AlumnoXTutor, Tutor
+from core.middleware import RegistroConsultas
+
+PARAMETRO_RUTA = re.compile(r'<(?:\w+:)?(\w+)>|\(\?P<(\w+)>[^)]*\)')
+
+# Variantes con query string que vale la pena medir además de la URL pelada
+VARIANTES = [
+    ('alumnos-list', {'page_size': 50}),
+    ('alumnos-completos', {'page_size': 50}),
+    ('alumnos-completos', {'formato': 'ndjson'}),
+    ('listar_incidencias', {'page_size': 50}),
+    ('listar_incidencias', {'id_grado': '{id_grado}'}),
+]
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def patrones_api(patrones=None, prefijo=''):
+    """(ruta, URLPattern) de todas las URLs bajo api/, con el prefijo de los include()"""
+    for patron in get_resolver().url_patterns if patrones is None else patrones:
+        ruta = prefijo + str(patron.pattern).lstrip('^').rstrip('$')
+        if isinstance(patron, URLResolver):
+            yield from patrones_api(patron.url_patterns, ruta)
+        elif isinstance(patron, URLPattern) and ruta.startswith('api/'):
+            yield ruta, patron
+
+
+def acepta_get(patron):
+    callback = patron.callback
+    acciones = getattr(callback, 'actions', None)
+    if acciones is not None:
+        return 'get' in acciones
+    vista = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    return vista is not None and hasattr(vista, 'get')
+
+
+def roles_requeridos(patron):
+    """Roles de los HasRole de la vista (vacío si entra cualquier usuario autenticado)"""
+    vista = getattr(patron.callback, 'cls', None) or getattr(patron.callback, 'view_class', None)
+    roles = set()
+    for permiso in getattr(vista, 'permission_classes', ()):
+        roles.update(getattr(permiso, 'roles', ()))
+    return roles
+
+
+def usuario_con_rol(rol):
+    if rol == 'tutor':
+        # Un tutor activo con hijos, para que el panel no salga vacío
+        username = AlumnoXTutor.objects.filter(id_tutor__estado_tutor='Activo').order_by('id_tutor').values_list(
+            'id_tutor__dni_tutor', flat=True
+        ).first()
+    else:
+        username = Empleado.objects.filter(id_rol__nombre_rol=rol).order_by('id_empleado').values_list(
+            'dni_empleado', flat=True
+        ).first()
+    return User.objects.filter(username=str(username)).first() if username is not None else None
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide p50/p95, consultas SQL y memoria pico de todos los endpoints GET de apps/*/urls.py '
+        'y guarda el resultado en JSON para comparar entre commits. Usar con core.settings_benchmark '
+        'después de sembrar_escuela.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=10)
+        parser.add_argument('--salida', default=None, help='Archivo JSON (por defecto benchmarks/<commit>.json)')
+        parser.add_argument('--comparar', default=None, help='JSON de una corrida anterior para mostrar diferencias')
+        parser.add_argument('--filtro', default=None, help='Sólo las URLs que contengan este texto')
+
+    def handle(self, *args, **options):
+        self.clientes = {}
+        if self.cliente('director') is None:
+            raise CommandError('No hay un director con usuario: correr antes sembrar_escuela')
+        self.valores = self.valores_de_muestra()
+
+        casos, omitidos = self.casos(options['filtro'])
+        resultados, fallidos = {}, []
+        for clave, url, parametros, rol in casos:
+            resultados[clave] = self.medir(self.clientes[rol], url, parametros, options['repeticiones'])
+            r = resultados[clave]
+            r['rol'] = rol
+            # Un 4xx/5xx mide la respuesta de error, no el endpoint
+            correcto = 200 <= r['status'] < 300
+            if not correcto:
+                fallidos.append(f"{clave} ({r['status']})")
+            estilo = str if correcto else self.style.ERROR
+            self.stdout.write(estilo(
+                f"{clave[:70]:<72}{r['status']:>4}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                f"{r['consultas']:>7}{r['memoria_pico_kb']:>10.0f} KB"
+            ))
+        for clave, motivo in omitidos:
+            self.stdout.write(f'  omitido {clave}: {motivo}')
+
+        commit = commit_actual()
+        reporte = {
+            'commit': commit,
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'base': connection.vendor,
+            'repeticiones': options['repeticiones'],
+            'dataset': {
+                modelo.__name__: modelo.objects.count()
+                for modelo in [Alumno, Tutor, MedidaXAlumno, Reunion, Asistencia]
+            },
+            'endpoints': resultados,
+            'omitidos': dict(omitidos),
+            'fallidos': fallidos,
+        }
+        salida = Path(options['salida'] or Path(settings.BASE_DIR) / 'benchmarks' / f"{commit or 'sin-commit'}.json")
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(json.dumps(reporte, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f'Resultados en {salida}'))
+
+        if options['comparar']:
+            self.comparar(json.loads(Path(options['comparar']).read_text()), reporte)
+
+        if fallidos:
+            raise CommandError(f'{len(fallidos)} endpoints respondieron fuera de 2xx: ' + ', '.join(fallidos))
+
+    def cliente(self, rol):
+        """Client con un token de un usuario del rol (None si la base no tiene ninguno)"""
+        if rol not in self.clientes:
+            user = usuario_con_rol(rol)
+            if user is None:
+                self.clientes[rol] = None
+            else:
+                identidad, _ = identidad_de(user.username)
+                token = emitir_tokens(user, identidad).access_token
+                self.clientes[rol] = Client(headers={'Authorization': f'Bearer {token}'}, raise_request_exception=False)
+        return self.clientes[rol]
+
+    def rol_para(self, patron):
+        # El director entra a casi todo; las vistas de otros roles (el panel
+        # del tutor) se miden con un usuario de ese rol
+        roles = roles_requeridos(patron)
+        if not roles or 'director' in roles:
+            return 'director'
+        return next((rol for rol in sorted(roles) if self.cliente(rol) is not None), None)
+
+    def valores_de_muestra(self):
+        """Valores reales de la base para completar los parámetros de las rutas"""
+        alumno = Alumno.objects.order_by('id_alumno').first()
+        tutor = Tutor.objects.order_by('id_tutor').first()
+        id_grado = AlumnoXGrado.objects.filter(activo=True).values_list('id_grado', flat=True).first()
+        return {
+            'dni_alumno': alumno.dni_alumno,
+            'dni_tutor': tutor.dni_tutor,
+            'correo_tutor': tutor.correo_tutor,
+            'telefono_tutor': tutor.telefono_tutor,
+            'dni_empleado': Empleado.objects.order_by('id_empleado').values_list('dni_empleado', flat=True).first(),
+            'id_grado': id_grado,
+            'id_medida': MedidaXAlumno.objects.values_list('id_medida_x_alumno', flat=True).first(),
+            'id_tipo_incidencia': TipoIncidencia.objects.values_list('id_tipo_incidencia', flat=True).first(),
+        }
+
+    def valor_parametro(self, ruta, nombre, patron):
+        if nombre == 'pk':
+            modelo = patron.callback.cls.queryset.model
+            return modelo.objects.order_by('pk').values_list('pk', flat=True).first()
+        if nombre == 'dni':
+            if 'tutores/' in ruta:
+                return self.valores['dni_tutor']
+            if 'empleados/' in ruta:
+                return self.valores['dni_empleado']
+            return self.valores['dni_alumno']
+        return self.valores.get(nombre)
+
+    def parametros_query(self, nombre_url):
+        return {
+            'buscar_alumno_por_dni': {'dni_alumno': self.valores['dni_alumno']},
+            'verificar-email-tutor': {'email': self.valores['correo_tutor']},
+            'verificar-telefono-tutor': {'telefono': self.valores['telefono_tutor']},
+            'buscar-colegios': {'q': 'escuela'},
+            'buscar-personas': {'q': 'gonz'},
+        }.get(nombre_url, {})
+
+    def casos(self, filtro):
+        casos, omitidos, vistos = [], [], set()
+        for ruta, patron in patrones_api():
+            if '(?P<format>' in ruta or not acepta_get(patron):
+                continue
+            url = ruta
+            faltantes = []
+            for match in PARAMETRO_RUTA.finditer(ruta):
+                nombre = match.group(1) or match.group(2)
+                valor = self.valor_parametro(ruta, nombre, patron)
+                if valor is None:
+                    faltantes.append(nombre)
+                url = url.replace(match.group(0), str(valor), 1)
+            url = '/' + url
+            clave = f'{patron.name or "-"} {ruta}'
+            if url in vistos:
+                continue
+            vistos.add(url)
+            if faltantes:
+                omitidos.append((clave, f'sin valor para {", ".join(faltantes)}'))
+                continue
+            destino = resolve(url)
+            if destino.func is not patron.callback:
+                # Un patrón anterior atiende la URL: se mediría otra vista
+                omitidos.append((clave, f'la URL la atiende {destino.route}'))
+                continue
+            rol = self.rol_para(patron)
+            if rol is None:
+                omitidos.append((clave, f'sin usuario con rol {", ".join(sorted(roles_requeridos(patron)))}'))
+                continue
+            casos.append((clave, url, self.parametros_query(patron.name), rol))
+            for nombre, parametros in VARIANTES:
+                if nombre == patron.name:
+                    parametros = {k: str(v).format(**self.valores) for k, v in parametros.items()}
+                    variante = '&'.join(f'{k}={v}' for k, v in parametros.items())
+                    casos.append((f'{clave}?{variante}', url, parametros, rol))
+        if filtro:
+            casos = [caso for caso in casos if filtro in caso[0]]
+        return casos, omitidos
+
+    def pedir(self, client, url, parametros):
+        response = client.get(url, parametros)
+        # Las exportaciones en streaming se consumen completas
+        contenido = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, len(contenido)
+
+    def medir(self, client, url, parametros, repeticiones):
+        response, _ = self.pedir(client, url, parametros)  # calentamiento (cachés, índices en memoria)
+
+        tiempos, consultas = [], []
+        for _ in range(repeticiones):
+            registro = RegistroConsultas()
+            with connection.execute_wrapper(registro):
+                inicio = time.perf_counter()
+                response, tamano = self.pedir(client, url, parametros)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(registro.cantidad)
+
+        # Memoria en una pasada aparte: tracemalloc distorsiona los tiempos
+        tracemalloc.start()
+        self.pedir(client, url, parametros)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tiempos.sort()
+        return {
+            'url': url,
+            'parametros': parametros,
+            'status': response.status_code,
+            'p50_ms': round(statistics.median(tiempos), 2),
+            'p95_ms': round(tiempos[max(0, int(len(tiempos) * 0.95) - 1)], 2),
+            'max_ms': round(tiempos[-1], 2),
+            'consultas': max(consultas),
+            'memoria_pico_kb': round(pico / 1024, 1),
+            'bytes': tamano,
+        }
+
+    def comparar(self, anterior, actual):
+        self.stdout.write(f"\nComparación {anterior.get('commit')} -> {actual.get('commit')}")
+        self.stdout.write(f"{'endpoint':<72}{'p50 antes':>11}{'ahora':>9}{'Δ%':>8}{'sql':>9}")
+        for clave, ahora in actual['endpoints'].items():
+            antes = anterior.get('endpoints', {}).get(clave)
+            if antes is None:
+                continue
+            delta = (ahora['p50_ms'] - antes['p50_ms']) / antes['p50_ms'] * 100 if antes['p50_ms'] else 0
+            estilo = self.style.ERROR if delta > 20 else self.style.SUCCESS if delta < -20 else str
+            self.stdout.write(estilo(
+                f"{clave[:70]:<72}{antes['p50_ms']:>11.1f}{ahora['p50_ms']:>9.1f}{delta:>7.0f}%"
+                f"{antes['consultas']:>4}->{ahora['consultas']:<4}"
+            ))
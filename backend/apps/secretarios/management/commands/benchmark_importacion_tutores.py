@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.secretarios.importacion import importar_tutores
+from apps.secretarios.models import Tutor
+
+DNI_INICIAL = 90000000
+
+
+def tutores_sinteticos(cantidad, desde):
+    for i in range(cantidad):
+        dni = desde + i
+        yield {
+            'dni_tutor': dni,
+            'nombre_tutor': f'Nombre{i}',
+            'apellido_tutor': f'Apellido{i}',
+            'telefono_tutor': f'351{dni:07d}'[-10:],
+            'correo_tutor': f'tutor{dni}@benchmark.local',
+            'genero_tutor': 'F' if i % 2 else 'M',
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la importación de tutores de a uno (señal post_save por fila) '
+        'con la importación en lote. Borra los tutores y usuarios que creó al terminar. '
+        'Sólo corre con el perfil de benchmark (core.settings_benchmark).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=300, help='Tutores a importar con cada método')
+        parser.add_argument('--procesos', type=int, default=None,
+                            help='Procesos para hashear contraseñas (por defecto, uno por núcleo)')
+        parser.add_argument('--sin-legacy', action='store_true', help='Sólo mide la importación en lote')
+
+    def medir(self, nombre, filas, funcion):
+        inicio = time.perf_counter()
+        funcion()
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(f'{nombre:<28}{filas:>8} filas{duracion:>10.2f} s{filas / duracion:>10.1f} filas/s')
+        return filas / duracion
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK', False):
+            raise CommandError('Sólo corre con el perfil de benchmark: DJANGO_SETTINGS_MODULE=core.settings_benchmark')
+
+        filas = options['filas']
+        legacy = list(tutores_sinteticos(filas, DNI_INICIAL))
+        lote = list(tutores_sinteticos(filas, DNI_INICIAL + filas))
+        usernames = [str(t['dni_tutor']) for t in legacy + lote]
+        # Al terminar se borra sólo lo que insertó esta corrida
+        usuarios_previos = set(User.objects.filter(username__in=usernames).values_list('pk', flat=True))
+        tutores_creados = []
+
+        def importar_legacy():
+            for datos in legacy:
+                tutores_creados.append(Tutor.objects.create(**datos).pk)
+
+        def importar_lote():
+            creados, errores = importar_tutores(lote, procesos=options['procesos'])
+            tutores_creados.extend(creado['tutor_id'] for creado in creados)
+            if errores:
+                self.stderr.write(f'  {len(errores)} filas con errores')
+
+        try:
+            antes = None
+            if not options['sin_legacy']:
+                antes = self.medir('de a uno (señal por fila)', filas, importar_legacy)
+            despues = self.medir('en lote', filas, importar_lote)
+            if antes:
+                self.stdout.write(self.style.SUCCESS(f'Mejora: {despues / antes:.1f}x'))
+        finally:
+            Tutor.objects.filter(pk__in=tutores_creados).delete()
+            User.objects.filter(username__in=usernames).exclude(pk__in=usuarios_previos).delete()
@@ -0,0 +1,40 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.secretarios.importacion import importar_tutores
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa tutores desde un CSV (con encabezados = campos de Tutor) o un JSON (lista). '
+        'Crea los usuarios en bloque y hashea las contraseñas en paralelo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta al .csv o .json')
+        parser.add_argument('--procesos', type=int, default=None,
+                            help='Procesos para hashear contraseñas (por defecto, uno por núcleo)')
+
+    def handle(self, *args, **options):
+        archivo = options['archivo']
+        try:
+            with open(archivo, encoding='utf-8-sig', newline='') as f:
+                registros = json.load(f) if archivo.lower().endswith('.json') else list(csv.DictReader(f))
+        except (OSError, ValueError) as e:
+            raise CommandError(f'No se pudo leer {archivo}: {e}')
+        if not isinstance(registros, list):
+            raise CommandError('El JSON debe ser una lista de tutores')
+
+        inicio = time.perf_counter()
+        creados, errores = importar_tutores(registros, procesos=options['procesos'])
+        duracion = time.perf_counter() - inicio
+
+        for fila, error in sorted(errores.items()):
+            self.stderr.write(f"  fila {fila}: {error['error']} {error.get('detalles', '')}")
+        self.stdout.write(f'Filas: {len(registros)} - creados: {len(creados)} - con errores: {len(errores)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Duración: {duracion:.2f} s - {len(registros) / duracion:.0f} filas/s'
+        ))
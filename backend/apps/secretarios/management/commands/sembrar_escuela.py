@@ -0,0 +1,310 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.login.models import Empleado, Rol
+from apps.preceptores_rectores import estadisticas, suspensiones
+from apps.preceptores_rectores.models import (
+    ActExtracurricular, ActExtracurricularXGrado, Asistencia, Incidencia, Lugar,
+    MedidaXAlumno, Reunion, TipoIncidencia,
+)
+from apps.profesores.models import Asignatura, DictadoClase
+from apps.secretarios.models import (
+    Alumno, AlumnoXGrado, AlumnoXTutor, Colegios_procedencia, Grado, Parentesco, Tutor,
+)
+from core.esquema import liberar_modelos_propios, manejar_modelos_propios
+
+from .benchmark_busqueda_colegios import PALABRAS
+from .benchmark_busqueda_personas import APELLIDOS, NOMBRES
+
+LOTE = 5000
+
+ROLES = ['director', 'secretario', 'preceptor_rector', 'profesor']
+PARENTESCOS = ['Madre', 'Padre', 'Tutor legal', 'Abuela', 'Abuelo', 'Tía', 'Tío']
+LUGARES = ['Aula', 'Patio', 'Pasillo', 'Baño', 'Gimnasio', 'Biblioteca', 'Comedor', 'Laboratorio',
+           'Sala de música', 'Salida', 'Colectivo escolar', 'Campo de deportes']
+INCIDENCIAS = {
+    'Conducta': ['Falta de respeto', 'Pelea', 'Uso de celular', 'Daño a la propiedad', 'Lenguaje inapropiado',
+                 'Desobediencia', 'Acoso', 'Copia en evaluación'],
+    'Asistencia': ['Llegada tarde', 'Retiro anticipado', 'Falta injustificada', 'Fuga del establecimiento'],
+    'Presentación': ['Sin uniforme', 'Sin materiales', 'Sin tarea', 'Sin cuaderno de comunicados'],
+    'Salud': ['Malestar', 'Accidente leve', 'Accidente grave'],
+    'Convivencia': ['Discriminación', 'Exclusión de compañeros', 'Conflicto grupal'],
+    'Reconocimiento': ['Buen compañero', 'Colaboración', 'Mejora destacada'],
+}
+ASIGNATURAS = ['Matemática', 'Lengua', 'Ciencias Naturales', 'Ciencias Sociales', 'Inglés', 'Educación Física',
+               'Música', 'Plástica', 'Tecnología', 'Informática', 'Formación Ética', 'Teatro']
+
+
+@contextmanager
+def sin_auto_now_add(*campos):
+    """Permite sembrar fechas históricas en campos auto_now_add"""
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea las tablas y siembra una escuela sintética para benchmarks '
+        '(sólo con DJANGO_SETTINGS_MODULE=core.settings_benchmark).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grados', type=int, default=40)
+        parser.add_argument('--alumnos', type=int, default=12000)
+        parser.add_argument('--tutores', type=int, default=20000)
+        parser.add_argument('--medidas', type=int, default=150000)
+        parser.add_argument('--reuniones', type=int, default=5000)
+        parser.add_argument('--asistencias', type=int, default=100000)
+        parser.add_argument('--empleados', type=int, default=80)
+        parser.add_argument('--colegios', type=int, default=300)
+        parser.add_argument('--escala', type=float, default=1.0,
+                            help='Multiplica alumnos, tutores, medidas, reuniones y asistencias (ej. 0.1 para una corrida rápida)')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--vaciar', action='store_true', help='Borra los datos existentes antes de sembrar')
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK', False):
+            raise CommandError('Sólo corre con el perfil de benchmark: DJANGO_SETTINGS_MODULE=core.settings_benchmark')
+
+        self.rnd = random.Random(options['semilla'])
+        # La escala sólo achica las tablas grandes; grados, empleados y colegios quedan fijos
+        cantidades = {clave: options[clave] for clave in ['grados', 'empleados', 'colegios']}
+        for clave in ['alumnos', 'tutores', 'medidas', 'reuniones', 'asistencias']:
+            cantidades[clave] = max(1, int(options[clave] * options['escala']))
+        inicio = time.perf_counter()
+
+        self.crear_tablas()
+        if options['vaciar']:
+            call_command('flush', interactive=False, verbosity=0)
+        elif Alumno.objects.exists():
+            raise CommandError('La base ya tiene datos: usar --vaciar para volver a sembrar')
+
+        self.paso('catálogos', self.sembrar_catalogos, cantidades)
+        self.paso('empleados', self.sembrar_empleados, cantidades['empleados'])
+        self.paso('grados y alumnos', self.sembrar_alumnos, cantidades['grados'], cantidades['alumnos'])
+        self.paso('tutores', self.sembrar_tutores, cantidades['tutores'])
+        self.paso('medidas', self.sembrar_medidas, cantidades['medidas'])
+        # bulk_create no pasa por las señales que mantienen el resumen y las suspensiones
+        self.paso('estadísticas de incidencias', estadisticas.reconstruir)
+        self.paso('suspensiones', suspensiones.reconstruir)
+        self.paso('reuniones y asistencias', self.sembrar_reuniones, cantidades['reuniones'], cantidades['asistencias'])
+        self.paso('actividades y asignaturas', self.sembrar_actividades)
+
+        self.stdout.write(self.style.SUCCESS(f'Escuela sembrada en {time.perf_counter() - inicio:.1f} s'))
+        for modelo in [Grado, Alumno, Tutor, AlumnoXTutor, Empleado, MedidaXAlumno, Reunion, Asistencia]:
+            self.stdout.write(f'  {modelo.__name__:<16}{modelo.objects.count():>10}')
+
+    def crear_tablas(self):
+        modelos = manejar_modelos_propios()
+        try:
+            call_command('migrate', run_syncdb=True, interactive=False, verbosity=0)
+        finally:
+            liberar_modelos_propios(modelos)
+
+    def paso(self, nombre, funcion, *args):
+        inicio = time.perf_counter()
+        funcion(*args)
+        self.stdout.write(f'  {nombre}: {time.perf_counter() - inicio:.1f} s')
+
+    def persona(self):
+        nombre = ' '.join(self.rnd.sample(NOMBRES, self.rnd.choice([1, 1, 2])))
+        apellido = ' '.join(self.rnd.sample(APELLIDOS, self.rnd.choice([1, 1, 2])))
+        return nombre, apellido
+
+    def fecha_hora(self, desde, dias):
+        return timezone.make_aware(datetime.combine(desde, datetime.min.time()) + timedelta(
+            days=self.rnd.randrange(dias), hours=self.rnd.randint(7, 18), minutes=self.rnd.choice([0, 15, 30, 45])
+        ))
+
+    def sembrar_catalogos(self, cantidades):
+        Rol.objects.bulk_create([Rol(nombre_rol=nombre) for nombre in ROLES])
+        Parentesco.objects.bulk_create([Parentesco(parentesco_nombre=nombre) for nombre in PARENTESCOS])
+        Lugar.objects.bulk_create([Lugar(nombre_lugar=nombre) for nombre in LUGARES])
+        TipoIncidencia.objects.bulk_create([TipoIncidencia(tipo_incidencia_nombre=tipo) for tipo in INCIDENCIAS])
+        tipos = dict(TipoIncidencia.objects.values_list('tipo_incidencia_nombre', 'id_tipo_incidencia'))
+        Incidencia.objects.bulk_create([
+            Incidencia(nombre_incidencia=nombre, tipo_incidencia_id=tipos[tipo])
+            for tipo, nombres in INCIDENCIAS.items() for nombre in nombres
+        ])
+        Colegios_procedencia.objects.bulk_create([
+            Colegios_procedencia(
+                nro_colegio_procedencia=1000 + i,
+                nombre_colegio_procedencia=' '.join(self.rnd.choice(PALABRAS) for _ in range(self.rnd.randint(2, 5))),
+            )
+            for i in range(cantidades['colegios'])
+        ])
+
+    def sembrar_empleados(self, cantidad):
+        roles = dict(Rol.objects.values_list('nombre_rol', 'id_rol'))
+        empleados = []
+        for i in range(cantidad):
+            # El primero es el director (usuario staff para el benchmark de endpoints)
+            rol = 'director' if i == 0 else self.rnd.choices(ROLES[1:], weights=[1, 3, 6])[0]
+            nombre, apellido = self.persona()
+            dni = str(10000000 + i)
+            empleados.append(Empleado(
+                dni_empleado=dni, nombre_empleado=nombre, apellido_empleado=apellido,
+                genero_empleado=self.rnd.choice('MF'), id_rol_id=roles[rol],
+                correo_empleado=f'empleado{dni}@piaget.edu.ar', primer_login=False,
+            ))
+        Empleado.objects.bulk_create(empleados, batch_size=LOTE)
+        User.objects.bulk_create([
+            User(username=e.dni_empleado, password=make_password(e.dni_empleado), is_staff=(i == 0))
+            for i, e in enumerate(empleados)
+        ], batch_size=LOTE)
+
+    def sembrar_alumnos(self, cantidad_grados, cantidad_alumnos):
+        grados = []
+        for i in range(cantidad_grados):
+            grados.append(Grado(nombre_grado=f'{i // 6 + 1}° {"ABCDEF"[i % 6]}', asientos_disponibles=40))
+        Grado.objects.bulk_create(grados)
+        ids_grados = list(Grado.objects.values_list('id_grado', flat=True))
+        ids_colegios = list(Colegios_procedencia.objects.values_list('id', flat=True))
+
+        alumnos = []
+        for i in range(cantidad_alumnos):
+            nombre, apellido = self.persona()
+            alumnos.append(Alumno(
+                dni_alumno=40000000 + i, nombre_alumno=nombre, apellido_alumno=apellido,
+                fecha_nacimiento_alumno=date(2008, 1, 1) + timedelta(days=self.rnd.randrange(365 * 10)),
+                genero_alumno=self.rnd.choice('MF'),
+                estado_alumno='Activo' if self.rnd.random() < 0.95 else 'Inactivo',
+            ))
+        Alumno.objects.bulk_create(alumnos, batch_size=LOTE)
+
+        # Inscripción activa en un grado y, para un 20%, un grado anterior inactivo
+        inscripciones = []
+        for id_alumno in Alumno.objects.values_list('id_alumno', flat=True):
+            grado, anterior = self.rnd.sample(ids_grados, 2) if len(ids_grados) > 1 else (ids_grados[0], None)
+            colegio = self.rnd.choice(ids_colegios)
+            inscripciones.append(AlumnoXGrado(
+                id_alumno_id=id_alumno, id_grado_id=grado, id_colegio_procedencia_id=colegio, activo=True
+            ))
+            if anterior and self.rnd.random() < 0.2:
+                inscripciones.append(AlumnoXGrado(
+                    id_alumno_id=id_alumno, id_grado_id=anterior, id_colegio_procedencia_id=colegio, activo=False
+                ))
+        AlumnoXGrado.objects.bulk_create(inscripciones, batch_size=LOTE)
+
+    def sembrar_tutores(self, cantidad):
+        tutores = []
+        for i in range(cantidad):
+            nombre, apellido = self.persona()
+            dni = 20000000 + i
+            tutores.append(Tutor(
+                dni_tutor=dni, nombre_tutor=nombre, apellido_tutor=apellido,
+                telefono_tutor=f'351{dni % 10000000:07d}', correo_tutor=f'tutor{dni}@mail.com',
+                genero_tutor=self.rnd.choice('MF'), primer_login=self.rnd.random() < 0.3,
+                estado_tutor='Activo' if self.rnd.random() < 0.97 else 'Inactivo',
+            ))
+        Tutor.objects.bulk_create(tutores, batch_size=LOTE)
+        User.objects.bulk_create([
+            User(username=str(t.dni_tutor), password=make_password(str(t.dni_tutor))) for t in tutores
+        ], batch_size=LOTE)
+
+        # Uno o dos tutores por alumno
+        ids_tutores = list(Tutor.objects.values_list('id_tutor', flat=True))
+        ids_parentescos = list(Parentesco.objects.values_list('id_parentesco', flat=True))
+        relaciones = []
+        for id_alumno in Alumno.objects.values_list('id_alumno', flat=True):
+            for id_tutor in self.rnd.sample(ids_tutores, min(len(ids_tutores), self.rnd.choice([1, 2, 2]))):
+                relaciones.append(AlumnoXTutor(
+                    id_alumno_id=id_alumno, id_tutor_id=id_tutor, id_parentesco_id=self.rnd.choice(ids_parentescos)
+                ))
+        AlumnoXTutor.objects.bulk_create(relaciones, batch_size=LOTE)
+
+    def sembrar_medidas(self, cantidad):
+        ids_alumnos = list(Alumno.objects.values_list('id_alumno', flat=True))
+        ids_incidencias = list(Incidencia.objects.values_list('id_incidencia', flat=True))
+        ids_lugares = list(Lugar.objects.values_list('id_lugar', flat=True))
+        ids_preceptores = list(Empleado.objects.filter(
+            id_rol__nombre_rol__in=['preceptor_rector', 'director']
+        ).values_list('id_empleado', flat=True))
+        desde = date.today() - timedelta(days=730)
+
+        with sin_auto_now_add(MedidaXAlumno._meta.get_field('fecha_medida')):
+            for inicio in range(0, cantidad, LOTE):
+                lote = [
+                    MedidaXAlumno(
+                        id_alumno_id=self.rnd.choice(ids_alumnos),
+                        incidencia_id=self.rnd.choice(ids_incidencias),
+                        id_empleado_id=self.rnd.choice(ids_preceptores),
+                        id_lugar_id=self.rnd.choice(ids_lugares),
+                        fecha_medida=desde + timedelta(days=self.rnd.randrange(730)),
+                        cantidad_dias=self.rnd.randint(1, 5) if self.rnd.random() < 0.05 else 0,
+                        descripcion_caso='Caso registrado en el benchmark' if self.rnd.random() < 0.5 else None,
+                    )
+                    for _ in range(min(LOTE, cantidad - inicio))
+                ]
+                estadisticas.asignar_grados(lote)
+                MedidaXAlumno.objects.bulk_create(lote)
+
+    def sembrar_reuniones(self, cantidad_reuniones, cantidad_asistencias):
+        ids_empleados = list(Empleado.objects.values_list('id_empleado', flat=True))
+        tipos = [tipo for tipo, _ in Reunion.TIPO_REUNION_OPCIONES]
+        desde = date.today() - timedelta(days=730)
+        Reunion.objects.bulk_create([
+            Reunion(
+                fecha_hora_reunion=self.fecha_hora(desde, 730), tipo_reunion=self.rnd.choice(tipos),
+                descripcion_reunion='Reunión de benchmark', id_empleado_id=self.rnd.choice(ids_empleados),
+            )
+            for _ in range(cantidad_reuniones)
+        ], batch_size=LOTE)
+
+        reuniones = list(Reunion.objects.values_list('id_reunion', 'fecha_hora_reunion'))
+        ids_tutores = list(Tutor.objects.values_list('id_tutor', flat=True))
+        estados = [estado for estado, _ in Asistencia.ESTADO_ASISTENCIA_OPCIONES]
+        cantidad_asistencias = min(cantidad_asistencias, len(reuniones) * len(ids_tutores))
+        pares = set()
+        while len(pares) < cantidad_asistencias:
+            pares.add((self.rnd.randrange(len(reuniones)), self.rnd.choice(ids_tutores)))
+        Asistencia.objects.bulk_create([
+            Asistencia(
+                id_reunion_id=reuniones[i][0], id_tutor_id=id_tutor,
+                fecha_llegada_asistencia=reuniones[i][1] + timedelta(minutes=self.rnd.randint(-10, 30)),
+                estado_asistencia=self.rnd.choices(estados, weights=[7, 2, 1])[0],
+            )
+            for i, id_tutor in pares
+        ], batch_size=LOTE)
+
+    def sembrar_actividades(self):
+        ids_grados = list(Grado.objects.values_list('id_grado', flat=True))
+        destinos = ['Museo', 'Planetario', 'Reserva natural', 'Teatro', 'Granja educativa']
+        ActExtracurricular.objects.bulk_create([
+            ActExtracurricular(nombre_act_extracurricular=f'Salida {i + 1}', destino_act_extracurricular=self.rnd.choice(destinos))
+            for i in range(20)
+        ])
+        ids_actividades = list(ActExtracurricular.objects.values_list('id_act_extracurricular', flat=True))
+        desde = date.today() - timedelta(days=365)
+        actividades = []
+        # Cada grado hace 5 de las salidas (una vez cada una)
+        for id_grado in ids_grados:
+            for id_actividad in self.rnd.sample(ids_actividades, 5):
+                salida = self.fecha_hora(desde, 365)
+                actividades.append(ActExtracurricularXGrado(
+                    id_act_extracurricular_id=id_actividad, id_grado_id=id_grado,
+                    fecha_hora_actividad=salida, fecha_hora_salida=salida - timedelta(hours=1),
+                ))
+        ActExtracurricularXGrado.objects.bulk_create(actividades, batch_size=LOTE)
+
+        Asignatura.objects.bulk_create([Asignatura(nombre_asignatura=nombre) for nombre in ASIGNATURAS])
+        ids_asignaturas = list(Asignatura.objects.values_list('id_asignatura', flat=True))
+        profesores = list(Empleado.objects.filter(id_rol__nombre_rol='profesor').values_list('dni_empleado', flat=True))
+        DictadoClase.objects.bulk_create([
+            DictadoClase(id_grado=id_grado, id_asignatura=id_asignatura, dni_empleado=int(self.rnd.choice(profesores)))
+            for id_grado in ids_grados for id_asignatura in ids_asignaturas
+        ] if profesores else [], batch_size=LOTE)
@@ -3,7 +3,8 @@ from datetime import date
 from django.contrib.auth.models import User  #  AGREGAR
 from django.db.models.signals import post_delete, post_save  #  AGREGAR
 from django.dispatch import receiver  #  AGREGAR
-import logging  #  AGREGAR
+from core.catalogos import invalidar_catalogo_al_confirmar
+import logging
 
 logger = logging.getLogger(__name__)
 
@@ -54,12 +55,12 @@ class Tutor(models.Model):
                 user.save()
                 self.primer_login = True
                 self.save()
-                logger.info(f" Usuario creado automáticamente para tutor DNI: {self.dni_tutor}")
+                logger.info("Usuario creado automáticamente para tutor DNI: %s", self.dni_tutor)
             else:
-                logger.info(f" Usuario ya existía para tutor DNI: {self.dni_tutor}")
+                logger.debug("Usuario ya existía para tutor DNI: %s", self.dni_tutor)
             return user
         except Exception as e:
-            logger.error(f" Error creando usuario para tutor {self.dni_tutor}: {e}")
+            logger.error("Error creando usuario para tutor %s: %s", self.dni_tutor, e)
             return None
 
 #  SEÑAL PARA CREAR USUARIO AUTOMÁTICAMENTE AL CREAR TUTOR
@@ -67,7 +68,7 @@ class Tutor(models.Model):
 def crear_usuario_para_tutor(sender, instance, created, **kwargs):
     """Señal que crea el usuario automáticamente cuando se crea un tutor - MISMÁ LOGICA QUE EMPLEADOS"""
     if created:
-        logger.info(f" Ejecutando señal post_save para tutor DNI: {instance.dni_tutor}")
+        logger.debug("Ejecutando señal post_save para tutor DNI: %s", instance.dni_tutor)
         instance.sync_user()
 
 #  SEÑAL PARA ELIMINAR USUARIO AL ELIMINAR TUTOR
@@ -77,11 +78,11 @@ def eliminar_usuario_tutor(sender, instance, **kwargs):
     try:
         user = User.objects.get(username=str(instance.dni_tutor))
         user.delete()
-        logger.info(f" Usuario {user.username} eliminado automáticamente para tutor")
+        logger.info("Usuario %s eliminado automáticamente para tutor", user.username)
     except User.DoesNotExist:
-        logger.warning(f" No se encontró usuario para tutor {instance.dni_tutor}")
+        logger.warning("No se encontró usuario para tutor %s", instance.dni_tutor)
     except Exception as e:
-        logger.error(f" Error eliminando usuario para tutor {instance.dni_tutor}: {e}")
+        logger.error("Error eliminando usuario para tutor %s: %s", instance.dni_tutor, e)
 
 class Alumno(models.Model):
     GENERO_OPCIONES = [
@@ -119,11 +120,56 @@ class Alumno(models.Model):
             )
         return None
 
+class GradoQuerySet(models.QuerySet):
+    def reservar_asiento(self, id_grado, cantidad=1):
+        """
+        Reserva asientos con un único UPDATE condicional
+        (UPDATE ... SET asientos = asientos - n WHERE asientos >= n).
+        Devuelve True si se reservó (1 fila afectada); no hay lectura previa,
+        así que no se pierden actualizaciones ni se sobrevende el grado.
+        """
+        return self.reservar_asientos({id_grado: cantidad})
+
+    def reservar_asientos(self, cantidades):
+        """
+        Igual que reservar_asiento para varios grados ({id_grado: cantidad})
+        en un único UPDATE: cada grado se descuenta sólo si le alcanzan los
+        asientos. Devuelve True si se reservó en todos; si no, los que sí
+        alcanzaban quedan descontados y el llamador deshace su transacción.
+        """
+        cantidades = {id_grado: cantidad for id_grado, cantidad in cantidades.items() if cantidad}
+        if not cantidades:
+            return True
+        condicion = models.Q()
+        for id_grado, cantidad in cantidades.items():
+            condicion |= models.Q(id_grado=id_grado, asientos_disponibles__gte=cantidad)
+        if len(cantidades) == 1:
+            descuento = models.Value(next(iter(cantidades.values())))
+        else:
+            descuento = models.Case(
+                *[models.When(id_grado=id_grado, then=models.Value(cantidad)) for id_grado, cantidad in cantidades.items()],
+                default=models.Value(0),
+            )
+        reservados = self.filter(condicion).update(asientos_disponibles=models.F('asientos_disponibles') - descuento)
+        if reservados:
+            invalidar_catalogo_al_confirmar('grados')
+        return reservados == len(cantidades)
+
+    def liberar_asiento(self, id_grado, cantidad=1):
+        liberado = self.filter(id_grado=id_grado).update(
+            asientos_disponibles=models.F('asientos_disponibles') + cantidad
+        ) == 1
+        if liberado:
+            invalidar_catalogo_al_confirmar('grados')
+        return liberado
+
 class Grado(models.Model):
     id_grado = models.AutoField(primary_key=True)
     nombre_grado = models.CharField(max_length=50)
     asientos_disponibles = models.IntegerField()
 
+    objects = GradoQuerySet.as_manager()
+
     class Meta:
         db_table = 'grados'
         managed = False
@@ -164,6 +210,10 @@ class AlumnoXGrado(models.Model):
         db_table = 'alumnos_x_grados'
         managed = False
         unique_together = ['id_alumno', 'id_grado']
+        # Alumnos activos de un grado sin tocar la tabla (filtro por grado de incidencias)
+        indexes = [
+            models.Index(fields=['id_grado', 'activo', 'id_alumno'], name='alumno_grado_activo_idx'),
+        ]
 
 
 
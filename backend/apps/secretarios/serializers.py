@@ -1,7 +1,18 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Alumno, AlumnoXGrado, Tutor, AlumnoXTutor, Grado, Colegios_procedencia, Parentesco
 from datetime import date
 
+
+def prefetch_grado_activo():
+    """Prefetch de la inscripción activa (con su grado) que usa AlumnoSerializer"""
+    return Prefetch(
+        'alumnoxgrado_set',
+        queryset=AlumnoXGrado.objects.filter(activo=True).select_related('id_grado').order_by('id_alumno_x_grado'),
+        to_attr='grados_activos'
+    )
+
+
 class AlumnoSerializer(serializers.ModelSerializer):
     # ✅ AGREGAR CAMPOS PARA INFORMACIÓN DE GRADO
     id_grado = serializers.SerializerMethodField()
@@ -24,19 +35,28 @@ class AlumnoSerializer(serializers.ModelSerializer):
             'grado_info'
         ]
     
+    def _get_grado_activo(self, obj):
+        """Inscripción activa del alumno, resuelta una sola vez por alumno"""
+        if not hasattr(obj, 'grados_activos'):
+            # Sin prefetch_grado_activo(): una única consulta compartida por los tres campos
+            obj.grados_activos = list(
+                obj.alumnoxgrado_set.filter(activo=True).select_related('id_grado').order_by('id_alumno_x_grado')[:1]
+            )
+        return obj.grados_activos[0] if obj.grados_activos else None
+
     def get_id_grado(self, obj):
         """Obtener el ID del grado activo del alumno"""
-        grado_activo = obj.alumnoxgrado_set.filter(activo=True).first()
+        grado_activo = self._get_grado_activo(obj)
         return grado_activo.id_grado.id_grado if grado_activo and grado_activo.id_grado else None
     
     def get_nombre_grado(self, obj):
         """Obtener el nombre del grado activo"""
-        grado_activo = obj.alumnoxgrado_set.filter(activo=True).first()
+        grado_activo = self._get_grado_activo(obj)
         return grado_activo.id_grado.nombre_grado if grado_activo and grado_activo.id_grado else 'No asignado'
     
     def get_grado_info(self, obj):
         """Obtener información completa del grado"""
-        grado_activo = obj.alumnoxgrado_set.filter(activo=True).first()
+        grado_activo = self._get_grado_activo(obj)
         if grado_activo and grado_activo.id_grado:
             return {
                 'id_grado': grado_activo.id_grado.id_grado,
@@ -79,4 +99,66 @@ class ColegioSerializer(serializers.ModelSerializer):
 class ParentescoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Parentesco
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+# FLUJO: verificación en lote (importación de planillas / validación en vivo)
+class VerificacionLoteSerializer(serializers.Serializer):
+    MAX_ITEMS = 1000
+
+    dnis_alumnos = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, max_length=MAX_ITEMS)
+    dnis_tutores = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, max_length=MAX_ITEMS)
+    emails_tutores = serializers.ListField(child=serializers.CharField(), required=False, default=list, max_length=MAX_ITEMS)
+    telefonos_tutores = serializers.ListField(child=serializers.CharField(), required=False, default=list, max_length=MAX_ITEMS)
+    dnis_empleados = serializers.ListField(child=serializers.IntegerField(), required=False, default=list, max_length=MAX_ITEMS)
+
+# FLUJO: importación masiva de tutores
+class TutorLoteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tutor
+        fields = [
+            'dni_tutor',
+            'nombre_tutor',
+            'apellido_tutor',
+            'telefono_tutor',
+            'correo_tutor',
+            'genero_tutor',
+            'estado_tutor',
+        ]
+        # La unicidad de DNI y correo se valida para todo el lote con una consulta por campo
+        extra_kwargs = {
+            'dni_tutor': {'validators': []},
+            'correo_tutor': {'validators': []},
+        }
+
+
+# FLUJO: inscripción masiva (create_alumno_completo en lote)
+class AlumnoLoteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Alumno
+        fields = [
+            'dni_alumno',
+            'nombre_alumno',
+            'apellido_alumno',
+            'fecha_nacimiento_alumno',
+            'genero_alumno',
+            'estado_alumno',
+            'observaciones_alumno',
+        ]
+        # La unicidad del DNI se valida para todo el lote con una sola consulta
+        extra_kwargs = {'dni_alumno': {'validators': []}}
+
+
+class RelacionGradoLoteSerializer(serializers.Serializer):
+    id_grado = serializers.IntegerField()
+    id_colegio_procedencia = serializers.IntegerField()
+    activo = serializers.BooleanField(default=True)
+
+
+class RelacionTutorLoteSerializer(serializers.Serializer):
+    id_tutor = serializers.IntegerField()
+    id_parentesco = serializers.IntegerField()
+
+
+class InscripcionLoteSerializer(serializers.Serializer):
+    alumno = AlumnoLoteSerializer()
+    relacionGrado = RelacionGradoLoteSerializer()
+    relacionTutor = RelacionTutorLoteSerializer()
@@ -1,3 +1,581 @@
-from django.test import TestCase
+import json
+import logging
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import metricas
+from core.middleware import RegistroConsultas
+from core.registro import ColaHandler, ContextoRequestFilter, FormatoJSON
+
+from apps.login.models import Empleado, Rol
+
+from .models import Alumno, AlumnoXGrado, AlumnoXTutor, Grado, Colegios_procedencia, Parentesco, Tutor
+
+
+def crear_alumnos(grado, colegio, cantidad, dni_inicial=40000000):
+    """Crea `cantidad` alumnos inscriptos (activos) en `grado`"""
+    for i in range(cantidad):
+        alumno = Alumno.objects.create(
+            dni_alumno=dni_inicial + i,
+            nombre_alumno=f'Nombre{i}',
+            apellido_alumno=f'Apellido{i}',
+            fecha_nacimiento_alumno=date(2012, 1, 1),
+            genero_alumno='M',
+        )
+        AlumnoXGrado.objects.create(id_alumno=alumno, id_grado=grado, id_colegio_procedencia=colegio)
+
+
+class AlumnoSerializerQueryCountTests(TestCase):
+    """La cantidad de consultas de los listados de alumnos no depende del tamaño del padrón"""
+
+    # Todos los endpoints que serializan con AlumnoSerializer, con y sin paginar y exportados
+    ENDPOINTS = [
+        '/api/secretarios/alumnos/',
+        '/api/secretarios/alumnos/?page_size=50',
+        '/api/secretarios/alumnos/por-grado/{id_grado}/',
+        '/api/secretarios/alumnos/completos/',
+        '/api/secretarios/alumnos/completos/?page_size=50',
+        '/api/secretarios/alumnos/completos/?formato=json',
+        '/api/secretarios/alumnos/completos/?formato=ndjson',
+        '/api/preceptores_rectores/alumnos/',
+        '/api/preceptores_rectores/alumnos/?page_size=50',
+        '/api/preceptores_rectores/alumnos/por-grado/{id_grado}/',
+        '/api/preceptores_rectores/alumnos/buscar/?dni_alumno=40000000',
+    ]
+    TAMANOS = (2, 22)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='12345678'))
+        self.grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=30)
+        self.colegio = Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+
+    def contar_consultas(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url.format(id_grado=self.grado.id_grado))
+            # Las exportaciones consultan mientras se recorre el streaming
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_consultas_constantes(self):
+        consultas = {url: [] for url in self.ENDPOINTS}
+        creados = 0
+        for tamano in self.TAMANOS:
+            crear_alumnos(self.grado, self.colegio, tamano - creados, dni_inicial=40000000 + creados)
+            creados = tamano
+            for url in self.ENDPOINTS:
+                consultas[url].append(self.contar_consultas(url))
+
+        for url, cantidades in consultas.items():
+            with self.subTest(url=url):
+                self.assertEqual(len(set(cantidades)), 1, f'{url}: {cantidades} consultas con {self.TAMANOS} alumnos')
+
+    def test_grado_activo_serializado(self):
+        crear_alumnos(self.grado, self.colegio, 1)
+        data = self.client.get('/api/secretarios/alumnos/').json()
+        self.assertEqual(data[0]['id_grado'], self.grado.id_grado)
+        self.assertEqual(data[0]['nombre_grado'], '1A')
+        self.assertEqual(data[0]['grado_info']['asientos_disponibles'], 30)
+
+
+class AlumnoKeysetPaginationTests(TestCase):
+    """Paginación por cursor opcional del listado de alumnos"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='12345678'))
+        grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=30)
+        colegio = Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+        crear_alumnos(grado, colegio, 7)
+        # Apellidos y nombres repetidos: el desempate lo hace id_alumno
+        Alumno.objects.filter(dni_alumno__lt=40000004).update(apellido_alumno='Perez', nombre_alumno='Ana')
+
+    def test_sin_parametros_devuelve_lista_completa(self):
+        data = self.client.get('/api/secretarios/alumnos/').json()
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 7)
+
+    def test_recorre_todas_las_paginas_en_orden(self):
+        esperado = list(
+            Alumno.objects.order_by('apellido_alumno', 'nombre_alumno', 'id_alumno').values_list('id_alumno', flat=True)
+        )
+        vistos = []
+        url = '/api/secretarios/alumnos/?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['results']), 3)
+            vistos.extend(alumno['id_alumno'] for alumno in data['results'])
+            url = data['next']
+        self.assertEqual(vistos, esperado)
+
+    def test_cursor_invalido_es_404(self):
+        for url in [
+            '/api/secretarios/alumnos/',
+            '/api/secretarios/alumnos/completos/',
+            '/api/secretarios/tutores/',
+            '/api/secretarios/colegios/',
+            '/api/preceptores_rectores/alumnos/',
+            '/api/preceptores_rectores/incidencias/listar/',
+        ]:
+            with self.subTest(url=url):
+                response = self.client.get(f'{url}?cursor=no-es-un-cursor')
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json()['detail'], 'Cursor inválido')
+
+
+class ExportacionAlumnosTests(TestCase):
+    """Exportación en streaming de alumnos completos"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='12345678'))
+        grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=30)
+        colegio = Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+        crear_alumnos(grado, colegio, 5)
+
+    def contenido(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_exportacion_json(self):
+        response = self.client.get('/api/secretarios/alumnos/completos/', {'formato': 'json'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = json.loads(self.contenido(response))
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['nombre_grado'], '1A')
+
+    def test_exportacion_ndjson(self):
+        response = self.client.get('/api/secretarios/alumnos/completos/', {'formato': 'ndjson'})
+        lineas = self.contenido(response).splitlines()
+        self.assertEqual(len(lineas), 5)
+        self.assertEqual(json.loads(lineas[0])['dni_alumno'], 40000000)
+
+
+class VerificacionLoteTests(TestCase):
+    """verificar_lote responde lo mismo que los endpoints individuales, con una consulta por tabla"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=30)
+        colegio = Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+        crear_alumnos(grado, colegio, 2)
+        Tutor.objects.create(
+            dni_tutor=30000000, nombre_tutor='Laura', apellido_tutor='Gomez',
+            telefono_tutor='3510000000', correo_tutor='laura@mail.com', genero_tutor='F'
+        )
+        rol = Rol.objects.create(nombre_rol='secretario')
+        Empleado.objects.create(
+            dni_empleado='20000000', nombre_empleado='Juan', apellido_empleado='Diaz',
+            genero_empleado='M', id_rol=rol, correo_empleado='juan@mail.com'
+        )
+
+    def test_mismas_respuestas_que_los_endpoints_individuales(self):
+        payload = {
+            'dnis_alumnos': [40000000, 40000099],
+            'dnis_tutores': [30000000, 30000099],
+            'emails_tutores': ['laura@mail.com', 'otro@mail.com'],
+            'telefonos_tutores': ['3510000000', '3519999999'],
+            'dnis_empleados': [20000000, 20000099],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/secretarios/verificar-lote/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        consultas = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(consultas), 3)
+
+        data = response.json()
+        individuales = {
+            'dnis_alumnos': ['/api/secretarios/alumnos/verificar-dni/{}/'.format(d) for d in payload['dnis_alumnos']],
+            'dnis_tutores': ['/api/secretarios/tutores/verificar-dni/{}/'.format(d) for d in payload['dnis_tutores']],
+            'emails_tutores': ['/api/secretarios/tutores/verificar-email/?email={}'.format(e) for e in payload['emails_tutores']],
+            'telefonos_tutores': ['/api/secretarios/tutores/verificar-telefono/?telefono={}'.format(t) for t in payload['telefonos_tutores']],
+            'dnis_empleados': ['/api/secretarios/empleados/verificar-dni/{}/'.format(d) for d in payload['dnis_empleados']],
+        }
+        for clave, urls in individuales.items():
+            with self.subTest(clave=clave):
+                self.assertEqual(data[clave], [self.client.get(url).json() for url in urls])
+        self.assertEqual(data['dnis_empleados'][0]['dni'], 20000000)
+        self.assertTrue(data['dnis_empleados'][0]['existe'])
+        self.assertFalse(data['dnis_empleados'][1]['existe'])
+
+    def test_dni_invalido(self):
+        response = self.client.post('/api/secretarios/verificar-lote/', {'dnis_alumnos': ['abc']}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class InscripcionLoteTests(TestCase):
+    """Inscripción masiva de alumnos completos"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        self.grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=2)
+        self.colegio = Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+        self.tutor = Tutor.objects.create(
+            dni_tutor=30000000, nombre_tutor='Laura', apellido_tutor='Gomez',
+            telefono_tutor='3510000000', correo_tutor='laura@mail.com', genero_tutor='F'
+        )
+        self.parentesco = Parentesco.objects.create(parentesco_nombre='Madre')
+
+    def registro(self, dni, id_tutor=None):
+        return {
+            'alumno': {
+                'dni_alumno': dni,
+                'nombre_alumno': 'Nombre',
+                'apellido_alumno': 'Apellido',
+                'fecha_nacimiento_alumno': '2012-01-01',
+                'genero_alumno': 'F',
+            },
+            'relacionGrado': {'id_grado': self.grado.id_grado, 'id_colegio_procedencia': self.colegio.id},
+            'relacionTutor': {'id_tutor': id_tutor or self.tutor.id_tutor, 'id_parentesco': self.parentesco.id_parentesco},
+        }
+
+    def test_crea_filas_validas_y_reporta_errores(self):
+        registros = [
+            self.registro(40000001),
+            self.registro(40000002, id_tutor=999),
+            self.registro(40000001),
+            self.registro(40000003),
+            self.registro(40000004),
+            {'alumno': {}},
+        ]
+        response = self.client.post('/api/secretarios/alumno-completo/lote/', registros, format='json')
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+
+        self.assertEqual([c['fila'] for c in data['creados']], [0, 3])
+        self.assertEqual([e['fila'] for e in data['errores']], [1, 2, 4, 5])
+        self.assertEqual(data['errores'][0]['error'], 'Tutor no encontrado')
+        self.assertEqual(data['errores'][2]['error'], 'No hay asientos disponibles en el grado seleccionado')
+
+        self.grado.refresh_from_db()
+        self.assertEqual(self.grado.asientos_disponibles, 0)
+        self.assertEqual(AlumnoXGrado.objects.filter(id_grado=self.grado).count(), 2)
+        self.assertEqual(AlumnoXTutor.objects.filter(id_tutor=self.tutor).count(), 2)
+
+    def test_asientos_tomados_durante_el_lote_revierten(self):
+        # Otra inscripción toma los asientos entre la lectura y el UPDATE condicional
+        def otra_inscripcion(execute, sql, params, many, context):
+            if sql.startswith('INSERT INTO "alumnos"'):
+                Grado.objects.filter(id_grado=self.grado.id_grado).update(asientos_disponibles=0)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(otra_inscripcion):
+            response = self.client.post(
+                '/api/secretarios/alumno-completo/lote/', [self.registro(40000001)], format='json'
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'No hay asientos disponibles en el grado seleccionado')
+        self.assertFalse(Alumno.objects.filter(dni_alumno=40000001).exists())
+        self.assertFalse(AlumnoXGrado.objects.filter(id_grado=self.grado).exists())
+
+
+class ReservaAsientosTests(TestCase):
+    """Reserva de asientos con UPDATE condicional"""
+
+    def setUp(self):
+        self.grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=1)
+
+    def test_no_sobrevende(self):
+        self.assertTrue(Grado.objects.reservar_asiento(self.grado.id_grado))
+        self.assertFalse(Grado.objects.reservar_asiento(self.grado.id_grado))
+        self.grado.refresh_from_db()
+        self.assertEqual(self.grado.asientos_disponibles, 0)
+
+    def test_varios_grados_en_un_update(self):
+        otro = Grado.objects.create(nombre_grado='1B', asientos_disponibles=3)
+        with self.assertNumQueries(1):
+            self.assertFalse(Grado.objects.reservar_asientos({self.grado.id_grado: 2, otro.id_grado: 2}))
+        self.assertEqual(Grado.objects.get(pk=self.grado.pk).asientos_disponibles, 1)
+
+        self.assertTrue(Grado.objects.reservar_asientos({self.grado.id_grado: 1, otro.id_grado: 1}))
+        self.assertEqual(
+            dict(Grado.objects.filter(pk__in=[self.grado.pk, otro.pk]).values_list('pk', 'asientos_disponibles')),
+            {self.grado.pk: 0, otro.pk: 0},
+        )
+
+    def test_grado_sin_asientos_revierte_la_inscripcion(self):
+        Grado.objects.filter(id_grado=self.grado.id_grado).update(asientos_disponibles=0)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='99999999'))
+        colegio = Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+        tutor = Tutor.objects.create(
+            dni_tutor=30000000, nombre_tutor='Laura', apellido_tutor='Gomez',
+            telefono_tutor='3510000000', correo_tutor='laura@mail.com', genero_tutor='F'
+        )
+        parentesco = Parentesco.objects.create(parentesco_nombre='Madre')
+        response = client.post('/api/secretarios/alumno-completo/', {
+            'alumno': {
+                'dni_alumno': 40000001, 'nombre_alumno': 'Nombre', 'apellido_alumno': 'Apellido',
+                'fecha_nacimiento_alumno': '2012-01-01', 'genero_alumno': 'F',
+            },
+            'relacionGrado': {'id_grado': self.grado.id_grado, 'id_colegio_procedencia': colegio.id},
+            'relacionTutor': {'id_tutor': tutor.id_tutor, 'id_parentesco': parentesco.id_parentesco},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Alumno.objects.filter(dni_alumno=40000001).exists())
+
+
+class CatalogoCacheTests(TestCase):
+    """Caché versionada con ETag de los catálogos"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1')
+
+    def test_hit_y_304_sin_consultas(self):
+        primera = self.client.get('/api/secretarios/colegios/')
+        etag = primera['ETag']
+        with self.assertNumQueries(0):
+            segunda = self.client.get('/api/secretarios/colegios/')
+            no_modificado = self.client.get('/api/secretarios/colegios/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(segunda.json(), primera.json())
+        self.assertEqual(no_modificado.status_code, 304)
+
+    def test_crear_colegio_invalida(self):
+        etag = self.client.get('/api/secretarios/colegios/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/secretarios/colegios/crear/', {'nombre_colegio_procedencia': 'Escuela 2'}, format='json')
+        response = self.client.get('/api/secretarios/colegios/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_reservar_asiento_invalida_grados(self):
+        grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=3)
+        etag = self.client.get('/api/secretarios/grados/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Grado.objects.reservar_asiento(grado.id_grado)
+        response = self.client.get('/api/secretarios/grados/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()[0]['asientos_disponibles'], 2)
+
+
+class BuscarColegiosTests(TestCase):
+    """Buscador de colegios con índice en memoria"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela Normal José Mármol', nro_colegio_procedencia=123)
+        Colegios_procedencia.objects.create(nombre_colegio_procedencia='Instituto San José', nro_colegio_procedencia=1234)
+        Colegios_procedencia.objects.create(nombre_colegio_procedencia='Colegio Nacional', nro_colegio_procedencia=77)
+
+    def buscar(self, texto):
+        return [c['nombre_colegio_procedencia'] for c in self.client.get('/api/secretarios/colegios/buscar/', {'q': texto}).json()]
+
+    def test_prefijo_y_palabras_sin_acentos(self):
+        self.assertEqual(self.buscar('escuela'), ['Escuela Normal José Mármol'])
+        self.assertEqual(self.buscar('jose'), ['Escuela Normal José Mármol', 'Instituto San José'])
+        self.assertEqual(self.buscar('san jo'), ['Instituto San José'])
+        self.assertEqual(self.buscar('marm esc'), ['Escuela Normal José Mármol'])
+        self.assertEqual(self.buscar(''), [])
+
+    def test_numero_exacto_primero(self):
+        self.assertEqual(self.buscar('123'), ['Escuela Normal José Mármol', 'Instituto San José'])
+
+    def test_crear_colegio_actualiza_el_indice(self):
+        self.assertEqual(self.buscar('tecnica'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/secretarios/colegios/crear/', {'nombre_colegio_procedencia': 'Escuela Técnica 5'}, format='json')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.buscar('tecnica'), ['Escuela Técnica 5'])
+
+
+class BuscarPersonasTests(TestCase):
+    """Buscador unificado de alumnos, tutores y empleados"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        self.alumno = Alumno.objects.create(
+            dni_alumno=45123456, nombre_alumno='María José', apellido_alumno='Pérez',
+            fecha_nacimiento_alumno=date(2012, 1, 1), genero_alumno='F',
+        )
+        Tutor.objects.create(
+            dni_tutor=30111222, nombre_tutor='José', apellido_tutor='Gómez', telefono_tutor='3510000000',
+            correo_tutor='jose@mail.com', genero_tutor='M', estado_tutor='Inactivo'
+        )
+        Empleado.objects.create(
+            dni_empleado='20333444', nombre_empleado='Ana', apellido_empleado='Pereyra',
+            genero_empleado='F', id_rol=Rol.objects.create(nombre_rol='secretario'), correo_empleado='ana@mail.com'
+        )
+
+    def buscar(self, **params):
+        response = self.client.get('/api/secretarios/personas/buscar/', params)
+        return [(p['tipo'], p['apellido']) for p in response.json()]
+
+    def test_prefijo_parcial_y_dni_sin_acentos(self):
+        self.assertEqual(self.buscar(q='pere'), [('empleado', 'Pereyra'), ('alumno', 'Pérez')])
+        self.assertEqual(self.buscar(q='jose'), [('tutor', 'Gómez'), ('alumno', 'Pérez')])
+        self.assertEqual(self.buscar(q='mez'), [('tutor', 'Gómez')])
+        self.assertEqual(self.buscar(q='3344'), [('empleado', 'Pereyra')])
+        self.assertEqual(self.buscar(q='maria perez'), [('alumno', 'Pérez')])
+
+    def test_filtros_tipo_y_estado(self):
+        self.assertEqual(self.buscar(q='jose', tipo='alumno'), [('alumno', 'Pérez')])
+        self.assertEqual(self.buscar(q='jose', estado='Inactivo'), [('tutor', 'Gómez')])
+        response = self.client.get('/api/secretarios/personas/buscar/', {'q': 'jose', 'tipo': 'padre'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_altas_y_bajas_actualizan_el_indice(self):
+        self.assertEqual(self.buscar(q='pere'), [('empleado', 'Pereyra'), ('alumno', 'Pérez')])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alumno.apellido_alumno = 'Sosa'
+            self.alumno.save()
+        self.assertEqual(self.buscar(q='pere'), [('empleado', 'Pereyra')])
+        self.assertEqual(self.buscar(q='sosa'), [('alumno', 'Sosa')])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alumno.delete()
+        self.assertEqual(self.buscar(q='sosa'), [])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportacionTutoresTests(TestCase):
+    """Importación de tutores en lote con usuarios creados en bloque"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        Tutor.objects.create(
+            dni_tutor=30000000, nombre_tutor='Laura', apellido_tutor='Gomez',
+            telefono_tutor='3510000000', correo_tutor='laura@mail.com', genero_tutor='F'
+        )
+
+    def tutor(self, dni, correo=None):
+        return {
+            'dni_tutor': dni, 'nombre_tutor': 'Nombre', 'apellido_tutor': 'Apellido',
+            'telefono_tutor': '3511111111', 'correo_tutor': correo or f'{dni}@mail.com', 'genero_tutor': 'M',
+        }
+
+    def test_crea_tutores_y_usuarios_y_reporta_errores(self):
+        registros = [
+            self.tutor(31000000),
+            self.tutor(30000000),
+            self.tutor(31000001, correo='laura@mail.com'),
+            self.tutor(31000000, correo='otro@mail.com'),
+            {'dni_tutor': 31000002},
+            self.tutor(31000003),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/secretarios/tutores/lote/', registros, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([c['tutor_dni'] for c in response.data['creados']], [31000000, 31000003])
+        self.assertEqual([e['fila'] for e in response.data['errores']], [1, 2, 3, 4])
+
+        usuario = User.objects.get(username='31000000')
+        self.assertTrue(usuario.check_password('31000000'))
+        self.assertTrue(Tutor.objects.get(dni_tutor=31000003).primer_login)
+        self.assertEqual([p['dni'] for p in self.client.get('/api/secretarios/personas/buscar/', {'q': '3100000'}).json()],
+                         [31000000, 31000003])
+
+    def test_consultas_constantes(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.post('/api/secretarios/tutores/lote/', [self.tutor(32000000 + i) for i in range(30)], format='json')
+        self.assertEqual(Tutor.objects.filter(dni_tutor__gte=32000000).count(), 30)
+        self.assertLess(len(consultas), 15)
+
+
+class MetricasMiddlewareTests(TestCase):
+    """Instrumentación por endpoint: consultas, tiempos y N+1"""
+
+    def setUp(self):
+        metricas.reiniciar()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+        grado = Grado.objects.create(nombre_grado='1A', asientos_disponibles=30)
+        crear_alumnos(grado, Colegios_procedencia.objects.create(nombre_colegio_procedencia='Escuela 1'), 3)
+
+    def test_server_timing_y_percentiles_por_endpoint(self):
+        for _ in range(3):
+            response = self.client.get('/api/secretarios/alumnos/')
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ consultas", serializacion;dur=[\d.]+, total;dur=[\d.]+')
+        self.assertNotIn('X-Consultas-Duplicadas', response)
+
+        resumen = metricas.estadisticas_proceso()['alumnos-list']
+        self.assertEqual(resumen['requests'], 3)
+        self.assertEqual(resumen['con_duplicadas'], 0)
+        self.assertGreater(resumen['consultas']['p50'], 0)
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'metricas': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'metricas-tests'},
+    })
+    def test_reporte_con_lo_publicado(self):
+        self.client.get('/api/secretarios/alumnos/')
+        metricas.publicar_en_cache()
+        salida = StringIO()
+        call_command('reporte_metricas', stdout=salida)
+        self.assertIn('alumnos-list', salida.getvalue())
+
+    def test_detecta_consultas_repetidas(self):
+        registro = RegistroConsultas()
+        with connection.execute_wrapper(registro):
+            for alumno in Alumno.objects.all():
+                AlumnoXGrado.objects.filter(id_alumno=alumno).first()
+        self.assertEqual(registro.cantidad, 4)
+        self.assertEqual(list(registro.duplicadas().values()), [3])
+
+
+class RegistroEventosTests(TestCase):
+    """Eventos de log con request id y endpoint; los payloads sólo en DEBUG"""
+
+    def setUp(self):
+        self.registros = []
+        handler = logging.Handler()
+        handler.emit = self.registros.append
+        handler.addFilter(ContextoRequestFilter())
+        logger = logging.getLogger('apps.secretarios.views')
+        nivel = logger.level
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(setattr, logger, 'propagate', True)
+        self.addCleanup(logger.removeHandler, handler)
+        self.addCleanup(logger.setLevel, nivel)
+        self.logger = logger
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='99999999'))
+
+    def crear(self):
+        return self.client.post('/api/secretarios/alumno-completo/', {'alumno': {'dni_alumno': 1}}, format='json',
+                                HTTP_X_REQUEST_ID='abc123')
+
+    def test_payload_solo_en_debug(self):
+        self.logger.setLevel(logging.INFO)
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.crear()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['X-Request-ID'], 'abc123')
+        self.assertEqual(self.registros, [])
+
+        self.logger.setLevel(logging.DEBUG)
+        with self.assertLogs('django.request', 'WARNING'):
+            self.crear()
+        evento = json.loads(FormatoJSON().format(self.registros[0]))
+        self.assertEqual(evento['request_id'], 'abc123')
+        self.assertEqual(evento['endpoint'], 'create-alumno-completo')
+        self.assertIn("'dni_alumno': 1", evento['mensaje'])
+
+    def test_cola_formatea_al_loguear(self):
+        # Los argumentos mutables se formatean en el hilo que loguea, no en el del listener
+        datos = {'dni_alumno': 1}
+        registro = logging.LogRecord('apps.secretarios.views', logging.INFO, __file__, 1, 'Payload: %s', (datos,), None)
+        encolado = ColaHandler().prepare(registro)
+        datos['dni_alumno'] = 2
+        self.assertIsNone(encolado.args)
+        self.assertEqual(json.loads(encolado.getMessage())['mensaje'], "Payload: {'dni_alumno': 1}")
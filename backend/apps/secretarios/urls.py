@@ -13,17 +13,23 @@ urlpatterns = [
     path('grados/verificar-cupos/<int:id_grado>/', views.verificar_cupos_grado, name='verificar-cupos-grado'),
     path('alumnos/buscar-por-dni/<int:dni>/', views.get_alumno_by_dni, name='get-alumno-by-dni'),
     path('empleados/verificar-dni/<int:dni>/', views.verificar_dni_empleado, name='verificar-dni-empleado'),
+    path('verificar-lote/', views.verificar_lote, name='verificar-lote'),
 
     path('alumnos/por-grado/<int:id_grado>/', views.alumnos_por_grado, name='alumnos-por-grado'),
 
     # ENDPOINTS EXISTENTES (MANTENER)
     path('grados/', views.grados_list, name='grados-list'),
     path('colegios/', views.colegios_list, name='colegios-list'),
+    path('colegios/buscar/', views.buscar_colegios, name='buscar-colegios'),
+    path('personas/buscar/', views.buscar_personas, name='buscar-personas'),
     path('colegios/crear/', views.crear_colegio, name='crear-colegio'),
     path('tutores/', views.tutores_list, name='tutores-list'),
     path('tutores/crear/', views.crear_tutor, name='crear-tutor'),
+    path('tutores/lote/', views.importar_tutores_lote, name='importar-tutores-lote'),
     path('parentescos/', views.parentescos_list, name='parentescos-list'),
     path('parentescos/crear/', views.crear_parentesco, name='crear-parentesco'),
     path('alumnos/', views.alumnos_list, name='alumnos-list'),
+    path('alumnos/completos/', views.get_all_alumnos_completos, name='alumnos-completos'),
     path('alumno-completo/', views.create_alumno_completo, name='create-alumno-completo'),
+    path('alumno-completo/lote/', views.create_alumnos_completos_lote, name='create-alumnos-completos-lote'),
 ]
\ No newline at end of file
@@ -1,9 +1,18 @@
+import logging
+
 from django.db import transaction
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import APIException
 from django.db import IntegrityError
-from .models import Alumno, Tutor, Grado, Colegios_procedencia, Parentesco
+from django.db.models import Q
+from core.pagination import AlumnoPagination, TutorPagination, ColegioPagination
+from core.streaming import formato_exportacion, exportar_queryset
+from core.catalogos import catalogo_cacheado, invalidar_catalogo_al_confirmar
+from .importacion import importar_tutores, MAX_TUTORES_LOTE
+from .busqueda import indice_colegios, indice_personas, TIPOS_PERSONA, LIMITE_DEFAULT, LIMITE_MAXIMO
+from .models import Alumno, AlumnoXGrado, AlumnoXTutor, Tutor, Grado, Colegios_procedencia, Parentesco
 from .serializers import (
     AlumnoSerializer, 
     AlumnoXGradoSerializer, 
@@ -11,9 +20,99 @@ from .serializers import (
     AlumnoXTutorSerializer,
     GradoSerializer,
     ColegioSerializer, 
-    ParentescoSerializer
+    ParentescoSerializer,
+    VerificacionLoteSerializer,
+    InscripcionLoteSerializer,
+    prefetch_grado_activo
 )
 
+logger = logging.getLogger(__name__)
+
+# RESPUESTAS DE VERIFICACIÓN - compartidas por los endpoints individuales y verificar_lote
+def _tutor_data(tutor):
+    return {
+        'id_tutor': tutor.id_tutor,
+        'nombre_tutor': tutor.nombre_tutor,
+        'apellido_tutor': tutor.apellido_tutor,
+        'estado_tutor': tutor.estado_tutor
+    }
+
+def _verificacion_dni_empleado(dni, empleado):
+    if empleado:
+        return {
+            'dni': dni,
+            'existe': True,
+            'activo': empleado.estado_empleado == 'Activo',  # Ajusta según tu campo
+            'mensaje': f'Empleado {empleado.nombre_empleado} {empleado.apellido_empleado}',
+            'empleado_data': {
+                'id_empleado': empleado.id_empleado,
+                'nombre_empleado': empleado.nombre_empleado,
+                'apellido_empleado': empleado.apellido_empleado,
+                'estado_empleado': empleado.estado_empleado
+            }
+        }
+    return {
+        'dni': dni,
+        'existe': False,
+        'activo': False,
+        'mensaje': 'DNI disponible - No es empleado'
+    }
+
+def _verificacion_dni_alumno(dni, existe):
+    return {
+        'dni': dni,
+        'existe': existe,
+        'mensaje': f'DNI {dni} {"ya está registrado" if existe else "disponible"}'
+    }
+
+def _verificacion_dni_tutor(dni, tutor):
+    if tutor:
+        return {
+            'dni': dni,
+            'existe': True,
+            'activo': tutor.estado_tutor == 'Activo',
+            'mensaje': f'Tutor {tutor.nombre_tutor} {tutor.apellido_tutor} ({dni}) - Estado: {tutor.estado_tutor}',
+            'tutor_data': _tutor_data(tutor)
+        }
+    return {
+        'dni': dni,
+        'existe': False,
+        'activo': False,
+        'mensaje': 'DNI disponible para nuevo tutor'
+    }
+
+def _verificacion_email_tutor(email, tutor):
+    if tutor:
+        return {
+            'email': email,
+            'existe': True,
+            'activo': tutor.estado_tutor == 'Activo',
+            'mensaje': f'Email ya registrado - Tutor: {tutor.nombre_tutor} {tutor.apellido_tutor}',
+            'tutor_data': _tutor_data(tutor)
+        }
+    return {
+        'email': email,
+        'existe': False,
+        'activo': False,
+        'mensaje': 'Email disponible'
+    }
+
+def _verificacion_telefono_tutor(telefono, tutor):
+    if tutor:
+        return {
+            'telefono': telefono,
+            'existe': True,
+            'activo': tutor.estado_tutor == 'Activo',
+            'mensaje': f'Teléfono ya registrado - Tutor: {tutor.nombre_tutor} {tutor.apellido_tutor}',
+            'tutor_data': _tutor_data(tutor)
+        }
+    return {
+        'telefono': telefono,
+        'existe': False,
+        'activo': False,
+        'mensaje': 'Teléfono disponible'
+    }
+
 # VERIFICACIÓN DNI EMPLEADO - AGREGAR ESTA VIEW
 @api_view(['GET'])
 def verificar_dni_empleado(request, dni):
@@ -23,31 +122,13 @@ def verificar_dni_empleado(request, dni):
         from apps.login.models import Empleado
         
         empleado = Empleado.objects.filter(dni_empleado=dni).first()
-        if empleado:
-            return Response({
-                'dni': dni,
-                'existe': True,
-                'activo': empleado.estado_empleado == 'Activo',  # Ajusta según tu campo
-                'mensaje': f'Empleado {empleado.nombre_empleado} {empleado.apellido_empleado}',
-                'empleado_data': {
-                    'id_empleado': empleado.id_empleado,
-                    'nombre_empleado': empleado.nombre_empleado,
-                    'apellido_empleado': empleado.apellido_empleado,
-                    'estado_empleado': empleado.estado_empleado
-                }
-            })
-        else:
-            return Response({
-                'dni': dni,
-                'existe': False,
-                'activo': False,
-                'mensaje': 'DNI disponible - No es empleado'
-            })
+        return Response(_verificacion_dni_empleado(dni, empleado))
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 #  FLUJO: AlumnoForm - Grados y Colegios
 @api_view(['GET'])
+@catalogo_cacheado('grados')
 def grados_list(request):
     """Obtener lista de grados para AlumnoForm"""
     try:
@@ -61,12 +142,64 @@ def grados_list(request):
         )
 
 @api_view(['GET'])
+@catalogo_cacheado('colegios')
 def colegios_list(request):
     """Obtener lista de colegios para AlumnoForm"""
     try:
         colegios = Colegios_procedencia.objects.all()
+        paginator = ColegioPagination()
+        pagina = paginator.paginate_queryset(colegios, request)
+        if pagina is not None:
+            serializer = ColegioSerializer(pagina, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = ColegioSerializer(colegios, many=True)
         return Response(serializer.data)
+    except APIException:
+        # Cursor inválido (404): lo responde DRF
+        raise
+    except Exception as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+def buscar_colegios(request):
+    """Buscador (typeahead) de colegios por nombre, palabras o número, sin distinguir acentos"""
+    try:
+        texto = request.GET.get('q', '').strip()
+        try:
+            limite = min(max(int(request.GET.get('limit', LIMITE_DEFAULT)), 1), LIMITE_MAXIMO)
+        except ValueError:
+            limite = LIMITE_DEFAULT
+        return Response(indice_colegios.buscar(texto, limite))
+    except Exception as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+def buscar_personas(request):
+    """
+    Búsqueda unificada de alumnos, tutores y empleados por nombre, apellido o DNI
+    (prefijo o parcial, sin distinguir acentos). Filtros: ?tipo=alumno,tutor&estado=Activo
+    """
+    try:
+        texto = request.GET.get('q', '').strip()
+        tipos = [tipo for tipo in request.GET.get('tipo', '').split(',') if tipo]
+        tipos_invalidos = [tipo for tipo in tipos if tipo not in TIPOS_PERSONA]
+        if tipos_invalidos:
+            return Response(
+                {'error': f'Tipo inválido: {", ".join(tipos_invalidos)}. Opciones: {", ".join(TIPOS_PERSONA)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        estado = request.GET.get('estado', '').strip() or None
+        try:
+            limite = min(max(int(request.GET.get('limit', 20)), 1), LIMITE_MAXIMO)
+        except ValueError:
+            limite = 20
+        return Response(indice_personas.buscar(texto, tipos=tipos, estado=estado, limite=limite))
     except Exception as e:
         return Response(
             {'error': str(e)}, 
@@ -80,6 +213,8 @@ def crear_colegio(request):
         serializer = ColegioSerializer(data=request.data)
         if serializer.is_valid():
             colegio = serializer.save()
+            # Invalida el catálogo 'colegios' y mantiene al día el índice del buscador
+            transaction.on_commit(lambda: indice_colegios.colegio_creado(colegio))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
@@ -94,8 +229,16 @@ def tutores_list(request):
     """Obtener lista de tutores para RegistrarTutor"""
     try:
         tutores = Tutor.objects.all()
+        paginator = TutorPagination()
+        pagina = paginator.paginate_queryset(tutores, request)
+        if pagina is not None:
+            serializer = TutorSerializer(pagina, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = TutorSerializer(tutores, many=True)
         return Response(serializer.data)
+    except APIException:
+        # Cursor inválido (404): lo responde DRF
+        raise
     except Exception as e:
         return Response(
             {'error': str(e)}, 
@@ -117,7 +260,37 @@ def crear_tutor(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['POST'])
+def importar_tutores_lote(request):
+    """
+    Importa tutores en lote (lista de tutores o {'registros': [...]}).
+    Los usuarios se crean en bloque en lugar de uno por tutor con la señal.
+    """
+    registros = request.data.get('registros') if isinstance(request.data, dict) else request.data
+    if not isinstance(registros, list) or not registros:
+        return Response({
+            'error': 'Se requiere una lista de tutores'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(registros) > MAX_TUTORES_LOTE:
+        return Response({
+            'error': f'Máximo {MAX_TUTORES_LOTE} tutores por lote'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        creados, errores = importar_tutores(registros)
+    except Exception as e:
+        return Response({
+            'error': f'Error interno del servidor: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        'success': bool(creados),
+        'creados': creados,
+        'errores': [{'fila': fila, **error} for fila, error in sorted(errores.items())],
+    }, status=status.HTTP_201_CREATED if creados else status.HTTP_400_BAD_REQUEST)
+
 @api_view(['GET'])
+@catalogo_cacheado('parentescos')
 def parentescos_list(request):
     """Obtener lista de parentescos para RegistrarTutor"""
     try:
@@ -136,6 +309,7 @@ def crear_parentesco(request):
         serializer = ParentescoSerializer(data=request.data)
         if serializer.is_valid():
             parentesco = serializer.save()
+            invalidar_catalogo_al_confirmar('parentescos')
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
@@ -150,10 +324,18 @@ def alumnos_list(request):
     try:
         # ✅ INCLUIR LAS RELACIONES EN LA CONSULTA
         alumnos = Alumno.objects.all().prefetch_related(
-            'alumnoxgrado_set__id_grado'
+            prefetch_grado_activo()
         )
+        paginator = AlumnoPagination()
+        pagina = paginator.paginate_queryset(alumnos, request)
+        if pagina is not None:
+            serializer = AlumnoSerializer(pagina, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = AlumnoSerializer(alumnos, many=True)
         return Response(serializer.data)
+    except APIException:
+        # Cursor inválido (404): lo responde DRF
+        raise
     except Exception as e:
         return Response(
             {'error': str(e)}, 
@@ -170,7 +352,7 @@ def alumnos_por_grado(request, id_grado):
             alumnoxgrado__activo=True,
             estado_alumno='Activo'
         ).prefetch_related(
-            'alumnoxgrado_set__id_grado'
+            prefetch_grado_activo()
         ).distinct()
         
         serializer = AlumnoSerializer(alumnos, many=True)
@@ -189,15 +371,29 @@ def alumnos_por_grado(request, id_grado):
 # OPCIÓN ALTERNATIVA: GET para obtener todos los alumnos completos
 @api_view(['GET'])
 def get_all_alumnos_completos(request):
-    """Obtener todos los alumnos completos (usando el serializer mejorado)"""
+    """
+    Obtener todos los alumnos completos (usando el serializer mejorado).
+    Con ?formato=json o ?formato=ndjson se exporta en streaming por lotes.
+    """
     try:
         alumnos = Alumno.objects.all().prefetch_related(
-            'alumnoxgrado_set__id_grado',
+            prefetch_grado_activo(),
             'alumnos_tutores__id_tutor',
             'alumnos_tutores__id_parentesco'
         )
+        formato = formato_exportacion(request)
+        if formato:
+            return exportar_queryset(alumnos, AlumnoSerializer, formato, 'alumnos')
+        paginator = AlumnoPagination()
+        pagina = paginator.paginate_queryset(alumnos, request)
+        if pagina is not None:
+            serializer = AlumnoSerializer(pagina, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = AlumnoSerializer(alumnos, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+    except APIException:
+        # Cursor inválido (404): lo responde DRF
+        raise
     except Exception as e:
         return Response({
             'error': f'Error interno del servidor: {str(e)}'
@@ -214,7 +410,7 @@ def create_alumno_completo(request):
     """
     try:
         data = request.data
-        print(" Datos recibidos para alumno completo:", data)
+        logger.debug('Datos recibidos para alumno completo: %s', data)
 
         # Extraer datos
         alumno_data = data.get('alumno', {})
@@ -236,48 +432,45 @@ def create_alumno_completo(request):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         alumno = alumno_serializer.save()
-        print(f" Alumno creado: {alumno.id_alumno}")
 
         # 2. CREAR RELACIÓN ALUMNO-GRADO
         relacion_grado_data['id_alumno'] = alumno.id_alumno
         relacion_grado_serializer = AlumnoXGradoSerializer(data=relacion_grado_data)
         if not relacion_grado_serializer.is_valid():
+            transaction.set_rollback(True)
             return Response({
                 'error': 'Error en relación con grado',
                 'detalles': relacion_grado_serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
 
         relacion_grado = relacion_grado_serializer.save()
-        print(f" Relación grado creada: {relacion_grado.id_alumno_x_grado}")
 
         # 3. CREAR RELACIÓN ALUMNO-TUTOR
         relacion_tutor_data['id_alumno'] = alumno.id_alumno
         relacion_tutor_serializer = AlumnoXTutorSerializer(data=relacion_tutor_data)
         if not relacion_tutor_serializer.is_valid():
+            transaction.set_rollback(True)
             return Response({
                 'error': 'Error en relación con tutor',
                 'detalles': relacion_tutor_serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
 
         relacion_tutor = relacion_tutor_serializer.save()
-        print(f" Relación tutor creada: {relacion_tutor.id_alumno_x_tutor}")
 
-        # 4. ACTUALIZAR ASIENTOS DISPONIBLES EN EL GRADO
-        try:
-            grado = Grado.objects.get(id_grado=relacion_grado_data['id_grado'])
-            if grado.asientos_disponibles > 0:
-                grado.asientos_disponibles -= 1
-                grado.save()
-                print(f" Asientos actualizados: {grado.asientos_disponibles} disponibles")
-            else:
-                return Response({
-                    'error': 'No hay asientos disponibles en el grado seleccionado'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-        except Grado.DoesNotExist:
+        # 4. RESERVAR ASIENTO EN EL GRADO
+        # UPDATE condicional al final de la transacción: el lock de la fila del
+        # grado se toma recién acá y se libera con el commit
+        if not Grado.objects.reservar_asiento(relacion_grado.id_grado_id):
+            transaction.set_rollback(True)
             return Response({
-                'error': 'Grado no encontrado'
+                'error': 'No hay asientos disponibles en el grado seleccionado'
             }, status=status.HTTP_400_BAD_REQUEST)
+        logger.info('Alumno completo creado', extra={
+            'id_alumno': alumno.id_alumno,
+            'id_grado': relacion_grado.id_grado_id,
+            'id_alumno_x_grado': relacion_grado.id_alumno_x_grado,
+            'id_alumno_x_tutor': relacion_tutor.id_alumno_x_tutor,
+        })
 
         # Éxito - todo se guardó correctamente
         return Response({
@@ -290,22 +483,156 @@ def create_alumno_completo(request):
         }, status=status.HTTP_201_CREATED)
 
     except Exception as e:
-        print(f"❌ Error en create_alumno_completo: {str(e)}")
+        logger.exception('Error en create_alumno_completo')
+        transaction.set_rollback(True)
         return Response({
             'error': f'Error interno del servidor: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+#  FLUJO: createAlumnoCompleto en lote - Inscripción masiva desde planillas
+MAX_INSCRIPCIONES_LOTE = 1000
+
+@api_view(['POST'])
+def create_alumnos_completos_lote(request):
+    """
+    Crea en lote alumnos con su relación de grado y de tutor.
+    Recibe una lista de {alumno, relacionGrado, relacionTutor} (o {'registros': [...]}),
+    valida todo antes de escribir y devuelve errores por fila sin abortar las filas válidas.
+    """
+    registros = request.data.get('registros') if isinstance(request.data, dict) else request.data
+    if not isinstance(registros, list) or not registros:
+        return Response({
+            'error': 'Se requiere una lista de registros {alumno, relacionGrado, relacionTutor}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(registros) > MAX_INSCRIPCIONES_LOTE:
+        return Response({
+            'error': f'Máximo {MAX_INSCRIPCIONES_LOTE} registros por lote'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    errores = {}
+    validos = {}
+
+    # 1. VALIDACIÓN DE CAMPOS (sin consultas)
+    for fila, registro in enumerate(registros):
+        serializer = InscripcionLoteSerializer(data=registro)
+        if serializer.is_valid():
+            validos[fila] = serializer.validated_data
+        else:
+            errores[fila] = {'error': 'Datos inválidos', 'detalles': serializer.errors}
+
+    try:
+        with transaction.atomic():
+            # 2. VALIDACIÓN CONTRA LA BASE - una consulta por tabla para todo el lote
+            dnis = [datos['alumno']['dni_alumno'] for datos in validos.values()]
+            dnis_existentes = set(Alumno.objects.filter(dni_alumno__in=dnis).values_list('dni_alumno', flat=True))
+            # Sin bloquear los grados: los asientos leídos sólo reparten los errores por
+            # fila; el UPDATE condicional del paso 4 es el que los toma
+            asientos = dict(Grado.objects.filter(
+                id_grado__in={datos['relacionGrado']['id_grado'] for datos in validos.values()}
+            ).values_list('id_grado', 'asientos_disponibles'))
+            colegios = set(Colegios_procedencia.objects.filter(
+                id__in={datos['relacionGrado']['id_colegio_procedencia'] for datos in validos.values()}
+            ).values_list('id', flat=True))
+            tutores = set(Tutor.objects.filter(
+                id_tutor__in={datos['relacionTutor']['id_tutor'] for datos in validos.values()}
+            ).values_list('id_tutor', flat=True))
+            parentescos = set(Parentesco.objects.filter(
+                id_parentesco__in={datos['relacionTutor']['id_parentesco'] for datos in validos.values()}
+            ).values_list('id_parentesco', flat=True))
+
+            dnis_vistos = set()
+            asientos_usados = {}
+            for fila, datos in list(validos.items()):
+                dni = datos['alumno']['dni_alumno']
+                id_grado = datos['relacionGrado']['id_grado']
+                error = None
+                if dni in dnis_existentes:
+                    error = f'DNI {dni} ya está registrado'
+                elif dni in dnis_vistos:
+                    error = f'DNI {dni} repetido en el lote'
+                elif id_grado not in asientos:
+                    error = 'Grado no encontrado'
+                elif datos['relacionGrado']['id_colegio_procedencia'] not in colegios:
+                    error = 'Colegio de procedencia no encontrado'
+                elif datos['relacionTutor']['id_tutor'] not in tutores:
+                    error = 'Tutor no encontrado'
+                elif datos['relacionTutor']['id_parentesco'] not in parentescos:
+                    error = 'Parentesco no encontrado'
+                elif asientos_usados.get(id_grado, 0) >= asientos[id_grado]:
+                    error = 'No hay asientos disponibles en el grado seleccionado'
+
+                if error:
+                    errores[fila] = {'error': error}
+                    del validos[fila]
+                else:
+                    dnis_vistos.add(dni)
+                    asientos_usados[id_grado] = asientos_usados.get(id_grado, 0) + 1
+
+            creados = []
+            if validos:
+                # 3. INSERTAR ALUMNOS Y RELACIONES CON bulk_create
+                Alumno.objects.bulk_create([Alumno(**datos['alumno']) for datos in validos.values()])
+                # MySQL no devuelve las PK de bulk_create: se recuperan por DNI (único)
+                ids_por_dni = dict(Alumno.objects.filter(dni_alumno__in=dnis_vistos).values_list('dni_alumno', 'id_alumno'))
+
+                AlumnoXGrado.objects.bulk_create([
+                    AlumnoXGrado(
+                        id_alumno_id=ids_por_dni[datos['alumno']['dni_alumno']],
+                        id_grado_id=datos['relacionGrado']['id_grado'],
+                        id_colegio_procedencia_id=datos['relacionGrado']['id_colegio_procedencia'],
+                        activo=datos['relacionGrado']['activo'],
+                    )
+                    for datos in validos.values()
+                ])
+                AlumnoXTutor.objects.bulk_create([
+                    AlumnoXTutor(
+                        id_alumno_id=ids_por_dni[datos['alumno']['dni_alumno']],
+                        id_tutor_id=datos['relacionTutor']['id_tutor'],
+                        id_parentesco_id=datos['relacionTutor']['id_parentesco'],
+                    )
+                    for datos in validos.values()
+                ])
+
+                # 4. RESERVAR ASIENTOS - un único UPDATE condicional para todos los grados,
+                # el mismo contador que create_alumno_completo. Si otra inscripción los
+                # tomó después de la lectura del paso 2, el lote entero se revierte
+                if not Grado.objects.reservar_asientos(asientos_usados):
+                    transaction.set_rollback(True)
+                    return Response({
+                        'error': 'No hay asientos disponibles en el grado seleccionado'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                # bulk_create no dispara las señales de panel_tutor.py: los tutores tienen hijos nuevos
+                invalidar_catalogo_al_confirmar('panel_tutores')
+
+                indice_personas.personas_modificadas('alumno', ids_por_dni.values())
+
+                creados = [
+                    {
+                        'fila': fila,
+                        'alumno_id': ids_por_dni[datos['alumno']['dni_alumno']],
+                        'alumno_dni': datos['alumno']['dni_alumno'],
+                    }
+                    for fila, datos in validos.items()
+                ]
+
+    except Exception as e:
+        return Response({
+            'error': f'Error interno del servidor: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        'success': bool(creados),
+        'creados': creados,
+        'errores': [{'fila': fila, **error} for fila, error in sorted(errores.items())],
+    }, status=status.HTTP_201_CREATED if creados else status.HTTP_400_BAD_REQUEST)
+
 #  VERIFICACIÓN DNI ALUMNO
 @api_view(['GET'])
 def verificar_dni_alumno(request, dni):
     """Verificar si DNI de alumno ya existe"""
     try:
         existe = Alumno.objects.filter(dni_alumno=dni).exists()
-        return Response({
-            'dni': dni,
-            'existe': existe,
-            'mensaje': f'DNI {dni} {"ya está registrado" if existe else "disponible"}'
-        })
+        return Response(_verificacion_dni_alumno(dni, existe))
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -315,26 +642,7 @@ def verificar_dni_tutor(request, dni):
     """Verificar si DNI de tutor ya existe"""
     try:
         tutor = Tutor.objects.filter(dni_tutor=dni).first()
-        if tutor:
-            return Response({
-                'dni': dni,
-                'existe': True,
-                'activo': tutor.estado_tutor == 'Activo',
-                'mensaje': f'Tutor {tutor.nombre_tutor} {tutor.apellido_tutor} ({dni}) - Estado: {tutor.estado_tutor}',
-                'tutor_data': {
-                    'id_tutor': tutor.id_tutor,
-                    'nombre_tutor': tutor.nombre_tutor,
-                    'apellido_tutor': tutor.apellido_tutor,
-                    'estado_tutor': tutor.estado_tutor
-                }
-            })
-        else:
-            return Response({
-                'dni': dni,
-                'existe': False,
-                'activo': False,
-                'mensaje': 'DNI disponible para nuevo tutor'
-            })
+        return Response(_verificacion_dni_tutor(dni, tutor))
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -348,26 +656,7 @@ def verificar_email_tutor(request):
             return Response({'error': 'Email requerido'}, status=status.HTTP_400_BAD_REQUEST)
         
         tutor = Tutor.objects.filter(correo_tutor=email).first()
-        if tutor:
-            return Response({
-                'email': email,
-                'existe': True,
-                'activo': tutor.estado_tutor == 'Activo',
-                'mensaje': f'Email ya registrado - Tutor: {tutor.nombre_tutor} {tutor.apellido_tutor}',
-                'tutor_data': {
-                    'id_tutor': tutor.id_tutor,
-                    'nombre_tutor': tutor.nombre_tutor,
-                    'apellido_tutor': tutor.apellido_tutor,
-                    'estado_tutor': tutor.estado_tutor
-                }
-            })
-        else:
-            return Response({
-                'email': email,
-                'existe': False,
-                'activo': False,
-                'mensaje': 'Email disponible'
-            })
+        return Response(_verificacion_email_tutor(email, tutor))
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -381,26 +670,72 @@ def verificar_telefono_tutor(request):
             return Response({'error': 'Teléfono requerido'}, status=status.HTTP_400_BAD_REQUEST)
         
         tutor = Tutor.objects.filter(telefono_tutor=telefono).first()
-        if tutor:
-            return Response({
-                'telefono': telefono,
-                'existe': True,
-                'activo': tutor.estado_tutor == 'Activo',
-                'mensaje': f'Teléfono ya registrado - Tutor: {tutor.nombre_tutor} {tutor.apellido_tutor}',
-                'tutor_data': {
-                    'id_tutor': tutor.id_tutor,
-                    'nombre_tutor': tutor.nombre_tutor,
-                    'apellido_tutor': tutor.apellido_tutor,
-                    'estado_tutor': tutor.estado_tutor
-                }
-            })
-        else:
-            return Response({
-                'telefono': telefono,
-                'existe': False,
-                'activo': False,
-                'mensaje': 'Teléfono disponible'
-            })
+        return Response(_verificacion_telefono_tutor(telefono, tutor))
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+#  VERIFICACIÓN EN LOTE (DNI / EMAIL / TELÉFONO)
+@api_view(['POST'])
+def verificar_lote(request):
+    """
+    Verifica en un solo request listas de DNIs, emails y teléfonos.
+    Hace una consulta IN por tabla y devuelve, para cada valor, la misma
+    respuesta que el endpoint de verificación individual.
+    """
+    serializer = VerificacionLoteSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    datos = serializer.validated_data
+
+    try:
+        from apps.login.models import Empleado
+
+        resultado = {}
+
+        if datos['dnis_alumnos']:
+            existentes = set(
+                Alumno.objects.filter(dni_alumno__in=datos['dnis_alumnos']).values_list('dni_alumno', flat=True)
+            )
+            resultado['dnis_alumnos'] = [
+                _verificacion_dni_alumno(dni, dni in existentes) for dni in datos['dnis_alumnos']
+            ]
+
+        if datos['dnis_tutores'] or datos['emails_tutores'] or datos['telefonos_tutores']:
+            tutores = Tutor.objects.filter(
+                Q(dni_tutor__in=datos['dnis_tutores']) |
+                Q(correo_tutor__in=datos['emails_tutores']) |
+                Q(telefono_tutor__in=datos['telefonos_tutores'])
+            )
+            por_dni, por_email, por_telefono = {}, {}, {}
+            # Respeta el orden del modelo, igual que .first() en los endpoints individuales
+            for tutor in tutores:
+                por_dni.setdefault(tutor.dni_tutor, tutor)
+                por_email.setdefault(tutor.correo_tutor.lower(), tutor)
+                por_telefono.setdefault(tutor.telefono_tutor, tutor)
+            if datos['dnis_tutores']:
+                resultado['dnis_tutores'] = [
+                    _verificacion_dni_tutor(dni, por_dni.get(dni)) for dni in datos['dnis_tutores']
+                ]
+            if datos['emails_tutores']:
+                resultado['emails_tutores'] = [
+                    _verificacion_email_tutor(email, por_email.get(email.lower())) for email in datos['emails_tutores']
+                ]
+            if datos['telefonos_tutores']:
+                resultado['telefonos_tutores'] = [
+                    _verificacion_telefono_tutor(telefono, por_telefono.get(telefono)) for telefono in datos['telefonos_tutores']
+                ]
+
+        if datos['dnis_empleados']:
+            # dni_empleado es texto en la tabla: se busca como texto y se responde como número,
+            # igual que verificar_dni_empleado
+            empleados = {}
+            for empleado in Empleado.objects.filter(dni_empleado__in=[str(dni) for dni in datos['dnis_empleados']]):
+                empleados.setdefault(empleado.dni_empleado, empleado)
+            resultado['dnis_empleados'] = [
+                _verificacion_dni_empleado(dni, empleados.get(str(dni))) for dni in datos['dnis_empleados']
+            ]
+
+        return Response(resultado)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -433,6 +768,7 @@ def verificar_tutor_activo_by_dni(request, dni):
 def verificar_cupos_grado(request, id_grado):
     """Verificar cupos disponibles en un grado"""
     try:
+        # Lee el mismo contador que actualiza Grado.objects.reservar_asiento (sin caché)
         grado = Grado.objects.filter(id_grado=id_grado).first()
         if not grado:
             return Response({'error': 'Grado no encontrado'}, status=status.HTTP_404_NOT_FOUND)
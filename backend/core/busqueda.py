@@ -0,0 +1,130 @@
+import unicodedata
+from bisect import bisect_left, insort
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con cualquier separador reducido a un espacio"""
+    if texto is None:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in texto).split())
+
+
+def tokenizar(texto):
+    return normalizar(texto).split()
+
+
+class IndicePrefijos:
+    """
+    Lista ordenada de (token, clave) para buscar por prefijo con bisect:
+    O(log n + coincidencias), sin recorrer todo el catálogo.
+    """
+
+    def __init__(self):
+        self._entradas = []
+        self._tokens_por_clave = {}
+
+    def construir(self, items):
+        """items: iterable de (clave, tokens)"""
+        entradas = []
+        self._tokens_por_clave = {}
+        for clave, tokens in items:
+            tokens = set(tokens)
+            self._tokens_por_clave[clave] = tokens
+            entradas.extend((token, clave) for token in tokens)
+        entradas.sort()
+        self._entradas = entradas
+
+    def agregar(self, clave, tokens):
+        self.quitar(clave)
+        tokens = set(tokens)
+        self._tokens_por_clave[clave] = tokens
+        for token in tokens:
+            insort(self._entradas, (token, clave))
+
+    def quitar(self, clave):
+        for token in self._tokens_por_clave.pop(clave, ()):
+            i = bisect_left(self._entradas, (token, clave))
+            if i < len(self._entradas) and self._entradas[i] == (token, clave):
+                del self._entradas[i]
+
+    def buscar_prefijo(self, prefijo):
+        claves = set()
+        i = bisect_left(self._entradas, (prefijo,))
+        while i < len(self._entradas) and self._entradas[i][0].startswith(prefijo):
+            claves.add(self._entradas[i][1])
+            i += 1
+        return claves
+
+    def buscar_tokens(self, tokens):
+        """Claves en las que cada token buscado es prefijo de algún token indexado"""
+        resultado = None
+        for token in tokens:
+            claves = self.buscar_prefijo(token)
+            resultado = claves if resultado is None else resultado & claves
+            if not resultado:
+                return set()
+        return resultado or set()
+
+    def __len__(self):
+        return len(self._tokens_por_clave)
+
+
+class IndiceNgramas:
+    """
+    Índice de n-gramas (trigramas por defecto) para búsquedas parciales:
+    las claves candidatas salen de intersectar las listas de cada n-grama
+    del fragmento y después se confirma la subcadena sobre el texto.
+    """
+
+    def __init__(self, n=3):
+        self.n = n
+        self._postings = {}
+        self._textos = {}
+
+    def _ngramas(self, texto):
+        return {texto[i:i + self.n] for i in range(len(texto) - self.n + 1)}
+
+    def construir(self, items):
+        """items: iterable de (clave, texto normalizado)"""
+        self._postings = {}
+        self._textos = {}
+        for clave, texto in items:
+            self._indexar(clave, texto)
+
+    def _indexar(self, clave, texto):
+        self._textos[clave] = texto
+        for ngrama in self._ngramas(texto):
+            self._postings.setdefault(ngrama, set()).add(clave)
+
+    def agregar(self, clave, texto):
+        self.quitar(clave)
+        self._indexar(clave, texto)
+
+    def quitar(self, clave):
+        texto = self._textos.pop(clave, None)
+        if texto is None:
+            return
+        for ngrama in self._ngramas(texto):
+            claves = self._postings.get(ngrama)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._postings[ngrama]
+
+    def buscar_subcadena(self, fragmento):
+        if len(fragmento) < self.n:
+            raise ValueError(f'El fragmento debe tener al menos {self.n} caracteres')
+        listas = sorted((self._postings.get(ngrama, set()) for ngrama in self._ngramas(fragmento)), key=len)
+        if not listas or not listas[0]:
+            return set()
+        candidatos = set(listas[0])
+        for claves in listas[1:]:
+            candidatos &= claves
+            if not candidatos:
+                return set()
+        return {clave for clave in candidatos if fragmento in self._textos[clave]}
+
+    def __len__(self):
+        return len(self._textos)
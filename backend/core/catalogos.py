@@ -0,0 +1,155 @@
+"""
+Caché versionada de catálogos (grados, colegios, parentescos, roles, lugares...).
+
+Cada catálogo tiene una versión guardada en la caché de Django. Las
+escrituras la incrementan con invalidar_catalogo(), lo que deja obsoletos
+a la vez el payload cacheado y el ETag que tienen los navegadores. Si el
+cliente manda If-None-Match con el ETag vigente se responde 304 sin
+consultar la tabla ni volver a serializar.
+
+Con varios workers la caché tiene que ser compartida (CACHE_URL con redis o
+memcached, ver core/settings.py) para que todos vean la misma versión.
+"""
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+_lock = threading.Lock()
+_contadores = defaultdict(lambda: {'hits': 0, 'misses': 0, 'not_modified': 0, 'invalidaciones': 0})
+
+
+def _contar(nombre, evento):
+    with _lock:
+        _contadores[nombre][evento] += 1
+
+
+def _clave_version(nombre):
+    return f'catalogo:{nombre}:version'
+
+
+def version_catalogo(nombre):
+    # La versión inicial es un timestamp: si la caché se vacía no se repiten ETags viejos
+    version = cache.get(_clave_version(nombre))
+    if version is None:
+        cache.add(_clave_version(nombre), time.time_ns(), timeout=None)
+        version = cache.get(_clave_version(nombre))
+    return version
+
+
+def invalidar_catalogo(*nombres):
+    """Incrementa la versión de los catálogos indicados y devuelve {nombre: nueva versión}"""
+    versiones = {}
+    for nombre in nombres:
+        try:
+            versiones[nombre] = cache.incr(_clave_version(nombre))
+        except ValueError:
+            versiones[nombre] = time.time_ns()
+            cache.set(_clave_version(nombre), versiones[nombre], timeout=None)
+        _contar(nombre, 'invalidaciones')
+    return versiones
+
+
+def invalidar_catalogo_al_confirmar(*nombres):
+    """Invalida cuando la transacción actual se confirma (o en el acto, fuera de una transacción)"""
+    transaction.on_commit(lambda: invalidar_catalogo(*nombres))
+
+
+def etag_catalogo(nombre):
+    return f'"{nombre}-{version_catalogo(nombre)}"'
+
+
+def respuesta_catalogo(request, nombre, construir):
+    """
+    Devuelve el catálogo `nombre` desde la caché, o 304 si el cliente ya lo tiene.
+    `construir` genera la Response original y sólo se llama en un miss.
+    Los requests con parámetros (paginación, filtros) no se cachean.
+    """
+    if request.query_params:
+        return construir()
+
+    version = version_catalogo(nombre)
+    etag = f'"{nombre}-{version}"'
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        _contar(nombre, 'not_modified')
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        clave_datos = f'catalogo:{nombre}:{version}:datos'
+        datos = cache.get(clave_datos)
+        if datos is not None:
+            _contar(nombre, 'hits')
+            response = Response(datos)
+        else:
+            _contar(nombre, 'misses')
+            response = construir()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(clave_datos, response.data, timeout=None)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def catalogo_cacheado(nombre):
+    """Decorador para vistas de función (@api_view) que devuelven un catálogo"""
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            return respuesta_catalogo(request, nombre, lambda: vista(request, *args, **kwargs))
+        return envoltura
+    return decorador
+
+
+class CatalogoCacheMixin:
+    """
+    Mixin para ModelViewSet de catálogos: cachea list() e invalida en cada escritura.
+    `catalogo` es el catálogo que sirve el list(); `catalogos_invalidados` los que
+    dependen de la tabla (por defecto, sólo el propio).
+    """
+    catalogo = None
+    catalogos_invalidados = ()
+
+    def list(self, request, *args, **kwargs):
+        return respuesta_catalogo(request, self.catalogo, lambda: super(CatalogoCacheMixin, self).list(request, *args, **kwargs))
+
+    def _invalidar(self):
+        invalidar_catalogo_al_confirmar(*(self.catalogos_invalidados or (self.catalogo,)))
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self._invalidar()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self._invalidar()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self._invalidar()
+
+
+def estadisticas_catalogos():
+    with _lock:
+        return {nombre: dict(valores) for nombre, valores in _contadores.items()}
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def catalogos_estadisticas(request):
+    """Contadores hit / miss / 304 por catálogo (por proceso)"""
+    estadisticas = estadisticas_catalogos()
+    for nombre, valores in estadisticas.items():
+        total = valores['hits'] + valores['misses'] + valores['not_modified']
+        valores['hit_rate'] = round((valores['hits'] + valores['not_modified']) / total, 4) if total else None
+        valores['version'] = version_catalogo(nombre)
+    return Response(estadisticas)
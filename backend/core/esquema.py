@@ -0,0 +1,24 @@
+from django.apps import apps
+
+# Apps propias: sus tablas las crea el script SQL, no las migraciones
+APPS_PROPIAS = ['login', 'profesores', 'secretarios', 'preceptores_rectores', 'directores']
+
+
+def manejar_modelos_propios():
+    """
+    Marca managed = True en los modelos no manejados de las apps propias, para
+    crear sus tablas desde los modelos (migrate --run-syncdb, base de tests).
+    Devuelve los modelos modificados para revertirlo con liberar_modelos_propios().
+    """
+    modelos = [
+        modelo for modelo in apps.get_models()
+        if modelo._meta.app_label in APPS_PROPIAS and not modelo._meta.managed
+    ]
+    for modelo in modelos:
+        modelo._meta.managed = True
+    return modelos
+
+
+def liberar_modelos_propios(modelos):
+    for modelo in modelos:
+        modelo._meta.managed = False
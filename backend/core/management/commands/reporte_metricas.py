@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from core.metricas import estadisticas_publicadas
+
+
+class Command(BaseCommand):
+    help = (
+        'Reporte de latencia y consultas SQL por endpoint, con lo que publicaron los '
+        "workers en la caché 'metricas' (el servidor tiene que correr con METRICAS_PUBLICAR=1)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orden', choices=['total', 'db', 'consultas', 'requests'], default='total',
+                            help='Ordena por p95 de la métrica indicada (o por cantidad de requests)')
+        parser.add_argument('--top', type=int, default=None, help='Sólo los N primeros endpoints')
+
+    def handle(self, *args, **options):
+        resumen = estadisticas_publicadas()
+        if not resumen:
+            self.stdout.write('No hay métricas publicadas (¿el servidor corre con METRICAS_PUBLICAR=1 y la misma METRICAS_CACHE_DIR?)')
+            return
+
+        campo = {'total': 'total_ms', 'db': 'db_ms', 'consultas': 'consultas'}.get(options['orden'])
+
+        def clave(item):
+            datos = item[1]
+            return datos['requests'] if campo is None else datos[campo]['p95']
+
+        filas = sorted(resumen.items(), key=clave, reverse=True)[:options['top']]
+        self.stdout.write(
+            f"{'endpoint':<40}{'reqs':>7}{'N+1':>6}{'total p50':>11}{'p95':>9}{'p99':>9}"
+            f"{'db p95':>9}{'sql p50':>9}{'sql p95':>9}{'serial p95':>12}"
+        )
+        for endpoint, datos in filas:
+            self.stdout.write(
+                f"{endpoint[:39]:<40}{datos['requests']:>7}{datos['con_duplicadas']:>6}"
+                f"{datos['total_ms']['p50']:>11.1f}{datos['total_ms']['p95']:>9.1f}{datos['total_ms']['p99']:>9.1f}"
+                f"{datos['db_ms']['p95']:>9.1f}{datos['consultas']['p50']:>9.0f}{datos['consultas']['p95']:>9.0f}"
+                f"{datos['serializacion_ms']['p95']:>12.1f}"
+            )
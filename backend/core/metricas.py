@@ -0,0 +1,150 @@
+"""
+Métricas por endpoint (nombre de URL resuelto): latencia total, tiempo y
+cantidad de consultas SQL, tiempo de serialización (render de la respuesta)
+y requests con consultas repetidas (firma típica de un N+1).
+
+MetricasMiddleware (core/middleware.py) registra cada request acá. Las
+muestras se guardan por proceso en ventanas acotadas. Con
+METRICAS_PUBLICAR=1 cada proceso arranca un hilo que publica sus muestras
+cada INTERVALO_PUBLICACION segundos en la caché 'metricas' (en disco,
+compartida por los workers del host), de donde las lee el comando
+reporte_metricas. Sin eso sólo está /api/metricas/ con las del proceso que
+atiende.
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+MAX_MUESTRAS = 1000           # últimas N muestras por endpoint
+INTERVALO_PUBLICACION = 10    # segundos entre publicaciones en la caché
+TTL_PUBLICACION = 60 * 10
+CLAVE_PROCESOS = 'metricas:procesos'
+
+_lock = threading.Lock()
+# endpoint -> deque de (total_ms, db_ms, consultas, serializacion_ms)
+_muestras = defaultdict(lambda: deque(maxlen=MAX_MUESTRAS))
+_contadores = defaultdict(lambda: {'requests': 0, 'con_duplicadas': 0})
+_pid_publicador = None
+
+logger = logging.getLogger(__name__)
+
+
+def registrar(endpoint, total_ms, db_ms, consultas, serializacion_ms, duplicadas):
+    with _lock:
+        _muestras[endpoint].append((total_ms, db_ms, consultas, serializacion_ms))
+        _contadores[endpoint]['requests'] += 1
+        if duplicadas:
+            _contadores[endpoint]['con_duplicadas'] += 1
+    if settings.METRICAS_PUBLICAR and _pid_publicador != os.getpid():
+        _iniciar_publicador()
+
+
+def _iniciar_publicador():
+    # Un hilo por proceso: arranca con el primer request, también en los hijos de un fork
+    global _pid_publicador
+    with _lock:
+        if _pid_publicador == os.getpid():
+            return
+        _pid_publicador = os.getpid()
+    threading.Thread(target=_publicar_periodicamente, name='metricas', daemon=True).start()
+
+
+def _publicar_periodicamente():
+    while True:
+        time.sleep(INTERVALO_PUBLICACION)
+        try:
+            publicar_en_cache()
+        except Exception:
+            logger.exception('No se pudieron publicar las métricas')
+
+
+def _copia():
+    with _lock:
+        return (
+            {endpoint: list(muestras) for endpoint, muestras in _muestras.items()},
+            {endpoint: dict(valores) for endpoint, valores in _contadores.items()},
+        )
+
+
+def reiniciar():
+    with _lock:
+        _muestras.clear()
+        _contadores.clear()
+
+
+def _percentiles(valores):
+    valores = sorted(valores)
+    if not valores:
+        return None
+
+    def p(percentil):
+        return round(valores[min(len(valores) - 1, int(len(valores) * percentil / 100))], 2)
+
+    return {'p50': p(50), 'p95': p(95), 'p99': p(99), 'max': round(valores[-1], 2)}
+
+
+def resumir(muestras, contadores):
+    """{endpoint: {requests, con_duplicadas, total_ms, db_ms, consultas, serializacion_ms}}"""
+    resumen = {}
+    for endpoint in sorted(muestras):
+        filas = muestras[endpoint]
+        resumen[endpoint] = {
+            **contadores.get(endpoint, {}),
+            'total_ms': _percentiles(fila[0] for fila in filas),
+            'db_ms': _percentiles(fila[1] for fila in filas),
+            'consultas': _percentiles(fila[2] for fila in filas),
+            'serializacion_ms': _percentiles(fila[3] for fila in filas),
+        }
+    return resumen
+
+
+def estadisticas_proceso():
+    return resumir(*_copia())
+
+
+def publicar_en_cache():
+    """Deja las muestras de este proceso en la caché 'metricas' para el comando reporte_metricas"""
+    cache = caches['metricas']
+    pid = os.getpid()
+    cache.set(f'metricas:{pid}', _copia(), TTL_PUBLICACION)
+    procesos = cache.get(CLAVE_PROCESOS) or []
+    if pid not in procesos:
+        cache.set(CLAVE_PROCESOS, [*procesos, pid][-100:], None)
+
+
+def estadisticas_publicadas():
+    """Combina las muestras publicadas por todos los procesos (los percentiles se recalculan)"""
+    muestras = defaultdict(list)
+    contadores = defaultdict(lambda: {'requests': 0, 'con_duplicadas': 0})
+    cache = caches['metricas']
+    for pid in cache.get(CLAVE_PROCESOS) or []:
+        publicado = cache.get(f'metricas:{pid}')
+        if publicado is None:
+            continue
+        muestras_proceso, contadores_proceso = publicado
+        for endpoint, filas in muestras_proceso.items():
+            muestras[endpoint].extend(filas)
+        for endpoint, valores in contadores_proceso.items():
+            for clave, valor in valores.items():
+                contadores[endpoint][clave] += valor
+    return resumir(muestras, contadores)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metricas_endpoints(request):
+    """
+    Percentiles por endpoint. Por defecto los de este proceso;
+    ?origen=procesos combina lo publicado por todos los workers.
+    """
+    if request.query_params.get('origen') == 'procesos':
+        return Response(estadisticas_publicadas())
+    return Response(estadisticas_proceso())
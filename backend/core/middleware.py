@@ -0,0 +1,105 @@
+import logging
+import time
+import uuid
+from collections import Counter
+
+from django.db import connection
+
+from core import metricas
+from core.registro import request_actual
+from core.server_timing import ServerTiming
+
+logger = logging.getLogger(__name__)
+logger_requests = logging.getLogger('core.requests')
+
+# La misma consulta (SQL con placeholders) repetida esta cantidad de veces
+# en un request es casi siempre un N+1
+UMBRAL_CONSULTAS_DUPLICADAS = 3
+
+
+class RegistroConsultas:
+    """execute_wrapper que cuenta las consultas, su tiempo y las repeticiones por SQL"""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.duracion_ms = 0.0
+        self.firmas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duracion_ms += (time.perf_counter() - inicio) * 1000
+            self.cantidad += 1
+            self.firmas[sql] += 1
+
+    def duplicadas(self):
+        return {sql: veces for sql, veces in self.firmas.items() if veces >= UMBRAL_CONSULTAS_DUPLICADAS}
+
+
+class MetricasMiddleware:
+    """
+    Mide cada request: consultas SQL, tiempo de base, tiempo de serialización
+    (render de la Response de DRF) y latencia total. Lo agrega por nombre de
+    URL en core.metricas y lo devuelve en el header Server-Timing.
+    Los requests con consultas repetidas llevan X-Consultas-Duplicadas y se loguean.
+
+    También asigna el request id (X-Request-ID entrante o uno nuevo) que
+    core.registro agrega a cada evento de log del request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        registro = RegistroConsultas()
+        request._serializacion_ms = 0.0
+        request.id_request = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        contexto = request_actual.set(request)
+        inicio = time.perf_counter()
+        try:
+            with connection.execute_wrapper(registro):
+                response = self.get_response(request)
+            total_ms = (time.perf_counter() - inicio) * 1000
+            self.registrar(request, response, registro, total_ms)
+        finally:
+            request_actual.reset(contexto)
+        response['X-Request-ID'] = request.id_request
+        return response
+
+    def registrar(self, request, response, registro, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.view_name or match.route) if match else 'sin-resolver'
+        duplicadas = registro.duplicadas()
+        metricas.registrar(
+            endpoint, total_ms, registro.duracion_ms, registro.cantidad, request._serializacion_ms, bool(duplicadas)
+        )
+
+        tiempos = ServerTiming()
+        tiempos.agregar('db', registro.duracion_ms, f'{registro.cantidad} consultas')
+        tiempos.agregar('serializacion', request._serializacion_ms)
+        tiempos.agregar('total', total_ms)
+        tiempos.aplicar(response)
+
+        if duplicadas:
+            response['X-Consultas-Duplicadas'] = str(sum(duplicadas.values()))
+            sql, veces = max(duplicadas.items(), key=lambda item: item[1])
+            logger.warning('Posible N+1 en %s: %s veces la misma consulta: %s', endpoint, veces, sql[:200])
+
+        logger_requests.info('%s %s', request.method, request.path, extra={
+            'status': response.status_code,
+            'duracion_ms': round(total_ms, 2),
+            'db_ms': round(registro.duracion_ms, 2),
+            'consultas': registro.cantidad,
+        })
+
+    def process_template_response(self, request, response):
+        # La Response de DRF se renderiza (JSON) después de este hook
+        inicio = time.perf_counter()
+
+        def fin_render(_response):
+            request._serializacion_ms += (time.perf_counter() - inicio) * 1000
+
+        response.add_post_render_callback(fin_render)
+        return response
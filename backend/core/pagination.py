@@ -0,0 +1,148 @@
+import base64
+import json
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) OPCIONAL.
+
+    Sólo pagina si el cliente envía ?cursor= o ?page_size=; si no, la vista
+    devuelve la lista completa como siempre. El cursor guarda los valores
+    de `ordering` de la última fila, y la página siguiente se obtiene con
+    WHERE (a, b, c) > (x, y, z), así que cada página cuesta lo mismo sin
+    importar qué tan profundo se desplace el cliente.
+
+    `ordering` debe terminar en un campo único (la PK) y sus campos no
+    pueden ser nulos. Con `paginar_siempre = True` se pagina aunque el
+    cliente no mande ninguno de los dos parámetros.
+    """
+    ordering = ('pk',)
+    paginar_siempre = False
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if not self.paginar_siempre and self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(params.get(self.cursor_query_param))
+
+        queryset = queryset.order_by(*self.ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.filtro_despues_de(cursor))
+
+        filas = list(queryset[:self.page_size + 1])
+        self.has_next = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        self.next_position = self.valores_de(filas[-1]) if self.has_next else None
+        return filas
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def filtro_despues_de(self, valores):
+        """
+        (a, b, c) > (x, y, z) expresado como OR de prefijos iguales, más
+        a >= x redundante: sin esa cota el OR no se traduce en un rango del
+        índice y la base recorre la tabla desde el principio.
+        """
+        condiciones = []
+        for i, campo in enumerate(self.ordering):
+            nombre = campo.lstrip('-')
+            lookup = 'lt' if campo.startswith('-') else 'gt'
+            iguales = {c.lstrip('-'): v for c, v in zip(self.ordering[:i], valores[:i])}
+            condiciones.append(Q(**iguales, **{f'{nombre}__{lookup}': valores[i]}))
+        primero = self.ordering[0]
+        cota = Q(**{f"{primero.lstrip('-')}__{'lte' if primero.startswith('-') else 'gte'}": valores[0]})
+        return cota & reduce(or_, condiciones)
+
+    def valores_de(self, instancia):
+        valores = []
+        for campo in self.ordering:
+            valor = getattr(instancia, campo.lstrip('-'))
+            if isinstance(valor, (date, datetime)):
+                valor = valor.isoformat()
+            valores.append(valor)
+        return valores
+
+    def encode_cursor(self, valores):
+        return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(valores, list) or len(valores) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return valores
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class AlumnoPagination(KeysetPagination):
+    ordering = ('apellido_alumno', 'nombre_alumno', 'id_alumno')
+
+
+class TutorPagination(KeysetPagination):
+    ordering = ('apellido_tutor', 'nombre_tutor', 'id_tutor')
+
+
+class ColegioPagination(KeysetPagination):
+    ordering = ('nombre_colegio_procedencia', 'id')
+
+
+class MedidaXAlumnoPagination(KeysetPagination):
+    ordering = ('-fecha_medida', '-id_medida_x_alumno')
+
+
+class ConsultaIncidenciasPagination(MedidaXAlumnoPagination):
+    paginar_siempre = True
+
+
+class ReunionPagination(KeysetPagination):
+    ordering = ('-fecha_hora_reunion', '-id_reunion')
@@ -0,0 +1,113 @@
+"""
+Logging sin bloqueo para los requests.
+
+Los handlers de LOGGING no escriben: ColaHandler formatea el LogRecord
+(JSON, una línea por evento) y lo encola; un QueueListener en un hilo
+aparte lo escribe. El request paga el formateo y un put() en una cola en
+memoria, no la escritura.
+
+Cada evento lleva request_id y endpoint del request en curso, que
+MetricasMiddleware deja en un ContextVar. Los datos propios del evento se
+pasan con extra={...} y salen como campos del JSON:
+
+    logger.info('Medida creada', extra={'id_medida': medida.pk})
+
+El mensaje se formatea en el hilo que loguea, igual que en el QueueHandler
+estándar: argumentos mutables (request.data) salen como estaban al
+loguear. Con %s en lugar de f-strings sólo se formatea si el nivel pasa.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+request_actual = ContextVar('request_actual', default=None)
+
+# Atributos estándar de LogRecord: todo lo demás vino en extra={...}
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'endpoint', 'taskName', 'request',
+}
+
+
+class ContextoRequestFilter(logging.Filter):
+    """
+    Agrega request_id y endpoint del request en curso (corre en el hilo del
+    request). django.request loguea cuando el middleware ya terminó, pero
+    pasa el request en el registro.
+    """
+
+    def filter(self, record):
+        request = request_actual.get() or getattr(record, 'request', None)
+        record.request_id = getattr(request, 'id_request', None)
+        match = getattr(request, 'resolver_match', None)
+        record.endpoint = match.view_name if match else None
+        return True
+
+
+class FormatoJSON(logging.Formatter):
+    def format(self, record):
+        evento = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'endpoint': getattr(record, 'endpoint', None),
+        }
+        evento.update({clave: valor for clave, valor in vars(record).items() if clave not in _ATRIBUTOS_RECORD})
+        if record.exc_info:
+            evento['traceback'] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+class ColaHandler(QueueHandler):
+    """
+    Formatea con FormatoJSON y encola; un único QueueListener por proceso
+    escribe las líneas ya formateadas con un StreamHandler desde su propio
+    hilo. El listener arranca con el primer registro de cada proceso: un
+    hijo de fork (workers con preforking, multiprocessing) hereda la cola
+    pero no el hilo, así que arranca el suyo.
+    """
+
+    _cola = None
+    _listener = None
+    _pid = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__(None)
+        self.setFormatter(FormatoJSON())
+        self.addFilter(ContextoRequestFilter())
+
+    @classmethod
+    def cola_del_proceso(cls):
+        if cls._pid != os.getpid():
+            with cls._lock:
+                if cls._pid != os.getpid():
+                    cls._cola = queue.SimpleQueue()
+                    # prepare() ya dejó el JSON en msg: el formato por defecto lo escribe tal cual
+                    cls._listener = QueueListener(cls._cola, logging.StreamHandler(), respect_handler_level=False)
+                    cls._listener.start()
+                    cls._pid = os.getpid()
+        return cls._cola
+
+    def enqueue(self, record):
+        self.cola_del_proceso().put_nowait(record)
+
+
+def detener():
+    """Vacía la cola y frena el hilo del listener de este proceso (atexit y tests)"""
+    with ColaHandler._lock:
+        if ColaHandler._listener is not None and ColaHandler._pid == os.getpid():
+            ColaHandler._listener.stop()
+        ColaHandler._listener = None
+        ColaHandler._cola = None
+        ColaHandler._pid = None
+
+
+atexit.register(detener)
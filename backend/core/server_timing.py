@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+
+
+class ServerTiming:
+    """
+    Acumula mediciones y las publica en el header Server-Timing
+    (visible en la pestaña Network del navegador):
+
+        tiempos = ServerTiming()
+        with tiempos.medir('hash', 'authenticate()'):
+            ...
+        tiempos.aplicar(response)
+    """
+
+    def __init__(self):
+        self.metricas = []
+
+    @contextmanager
+    def medir(self, nombre, descripcion=None):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.agregar(nombre, (time.perf_counter() - inicio) * 1000, descripcion)
+
+    def agregar(self, nombre, duracion_ms, descripcion=None):
+        self.metricas.append((nombre, duracion_ms, descripcion))
+
+    def header(self):
+        partes = []
+        for nombre, duracion, descripcion in self.metricas:
+            parte = f'{nombre};dur={duracion:.1f}'
+            if descripcion:
+                parte += f';desc="{descripcion}"'
+            partes.append(parte)
+        return ', '.join(partes)
+
+    def aplicar(self, response):
+        """Agrega las mediciones al Server-Timing que ya tenga la respuesta"""
+        if not self.metricas:
+            return response
+        previo = response.get('Server-Timing')
+        response['Server-Timing'] = f'{previo}, {self.header()}' if previo else self.header()
+        return response
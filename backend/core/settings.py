@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,9 +50,13 @@ INSTALLED_APPS = [
     'apps.profesores',
     'apps.secretarios',
     'apps.preceptores_rectores',
+    # Sólo por sus comandos (reporte_metricas)
+    'core',
 ]
 
 MIDDLEWARE = [
+    # Primero: mide la latencia total, las consultas SQL y la serialización de cada endpoint
+    'core.middleware.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -96,6 +103,49 @@ DATABASES = {
 }
 
 
+# Cache
+# Catálogos versionados (core/catalogos.py), versiones de identidad, paneles de
+# tutores e índice de personas: todos los workers tienen que ver la misma caché,
+# si no una escritura en uno no invalida lo cacheado en otro. CACHE_URL elige el
+# backend compartido: redis://host:6379/0 (paquete redis) o memcached://host:11211
+# (paquete pymemcache). Sin CACHE_URL, LocMem: sólo con DEBUG (runserver, un
+# proceso); los tests usan siempre LocMem (core/test_runner.py).
+
+CACHE_URL = os.environ.get('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHE_DEFAULT = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}
+elif CACHE_URL.startswith('memcached://'):
+    CACHE_DEFAULT = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_URL.removeprefix('memcached://'),
+    }
+elif CACHE_URL:
+    raise ImproperlyConfigured(f'CACHE_URL no soportada: {CACHE_URL} (redis://... o memcached://...)')
+elif DEBUG:
+    CACHE_DEFAULT = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'piaget',
+        # El default (300) no alcanza para los paneles de tutores: dos entradas por familia
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+else:
+    raise ImproperlyConfigured('Sin DEBUG hace falta una caché compartida entre workers: definir CACHE_URL')
+
+CACHES = {
+    'default': CACHE_DEFAULT,
+    # Muestras de core/metricas.py para el comando reporte_metricas: en disco,
+    # para que la vean todos los workers del host aunque 'default' sea LocMem
+    'metricas': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('METRICAS_CACHE_DIR', str(BASE_DIR / 'metricas_cache')),
+    },
+}
+
+# Con METRICAS_PUBLICAR=1 cada worker publica sus métricas por endpoint en la
+# caché 'metricas' cada 10 s, desde un hilo propio (no en el request)
+METRICAS_PUBLICAR = os.environ.get('METRICAS_PUBLICAR') == '1'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -139,6 +189,9 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Crea las tablas de los modelos managed = False al correr los tests
+TEST_RUNNER = 'core.test_runner.UnManagedModelTestRunner'
+
 
 
 CORS_ALLOWED_ORIGINS = ["http://localhost:5173",
@@ -149,7 +202,8 @@ CORS_ALLOW_CREDENTIALS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Sin consultas a la base: el usuario se arma con los claims del token
+        'apps.login.authentication.JWTIdentidadAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -161,4 +215,33 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),     # duración del refresh token
     'ROTATE_REFRESH_TOKENS': True,                   # renueva refresh token automáticamente
     'BLACKLIST_AFTER_ROTATION': True,                # invalida el refresh antiguo
-}
\ No newline at end of file
+    'TOKEN_REFRESH_SERIALIZER': 'apps.login.serializers.IdentidadTokenRefreshSerializer',  # recarga rol / nombre en los claims
+}
+
+# Logging: los handlers sólo encolan, un hilo aparte escribe (core/registro.py).
+# Nivel por app con LOG_LEVEL_<APP>, p. ej. LOG_LEVEL_SECRETARIOS=DEBUG para ver
+# los payloads de los endpoints de escritura.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'cola': {
+            'class': 'core.registro.ColaHandler',
+        },
+    },
+    'root': {
+        'handlers': ['cola'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        **{
+            f'apps.{app}': {'level': os.environ.get(f'LOG_LEVEL_{app.upper()}', LOG_LEVEL)}
+            for app in ('login', 'secretarios', 'preceptores_rectores', 'profesores')
+        },
+        'core': {'level': os.environ.get('LOG_LEVEL_CORE', LOG_LEVEL)},
+        # Un evento por request con duración y consultas (MetricasMiddleware)
+        'core.requests': {'level': os.environ.get('LOG_LEVEL_REQUESTS', 'WARNING')},
+    },
+}
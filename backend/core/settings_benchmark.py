@@ -0,0 +1,48 @@
+"""
+Perfil de benchmark: misma configuración que core/settings.py pero contra
+una base local descartable, con las tablas creadas desde los modelos.
+
+    export DJANGO_SETTINGS_MODULE=core.settings_benchmark
+    python manage.py sembrar_escuela          # crea las tablas y siembra la escuela
+    python manage.py benchmark_endpoints      # mide todos los endpoints GET
+
+Por defecto usa SQLite (backend/benchmark.sqlite3). Con BENCHMARK_DB=mysql
+usa un MySQL local (BENCHMARK_DB_NAME / _USER / _PASSWORD / _HOST / _PORT).
+"""
+import os
+
+from .esquema import APPS_PROPIAS
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+# Los comandos que borran / siembran datos sólo corren con este perfil
+BENCHMARK = True
+
+DEBUG = False
+ALLOWED_HOSTS = ['testserver', 'localhost', '127.0.0.1']
+
+if os.environ.get('BENCHMARK_DB') == 'mysql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': os.environ.get('BENCHMARK_DB_NAME', 'piagetdb_benchmark'),
+            'USER': os.environ.get('BENCHMARK_DB_USER', 'root'),
+            'PASSWORD': os.environ.get('BENCHMARK_DB_PASSWORD', ''),
+            'HOST': os.environ.get('BENCHMARK_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('BENCHMARK_DB_PORT', '3306'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('BENCHMARK_SQLITE', str(BASE_DIR / 'benchmark.sqlite3')),
+        }
+    }
+
+# Las tablas de las apps propias se crean desde los modelos (migrate --run-syncdb)
+MIGRATION_MODULES = {app: None for app in APPS_PROPIAS}
+
+# Hash rápido para sembrar miles de usuarios; el costo de PBKDF2 se mide aparte
+# (benchmark_importacion_tutores)
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
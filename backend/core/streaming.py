@@ -0,0 +1,58 @@
+import json
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+FORMATOS_EXPORTACION = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def formato_exportacion(request):
+    """Devuelve el formato pedido con ?formato= (json / ndjson) o None si no es exportación"""
+    formato = request.query_params.get('formato', '').strip().lower()
+    return formato if formato in FORMATOS_EXPORTACION else None
+
+
+def _lotes(queryset, chunk_size):
+    # iterator(chunk_size) ejecuta los prefetch_related de a un lote por vez
+    iterador = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        lote = list(islice(iterador, chunk_size))
+        if not lote:
+            return
+        yield lote
+
+
+def _filas(queryset, serializer_class, chunk_size):
+    for lote in _lotes(queryset, chunk_size):
+        for fila in serializer_class(lote, many=True).data:
+            yield json.dumps(fila, cls=JSONEncoder, ensure_ascii=False)
+
+
+def _json(filas):
+    yield '['
+    for i, fila in enumerate(filas):
+        yield fila if i == 0 else ',' + fila
+    yield ']'
+
+
+def _ndjson(filas):
+    for fila in filas:
+        yield fila + '\n'
+
+
+def exportar_queryset(queryset, serializer_class, formato, nombre_archivo, chunk_size=500):
+    """
+    Exporta el queryset serializándolo por lotes en un StreamingHttpResponse.
+
+    La memoria queda acotada al tamaño del lote y el primer byte sale antes
+    de recorrer toda la tabla.
+    """
+    filas = _filas(queryset, serializer_class, chunk_size)
+    contenido = _ndjson(filas) if formato == 'ndjson' else _json(filas)
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS_EXPORTACION[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}.{formato}"'
+    return response
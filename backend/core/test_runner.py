@@ -0,0 +1,51 @@
+import logging
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from core.esquema import APPS_PROPIAS, liberar_modelos_propios, manejar_modelos_propios
+
+
+# Sólo los eventos esperados que ensucian la salida: los INFO de las apps
+# (tutores creados, lotes registrados) y los 4xx de django.request que los
+# tests provocan a propósito. WARNING / ERROR de las apps y los 5xx se ven.
+NIVELES_TESTS = {
+    **{f'apps.{app}': logging.WARNING for app in ('login', 'secretarios', 'preceptores_rectores', 'profesores')},
+    'django.request': logging.ERROR,
+}
+
+# Siempre en memoria: con CACHE_URL los cache.clear() de los tests vaciarían la caché compartida
+CACHES_TESTS = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'metricas': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-metricas'},
+}
+
+
+class UnManagedModelTestRunner(DiscoverRunner):
+    """
+    Test runner que crea las tablas de los modelos managed = False.
+    Las migraciones de las apps propias no reflejan las FK reales, así que
+    para los tests se crean directamente desde los modelos (syncdb).
+    """
+
+    def setup_test_environment(self, *args, **kwargs):
+        self.niveles_previos = {nombre: logging.getLogger(nombre).level for nombre in NIVELES_TESTS}
+        for nombre, nivel in NIVELES_TESTS.items():
+            logging.getLogger(nombre).setLevel(nivel)
+        self.caches_tests = override_settings(CACHES=CACHES_TESTS)
+        self.caches_tests.enable()
+        self.modelos_no_manejados = manejar_modelos_propios()
+        settings.MIGRATION_MODULES = {app: None for app in APPS_PROPIAS}
+        super().setup_test_environment(*args, **kwargs)
+
+    def teardown_test_environment(self, *args, **kwargs):
+        super().teardown_test_environment(*args, **kwargs)
+        liberar_modelos_propios(self.modelos_no_manejados)
+        self.caches_tests.disable()
+        for nombre, nivel in self.niveles_previos.items():
+            logging.getLogger(nombre).setLevel(nivel)
@@ -16,6 +16,8 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from core.catalogos import catalogos_estadisticas
+from core.metricas import metricas_endpoints
 """
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -30,6 +32,8 @@ urlpatterns = [
     path('api/profesores/', include('apps.profesores.urls')),
     path('api/secretarios/', include('apps.secretarios.urls')),
     path('api/preceptores_rectores/', include('apps.preceptores_rectores.urls')),
+    path('api/catalogos/estadisticas/', catalogos_estadisticas, name='catalogos-estadisticas'),
+    path('api/metricas/', metricas_endpoints, name='metricas-endpoints'),
 ]
 """
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),